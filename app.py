@@ -2,18 +2,23 @@
 F1 Prediction App - Application Streamlit
 Utilise le dataset FinalCombinedCleanFinal.csv avec mappings
 """
+import os
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 
 # Imports locaux
 from src.models import ModelLoader
+from src.registry import ModelRegistry
+from src.cache import PredictionCache
+from src.scoring import IncrementalScorer, driver_win_row_builder, reference_times
+from src.season import project_remaining_season
 from src.features import (
-    build_features_driver_win,
     build_features_driver_time,
     build_features_team_perf,
+    build_team_perf_matrix,
+    plackett_luce_top_k_probability,
     time_to_seconds,
     milliseconds_to_time_string,
 )
@@ -29,6 +34,7 @@ from data.data_loader import (
     get_constructor_name,
     get_circuit_name,
     get_team_color,
+    get_team_colors,
     get_driver_number,
     get_constructor_id,
 )
@@ -112,13 +118,32 @@ def load_data():
 
 @st.cache_resource
 def load_models():
-    """Charge les modèles ML."""
+    """
+    Prépare les modèles ML : chaque modèle est chargé à sa première prédiction.
+    F1_WARMUP_MODELS=1 les préchauffe en arrière-plan dès le démarrage.
+    """
     loader = ModelLoader()
-    loader.load_all()
+    if os.environ.get("F1_WARMUP_MODELS") == "1":
+        loader.warmup()
     return loader
 
+@st.cache_resource
+def load_model_registry():
+    """Surveille models/ et remplace à chaud les modèles ré-entraînés (partagé entre sessions)."""
+    return ModelRegistry(load_models()).start()
+
+@st.cache_resource
+def load_prediction_cache():
+    """Cache des theta partagé entre toutes les sessions."""
+    return PredictionCache(load_models(), maxsize=4096)
+
 data_loader, data_loaded = load_data()
+if data_loaded:
+    # Nouvelles courses ingérées (data/partitions) : seul le delta est chargé
+    data_loader.refresh()
 model_loader = load_models()
+model_registry = load_model_registry()
+prediction_cache = load_prediction_cache()
 
 # =============================================================================
 # SIDEBAR
@@ -149,8 +174,14 @@ with st.sidebar:
     }
     
     for key, name in model_status.items():
-        if key in model_loader.models:
-            st.success(f"✅ {name}")
+        status = model_loader.status(key)
+        if status == "loaded":
+            st.success(f"✅ {name} · v{model_loader.versions[key][:7]}")
+            if key in model_registry.previous and st.button(f"↩️ Revenir à v{model_registry.previous[key].version[:7]}", key=f"rollback_{key}"):
+                model_registry.rollback(key)
+                st.rerun()
+        elif status == "pending":
+            st.info(f"⏳ {name}")
         else:
             st.error(f"❌ {name}")
     
@@ -262,6 +293,34 @@ with tab1:
         "Gabriel Bortoleto": {"grid": 20, "q_delta": 1.15},
     }
     
+    # Valeurs par défaut issues du feature store : ordre et écarts attendus en
+    # qualification d'après la forme récente de chaque pilote sur ce circuit
+    feature_store = data_loader.get_feature_store() if data_loaded else None
+    circuit_id = race_info["circuit_id"] if race_info else None
+    circuit_refs = feature_store.circuit_reference(circuit_id) if feature_store and circuit_id else None
+    
+    if circuit_refs is not None:
+        expected_q1 = {}
+        for driver in GRID_2025:
+            driver_id = data_loader.get_driver_id(driver["name"])
+            inputs = feature_store.default_inputs(driver_id, circuit_id, 2025) if driver_id is not None else None
+            if inputs is not None and inputs["q1_sec"] == inputs["q1_sec"]:
+                expected_q1[driver["name"]] = inputs["q1_sec"]
+        
+        if expected_q1:
+            best_q1 = min(expected_q1.values())
+            ranked = sorted(GRID_2025, key=lambda d: (
+                d["name"] not in expected_q1,
+                expected_q1.get(d["name"], 0.0),
+                default_configs.get(d["name"], {}).get("grid", 99),
+            ))
+            for position, driver in enumerate(ranked, start=1):
+                q_time = expected_q1.get(driver["name"])
+                q_delta = default_configs.get(driver["name"], {}).get("q_delta", 1.0)
+                if q_time is not None:
+                    q_delta = round(round(min(q_time - best_q1, 5.0) / 0.05) * 0.05, 2)
+                default_configs[driver["name"]] = {"grid": position, "q_delta": q_delta}
+    
     with st.expander("🔧 Modifier les positions de grille et temps de qualification", expanded=False):
         st.markdown("""
         **Position Grille** : Position de départ (1 = pole position)
@@ -287,7 +346,7 @@ with tab1:
                     min_value=1,
                     max_value=20,
                     value=defaults["grid"],
-                    key=f"grid_{name}"
+                    key=f"grid_{name}_{circuit_id}"
                 )
                 
                 q_delta = st.number_input(
@@ -296,7 +355,7 @@ with tab1:
                     max_value=5.0,
                     value=defaults["q_delta"],
                     step=0.05,
-                    key=f"qdelta_{name}"
+                    key=f"qdelta_{name}_{circuit_id}"
                 )
                 
                 driver_configs[name] = {
@@ -320,207 +379,191 @@ with tab1:
     
     st.markdown("---")
     
-    # Bouton de prédiction
-    if st.button("🎯 Calculer les Probabilités de Victoire", type="primary", use_container_width=True):
+    # Calcul en direct à chaque modification : seuls les pilotes dont la
+    # configuration a changé sont re-scorés (état conservé dans la session)
+    if not model_loader.load("driver_win"):
+        st.error("❌ Modèle driver_win non chargé. Placez model_driver_win.pkl dans models/")
+    else:
+        if "win_scorer" not in st.session_state:
+            st.session_state["win_scorer"] = IncrementalScorer(prediction_cache)
+        scorer = st.session_state["win_scorer"]
         
-        if "driver_win" not in model_loader.models:
-            st.error("❌ Modèle driver_win non chargé. Placez model_driver_win.pkl dans models/")
-        else:
-            with st.spinner("Calcul des scores θ et probabilités Plackett-Luce..."):
-                
-                # Temps de référence pour la pole (en secondes)
-                base_pole_time = 80.0  # ~1:20.000
-                
-                # Préparer les features pour chaque pilote
-                drivers_features = []
-                
-                for name, config in driver_configs.items():
-                    # Calculer les temps de qualification basés sur le delta
-                    pole_time = base_pole_time
-                    driver_q_time = pole_time + config["q_delta"]
-                    
-                    # Q1, Q2, Q3 (avec progression typique)
-                    q1_time = driver_q_time + 1.5  # Q1 environ 1.5s plus lent
-                    q2_time = driver_q_time + 0.7  # Q2 environ 0.7s plus lent
-                    q3_time = driver_q_time if config["grid"] <= 10 else 999  # Hors Q3 si grille > 10
-                    
-                    # Fastest lap time estimé (en millisecondes)
-                    fastest_lap_ms = driver_q_time * 1000
-                    
-                    # Avg lap time (un peu plus lent que le fastest)
-                    avg_lap_ms = fastest_lap_ms + 2500  # ~2.5s plus lent en moyenne
-                    
-                    try:
-                        X = build_features_driver_win(
-                            grid=config["grid"],
-                            laps=laps,
-                            q1_sec=q1_time,
-                            q2_sec=q2_time,
-                            q3_sec=q3_time,
-                            fastest_lap_time=fastest_lap_ms,
-                            avg_lap_ms=avg_lap_ms,
-                            pit_stop_count=pit_stops,
-                            avg_pit_duration_s=avg_pit_duration
-                        )
-                        
-                        drivers_features.append((name, X, config))
-                        
-                    except Exception as e:
-                        st.warning(f"Erreur pour {name}: {e}")
-                
-                # Calculer les probabilités avec Plackett-Luce
-                if drivers_features:
-                    try:
-                        # Calculer theta pour chaque pilote
-                        results = model_loader.predict_win_probabilities(
-                            [(name, X) for name, X, _ in drivers_features]
-                        )
-                        
-                        # Ajouter les infos supplémentaires
-                        for i, (name, X, config) in enumerate(drivers_features):
-                            results[i]["team"] = config["team"]
-                            results[i]["number"] = config["number"]
-                            results[i]["grid"] = config["grid"]
-                        
-                        # Créer le DataFrame et trier
-                        df_pred = pd.DataFrame(results)
-                        df_pred = df_pred.sort_values("win_probability", ascending=False).reset_index(drop=True)
-                        
-                        # PODIUM
-                        st.markdown("## 🏆 Podium Prédit")
-                        
-                        podium = df_pred.head(3)
-                        
-                        col1, col2, col3 = st.columns([1, 1.3, 1])
-                        
-                        # 2ème
-                        with col1:
-                            if len(podium) >= 2:
-                                d = podium.iloc[1]
-                                color = get_team_color(d['team'])
-                                st.markdown(f"""
-                                <div class="podium-silver">
-                                    <h2>🥈 2ème</h2>
-                                    <h3>{d['driver']}</h3>
-                                    <p style="color: {color}; font-weight: bold;">{d['team']}</p>
-                                    <p style="font-size: 1.5rem;">{d['win_probability']*100:.2f}%</p>
-                                    <p>θ = {d['theta']:.3f}</p>
-                                </div>
-                                """, unsafe_allow_html=True)
-                        
-                        # 1er
-                        with col2:
-                            if len(podium) >= 1:
-                                d = podium.iloc[0]
-                                color = get_team_color(d['team'])
-                                st.markdown(f"""
-                                <div class="podium-gold">
-                                    <h1>🥇 VAINQUEUR</h1>
-                                    <h2>{d['driver']}</h2>
-                                    <p style="color: {color}; font-weight: bold;">{d['team']}</p>
-                                    <p style="font-size: 2rem;">{d['win_probability']*100:.2f}%</p>
-                                    <p>θ = {d['theta']:.3f}</p>
-                                </div>
-                                """, unsafe_allow_html=True)
-                        
-                        # 3ème
-                        with col3:
-                            if len(podium) >= 3:
-                                d = podium.iloc[2]
-                                color = get_team_color(d['team'])
-                                st.markdown(f"""
-                                <div class="podium-bronze">
-                                    <h2>🥉 3ème</h2>
-                                    <h3>{d['driver']}</h3>
-                                    <p style="font-weight: bold;">{d['team']}</p>
-                                    <p style="font-size: 1.5rem;">{d['win_probability']*100:.2f}%</p>
-                                    <p>θ = {d['theta']:.3f}</p>
-                                </div>
-                                """, unsafe_allow_html=True)
-                        
-                        st.markdown("---")
-                        
-                        # Vérification : somme des probabilités
-                        total_prob = df_pred["win_probability"].sum()
-                        st.success(f"✅ Somme des probabilités : {total_prob*100:.2f}% (doit être ~100%)")
-                        
-                        st.markdown("---")
-                        
-                        # Graphique
-                        st.subheader("📊 Probabilités de Victoire (Plackett-Luce)")
-                        
-                        df_sorted = df_pred.sort_values("win_probability", ascending=True)
-                        
-                        color_map = {team: get_team_color(team) for team in df_sorted["team"].unique()}
-                        
-                        fig = px.bar(
-                            df_sorted,
-                            x="win_probability",
-                            y="driver",
-                            orientation="h",
-                            color="team",
-                            color_discrete_map=color_map,
-                            title=f"Probabilités de Victoire - {selected_race_name}",
-                            labels={"win_probability": "Probabilité", "driver": "Pilote", "team": "Équipe"},
-                            hover_data={"theta": ":.3f", "grid": True}
-                        )
-                        
-                        fig.update_traces(texttemplate='%{x:.1%}', textposition='outside')
-                        fig.update_layout(
-                            height=700,
-                            yaxis={'categoryorder': 'total ascending'},
-                            xaxis_tickformat='.0%'
-                        )
-                        
-                        st.plotly_chart(fig, use_container_width=True)
-                        
-                        # Graphique des scores theta
-                        st.subheader("📈 Scores de Force (θ)")
-                        
-                        fig_theta = px.bar(
-                            df_sorted,
-                            x="theta",
-                            y="driver",
-                            orientation="h",
-                            color="team",
-                            color_discrete_map=color_map,
-                            title="Score θ (Force du pilote) - Plus élevé = Plus fort",
-                            labels={"theta": "Score θ", "driver": "Pilote"}
-                        )
-                        
-                        fig_theta.update_traces(texttemplate='%{x:.2f}', textposition='outside')
-                        fig_theta.update_layout(
-                            height=700,
-                            yaxis={'categoryorder': 'total ascending'}
-                        )
-                        
-                        st.plotly_chart(fig_theta, use_container_width=True)
-                        
-                        # Tableau complet
-                        st.subheader("📋 Classement Complet")
-                        
-                        df_display = df_pred.copy()
-                        df_display["Position"] = range(1, len(df_display) + 1)
-                        df_display["Probabilité"] = df_display["win_probability"].apply(lambda x: f"{x*100:.2f}%")
-                        df_display["Score θ"] = df_display["theta"].apply(lambda x: f"{x:.3f}")
-                        
-                        df_display = df_display.rename(columns={
-                            "driver": "Pilote",
-                            "team": "Équipe",
-                            "number": "Numéro",
-                            "grid": "Grille"
-                        })
-                        
-                        st.dataframe(
-                            df_display[["Position", "Pilote", "Équipe", "Numéro", "Grille", "Score θ", "Probabilité"]],
-                            use_container_width=True,
-                            hide_index=True
-                        )
-                        
-                    except Exception as e:
-                        st.error(f"Erreur lors du calcul: {e}")
-                        import traceback
-                        st.code(traceback.format_exc())
+        # Temps de référence du circuit (dernière édition), sinon ~1:20.000 pour la pole
+        references = reference_times(circuit_refs)
+        build_driver_rows = driver_win_row_builder(references)
+        
+        driver_inputs = {
+            name: (config["grid"], config["q_delta"], laps, pit_stops, avg_pit_duration)
+            for name, config in driver_configs.items()
+        }
+        
+        # Calculer les probabilités avec Plackett-Luce
+        try:
+            # Les temps du circuit font partie de la version : changer de course re-score tout
+            scorer.update(driver_inputs, build_driver_rows,
+                          version=(model_loader.version("driver_win"), references))
+            results = scorer.results()
+            
+            # Ajouter les infos supplémentaires
+            for result in results:
+                config = driver_configs[result["driver"]]
+                result["team"] = config["team"]
+                result["number"] = config["number"]
+                result["grid"] = config["grid"]
+            
+            # Créer le DataFrame et trier
+            df_pred = pd.DataFrame(results)
+            df_pred["podium_probability"] = plackett_luce_top_k_probability(
+                df_pred["theta"].to_numpy(), k=3
+            )
+            df_pred = df_pred.sort_values("win_probability", ascending=False).reset_index(drop=True)
+            
+            # PODIUM
+            st.markdown("## 🏆 Podium Prédit")
+            
+            podium = df_pred.head(3)
+            
+            col1, col2, col3 = st.columns([1, 1.3, 1])
+            
+            # 2ème
+            with col1:
+                if len(podium) >= 2:
+                    d = podium.iloc[1]
+                    color = get_team_color(d['team'])
+                    st.markdown(f"""
+                    <div class="podium-silver">
+                        <h2>🥈 2ème</h2>
+                        <h3>{d['driver']}</h3>
+                        <p style="color: {color}; font-weight: bold;">{d['team']}</p>
+                        <p style="font-size: 1.5rem;">{d['win_probability']*100:.2f}%</p>
+                        <p>θ = {d['theta']:.3f}</p>
+                    </div>
+                    """, unsafe_allow_html=True)
+            
+            # 1er
+            with col2:
+                if len(podium) >= 1:
+                    d = podium.iloc[0]
+                    color = get_team_color(d['team'])
+                    st.markdown(f"""
+                    <div class="podium-gold">
+                        <h1>🥇 VAINQUEUR</h1>
+                        <h2>{d['driver']}</h2>
+                        <p style="color: {color}; font-weight: bold;">{d['team']}</p>
+                        <p style="font-size: 2rem;">{d['win_probability']*100:.2f}%</p>
+                        <p>θ = {d['theta']:.3f}</p>
+                    </div>
+                    """, unsafe_allow_html=True)
+            
+            # 3ème
+            with col3:
+                if len(podium) >= 3:
+                    d = podium.iloc[2]
+                    color = get_team_color(d['team'])
+                    st.markdown(f"""
+                    <div class="podium-bronze">
+                        <h2>🥉 3ème</h2>
+                        <h3>{d['driver']}</h3>
+                        <p style="font-weight: bold;">{d['team']}</p>
+                        <p style="font-size: 1.5rem;">{d['win_probability']*100:.2f}%</p>
+                        <p>θ = {d['theta']:.3f}</p>
+                    </div>
+                    """, unsafe_allow_html=True)
+            
+            st.markdown("---")
+            
+            # Vérification : somme des probabilités
+            total_prob = df_pred["win_probability"].sum()
+            st.success(f"✅ Somme des probabilités : {total_prob*100:.2f}% (doit être ~100%)")
+            
+            st.markdown("---")
+            
+            import plotly.express as px  # import différé : seulement pour les graphiques
+            
+            # Graphique
+            st.subheader("📊 Probabilités de Victoire (Plackett-Luce)")
+            
+            df_sorted = df_pred.sort_values("win_probability", ascending=True)
+            
+            color_map = {team: get_team_color(team) for team in df_sorted["team"].unique()}
+            
+            fig = px.bar(
+                df_sorted,
+                x="win_probability",
+                y="driver",
+                orientation="h",
+                color="team",
+                color_discrete_map=color_map,
+                title=f"Probabilités de Victoire - {selected_race_name}",
+                labels={"win_probability": "Probabilité", "driver": "Pilote", "team": "Équipe"},
+                hover_data={"theta": ":.3f", "grid": True}
+            )
+            
+            fig.update_traces(texttemplate='%{x:.1%}', textposition='outside')
+            fig.update_layout(
+                height=700,
+                yaxis={'categoryorder': 'total ascending'},
+                xaxis_tickformat='.0%'
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # Graphique des scores theta
+            st.subheader("📈 Scores de Force (θ)")
+            
+            fig_theta = px.bar(
+                df_sorted,
+                x="theta",
+                y="driver",
+                orientation="h",
+                color="team",
+                color_discrete_map=color_map,
+                title="Score θ (Force du pilote) - Plus élevé = Plus fort",
+                labels={"theta": "Score θ", "driver": "Pilote"}
+            )
+            
+            fig_theta.update_traces(texttemplate='%{x:.2f}', textposition='outside')
+            fig_theta.update_layout(
+                height=700,
+                yaxis={'categoryorder': 'total ascending'}
+            )
+            
+            st.plotly_chart(fig_theta, use_container_width=True)
+            
+            # Tableau complet
+            st.subheader("📋 Classement Complet")
+            
+            df_display = df_pred.copy()
+            df_display["Position"] = range(1, len(df_display) + 1)
+            df_display["Probabilité"] = df_display["win_probability"].apply(lambda x: f"{x*100:.2f}%")
+            df_display["Score θ"] = df_display["theta"].apply(lambda x: f"{x:.3f}")
+            df_display["Podium"] = df_display["podium_probability"].apply(lambda x: f"{x*100:.2f}%")
+            
+            df_display = df_display.rename(columns={
+                "driver": "Pilote",
+                "team": "Équipe",
+                "number": "Numéro",
+                "grid": "Grille"
+            })
+            
+            st.dataframe(
+                df_display[["Position", "Pilote", "Équipe", "Numéro", "Grille", "Score θ", "Probabilité", "Podium"]],
+                use_container_width=True,
+                hide_index=True
+            )
+            
+            cache_stats = prediction_cache.stats()
+            st.caption(
+                f"{scorer.last_rescored} pilote(s) re-scoré(s) · "
+                f"Cache θ : {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                f"({cache_stats['hit_rate']*100:.0f}%)"
+            )
+        
+        except Exception as e:
+            st.error(f"Erreur lors du calcul: {e}")
+            import traceback
+            st.code(traceback.format_exc())
+
 
 # =============================================================================
 # TAB 2: TEMPS DE COURSE
@@ -573,7 +616,7 @@ with tab2:
     
     if st.button("⏱️ Prédire le Temps", type="primary", use_container_width=True):
         
-        if "driver_time" not in model_loader.models:
+        if not model_loader.load("driver_time"):
             st.error("❌ Modèle temps non chargé")
         elif driver_info is None:
             st.error("Pilote non trouvé")
@@ -710,7 +753,7 @@ with tab3:
     # Bouton pour classifier l'équipe sélectionnée
     if st.button("🎯 Classifier cette Équipe", type="secondary", use_container_width=True):
         
-        if "team_perf" not in model_loader.models:
+        if not model_loader.load("team_perf"):
             st.error("❌ Modèle team_perf non chargé. Placez model_team_perf.pkl dans models/")
         else:
             try:
@@ -743,32 +786,34 @@ with tab3:
     
     if st.button("🔄 Classifier Toutes les Équipes (Données 2024)", type="primary", use_container_width=True):
         
-        if "team_perf" not in model_loader.models:
+        if not model_loader.load("team_perf"):
             st.error("❌ Modèle team_perf non chargé")
         else:
             with st.spinner("Classification en cours..."):
                 
                 results = []
                 
-                for team, defaults in team_defaults.items():
-                    try:
-                        X = build_features_team_perf(
-                            points=defaults["points"],
-                            quali_pace_ratio=defaults["quali_pace_ratio"]
-                        )
-                        
-                        cluster, tier_label, tier_name = model_loader.predict_team_tier(X)
-                        
+                try:
+                    # Toutes les équipes en un seul calcul vectorisé
+                    X = build_team_perf_matrix(
+                        points=[defaults["points"] for defaults in team_defaults.values()],
+                        quali_pace_ratio=[defaults["quali_pace_ratio"] for defaults in team_defaults.values()]
+                    )
+                    
+                    tiers = model_loader.predict_team_tiers(X)
+                    
+                    for i, (team, defaults) in enumerate(team_defaults.items()):
                         results.append({
                             "Équipe": team,
                             "Points": defaults["points"],
                             "Quali Pace Ratio": defaults["quali_pace_ratio"],
-                            "Tier": tier_name,
-                            "Tier_Label": tier_label,
+                            "Tier": tiers["tier_name"][i],
+                            "Tier_Label": int(tiers["tier_label"][i]),
+                            "Confiance": f"{tiers['scores'][i].max()*100:.0f}%",
                         })
-                        
-                    except Exception as e:
-                        st.warning(f"Erreur pour {team}: {e}")
+                    
+                except Exception as e:
+                    st.warning(f"Erreur de classification: {e}")
                 
                 if results:
                     df_results = pd.DataFrame(results)
@@ -782,7 +827,7 @@ with tab3:
                             color = get_team_color(row["Équipe"])
                             st.markdown(f"""
                             <div style="background-color: {color}30; padding: 10px; border-radius: 8px; margin: 5px 0; border-left: 4px solid {color};">
-                                <strong>{row['Équipe']}</strong> - {row['Points']} pts
+                                <strong>{row['Équipe']}</strong> - {row['Points']} pts · confiance {row['Confiance']}
                             </div>
                             """, unsafe_allow_html=True)
                     else:
@@ -795,7 +840,7 @@ with tab3:
                             color = get_team_color(row["Équipe"])
                             st.markdown(f"""
                             <div style="background-color: {color}30; padding: 10px; border-radius: 8px; margin: 5px 0; border-left: 4px solid {color};">
-                                <strong>{row['Équipe']}</strong> - {row['Points']} pts
+                                <strong>{row['Équipe']}</strong> - {row['Points']} pts · confiance {row['Confiance']}
                             </div>
                             """, unsafe_allow_html=True)
                     else:
@@ -808,7 +853,7 @@ with tab3:
                             color = get_team_color(row["Équipe"])
                             st.markdown(f"""
                             <div style="background-color: {color}30; padding: 10px; border-radius: 8px; margin: 5px 0; border-left: 4px solid {color};">
-                                <strong>{row['Équipe']}</strong> - {row['Points']} pts
+                                <strong>{row['Équipe']}</strong> - {row['Points']} pts · confiance {row['Confiance']}
                             </div>
                             """, unsafe_allow_html=True)
                     else:
@@ -825,6 +870,8 @@ with tab3:
                         "Back-markers": "#FF6347"
                     }
                     
+                    import plotly.express as px
+                    
                     fig = px.scatter(
                         df_results,
                         x="Points",
@@ -892,6 +939,8 @@ with tab4:
             if standings is not None and not standings.empty:
                 st.dataframe(standings, use_container_width=True, hide_index=True)
                 
+                import plotly.express as px
+                
                 fig = px.bar(
                     standings.head(10),
                     x="Pilote",
@@ -902,6 +951,23 @@ with tab4:
                 )
                 fig.update_layout(xaxis_tickangle=-45)
                 st.plotly_chart(fig, use_container_width=True)
+                
+                # Progression manche par manche (pré-calculée au chargement)
+                progression = data_loader.get_standings_progression(selected_year)
+                if progression is not None and len(progression) > 1:
+                    top_drivers = standings["Pilote"].head(10).tolist()
+                    df_progress = progression[top_drivers].reset_index().melt(
+                        id_vars="round", var_name="Pilote", value_name="Points"
+                    )
+                    fig_progress = px.line(
+                        df_progress,
+                        x="round",
+                        y="Points",
+                        color="Pilote",
+                        title="Progression des Points (Top 10)",
+                        labels={"round": "Manche"}
+                    )
+                    st.plotly_chart(fig_progress, use_container_width=True)
             else:
                 st.warning(f"Pas de données pour {selected_year}")
         else:
@@ -915,7 +981,7 @@ with tab4:
             
             if standings is not None and not standings.empty:
                 # Ajouter les couleurs
-                standings["Couleur"] = standings["Constructeur"].apply(get_team_color)
+                standings["Couleur"] = get_team_colors(standings["Constructeur"])
                 
                 st.dataframe(
                     standings[["Position", "Constructeur", "Points"]],
@@ -923,7 +989,9 @@ with tab4:
                     hide_index=True
                 )
                 
-                color_map = {row["Constructeur"]: row["Couleur"] for _, row in standings.iterrows()}
+                color_map = dict(zip(standings["Constructeur"], standings["Couleur"]))
+                
+                import plotly.express as px
                 
                 fig = px.bar(
                     standings.sort_values("Points"),
@@ -972,6 +1040,32 @@ with tab5:
                     📍 {race['circuit']} | 📅 {race['date']}
                 </div>
                 """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    st.subheader("🏆 Projection du Championnat")
+    st.caption("Simulation Monte Carlo des courses restantes à partir du classement actuel")
+    
+    n_sims = st.select_slider("Saisons simulées", options=[10_000, 50_000, 100_000], value=50_000)
+    
+    if st.button("🎲 Simuler la Fin de Saison", type="primary", use_container_width=True):
+        if not data_loaded:
+            st.warning("Données non chargées")
+        else:
+            try:
+                with st.spinner("Simulation en cours..."):
+                    drivers_proj, constructors_proj = project_remaining_season(
+                        model_loader, data_loader, n_sims=n_sims, seed=42
+                    )
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.dataframe(drivers_proj.round({"Points projetés": 1, "Titre": 3}),
+                                 use_container_width=True, hide_index=True)
+                with col2:
+                    st.dataframe(constructors_proj.round({"Points projetés": 1, "Titre": 3}),
+                                 use_container_width=True, hide_index=True)
+            except Exception as e:
+                st.error(f"Erreur: {e}")
 
 # =============================================================================
 # FOOTER
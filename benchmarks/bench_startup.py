@@ -0,0 +1,87 @@
+"""
+Benchmark : temps d'import à froid des modules du projet (python -X importtime)
+
+Chaque module est importé dans un interpréteur neuf (-X importtime, sans
+cache d'import partagé entre essais hormis les .pyc) ; on retient la médiane
+du temps cumulé sur plusieurs essais et on liste les dépendances les plus
+coûteuses du dernier essai.
+
+Usage :
+    python benchmarks/bench_startup.py [--repeat 5] [--top 8] [modules ...]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules chargés au démarrage d'un worker (app Streamlit / service HTTP)
+DEFAULT_MODULES = [
+    "src.features",
+    "src.models",
+    "src.cache",
+    "src.scoring",
+    "src.service",
+    "data.data_loader",
+]
+
+
+def import_profile(module):
+    """
+    Importe `module` dans un sous-processus avec -X importtime.
+
+    Returns:
+        Liste de (module, self_us, cumulative_us, profondeur) dans l'ordre de la sortie
+    """
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def top_level_cost(rows, module):
+    """Temps cumulé (µs) de l'import de `module` : la dernière entrée de ce nom."""
+    return next(cum for name, _, cum, _ in reversed(rows) if name == module)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Dépendances directes les plus lentes à afficher")
+    args = parser.parse_args()
+
+    heavy = ("numpy", "pandas", "pyarrow", "sklearn", "scipy", "joblib", "plotly", "streamlit")
+    print(f"{'module':<20} {'médiane':>10} {'min':>10}  dépendances lourdes chargées")
+
+    for module in args.modules:
+        timings = []
+        for _ in range(args.repeat):
+            rows = import_profile(module)
+            timings.append(top_level_cost(rows, module))
+
+        loaded = sorted({name.split(".")[0] for name, _, _, _ in rows} & set(heavy))
+        print(f"{module:<20} {statistics.median(timings) / 1000:>8.1f}ms "
+              f"{min(timings) / 1000:>8.1f}ms  {', '.join(loaded) or '-'}")
+
+        if args.top:
+            direct = [(cum, name) for name, _, cum, depth in rows if depth == 1]
+            for cum, name in sorted(direct, reverse=True)[:args.top]:
+                print(f"    {name:<32} {cum / 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark : parsing des temps q1/q2/q3 (times_to_seconds vs time_to_seconds)
+
+Vérifie d'abord l'égalité exacte des deux versions sur les colonnes du
+dataset et sur des valeurs aléatoires (formats valides, sentinelles,
+chaînes invalides), puis compare les temps d'exécution.
+
+Usage :
+    python benchmarks/bench_time_parsing.py [--rows 200000] [--seed 0]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.features import time_to_seconds, times_to_seconds  # noqa: E402
+from data.data_loader import CSV_PATH  # noqa: E402
+
+
+def random_time_strings(n, rng):
+    """Génère un mélange de temps valides, sentinelles et valeurs invalides."""
+    minutes = rng.integers(0, 3, n)
+    seconds = rng.random(n) * 60
+    canonical = [f"{m}:{s:06.3f}" for m, s in zip(minutes, seconds)]
+    odd = ['DNQ', 'DNS', '', 'nan', None, np.nan, ' 1:23.456 ', '83.1', '1:', ':30',
+           '1:2:3', 'abc', '1e2', ' DNQ', 'inf', '1:30.5x', '0:00.000', 95.25]
+    values = np.array(canonical, dtype=object)
+    swap = rng.random(n) < 0.2
+    values[swap] = rng.choice(np.array(odd, dtype=object), swap.sum())
+    return pd.Series(values)
+
+
+def assert_same(series):
+    """Égalité bit à bit (NaN compris) entre versions vectorisée et scalaire."""
+    expected = np.array([time_to_seconds(v) for v in series], dtype=float)
+    actual = times_to_seconds(series).to_numpy()
+    same = (expected == actual) | (np.isnan(expected) & np.isnan(actual))
+    if not same.all():
+        bad = np.flatnonzero(~same)[:5]
+        raise AssertionError(f"Différences: {[(series.iloc[i], expected[i], actual[i]) for i in bad]}")
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+
+    df = pd.read_csv(CSV_PATH)
+    for col in ['q1', 'q2', 'q3']:
+        assert_same(df[col])
+    for _ in range(20):
+        assert_same(random_time_strings(1_000, rng))
+    print("Équivalence OK (dataset + 20 000 valeurs aléatoires)")
+
+    column = pd.concat([df['q1'], df['q2'], df['q3']], ignore_index=True)
+    column = column.sample(args.rows, replace=True, random_state=args.seed).reset_index(drop=True)
+
+    scalar = timed(lambda s: s.apply(time_to_seconds), column)
+    vector = timed(times_to_seconds, column)
+    print(f"{args.rows} valeurs : scalaire {scalar * 1000:.1f} ms | "
+          f"vectorisé {vector * 1000:.1f} ms | x{scalar / vector:.1f}")
+
+
+if __name__ == "__main__":
+    main()
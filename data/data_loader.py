@@ -2,14 +2,161 @@
 Chargement et traitement du dataset F1
 Adapté aux colonnes du fichier FinalCombinedCleanFinal.csv
 """
-import pandas as pd
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+try:
+    import fcntl
+except ImportError:  # Windows : verrou via msvcrt
+    fcntl = None
+    import msvcrt
+
 import numpy as np
 from pathlib import Path
 
+from data.feature_store import FeatureStore
+from src.lazy import lazy_import
+
+# pandas / pyarrow importés au premier usage (None si pyarrow absent)
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pq = lazy_import("pyarrow.parquet")
+
 # Chemin vers le fichier CSV
 DATA_DIR = Path(__file__).resolve().parent
 CSV_PATH = DATA_DIR / "FinalCombinedCleanFinal.csv"
 
+# Cache colonnaire (Arrow IPC) dérivé du CSV
+CACHE_DIR = DATA_DIR / ".cache"
+CACHE_VERSION = "3"
+
+# Résultats ajoutés après le CSV : une partition Parquet par (année, manche)
+PARTITIONS_DIR = DATA_DIR / "partitions"
+MANIFEST_NAME = "_manifest.json"
+MANIFEST_LOCK_NAME = "manifest.lock"
+
+# Une ligne par (course, pilote)
+ROW_KEY = ['raceId', 'driverId']
+
+# Colonnes de noms ajoutées au chargement (stockées en catégories)
+NAME_COLUMNS = ['driver_name', 'constructor_name', 'circuit_name']
+
+# Types de classement : colonne de nom et libellé affiché
+STANDINGS_KINDS = {
+    "driver": ("driver_name", "Pilote"),
+    "constructor": ("constructor_name", "Constructeur"),
+}
+
+# Schéma compact des colonnes du CSV (entiers étroits, float32, catégories).
+# Les temps et vitesses mesurés restent en float64 : ils alimentent les
+# modèles et ne tiennent pas exactement en float32.
+RESULTS_SCHEMA = {
+    'Unnamed: 0': 'int32',
+    'raceId': 'int16',
+    'driverId': 'int16',
+    'constructorId': 'int16',
+    'circuitId': 'int16',
+    'year': 'int16',
+    'round': 'int8',
+    'number_driver': 'int8',
+    'grid': 'int8',
+    'position_qualifying': 'int8',
+    'positionOrder': 'int8',
+    'points': 'float32',
+    'milliseconds': 'int32',
+    'avg_lap_ms': 'float64',
+    'pit_stop_count': 'int8',
+    'avg_pit_duration_s': 'float64',
+    'laps': 'int16',
+    'fastestLapTime': 'float64',
+    'fastestLapSpeed': 'float64',
+    'rank': 'float32',
+    'max_quali_stage': 'int8',
+    'did_not_finish': 'int8',
+    'was_fastest_lap_missing': 'int8',
+    'location': 'category',
+    'country': 'category',
+    'driver_nationality': 'category',
+    'nationality_constructor': 'category',
+    'status': 'category',
+    # Temps de qualification : forte cardinalité, chaînes Arrow compactes
+    'q1': 'string[pyarrow]',
+    'q2': 'string[pyarrow]',
+    'q3': 'string[pyarrow]',
+    'driver_name': 'category',
+    'constructor_name': 'category',
+    'circuit_name': 'category',
+}
+
+
+def _plain_key(key):
+    """Convertit une clé de groupby (scalaires NumPy, tuples) en types Python."""
+    if isinstance(key, tuple):
+        return tuple(_plain_key(k) for k in key)
+    return key.item() if isinstance(key, np.generic) else key
+
+
+def _arrow_string_mapper(arrow_type):
+    """Garde les colonnes texte Arrow en string[pyarrow] lors de la conversion pandas."""
+    if arrow_type in (pa.string(), pa.large_string()):
+        return pd.StringDtype("pyarrow")
+    return None
+
+
+def _fits_dtype(series, dtype):
+    """Vérifie qu'une colonne peut être convertie sans perte de valeurs."""
+    dtype = np.dtype(dtype)
+    if dtype.kind in 'iu':
+        if series.isna().any():
+            return False
+        values = series.to_numpy()
+        if values.dtype.kind == 'f' and not np.all(np.mod(values, 1) == 0):
+            return False
+        info = np.iinfo(dtype)
+        return series.empty or (series.min() >= info.min and series.max() <= info.max)
+    if dtype.kind == 'f':
+        # Conversion exacte uniquement : aller-retour sans perte (NaN conservés)
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        # Débordement pendant l'essai attendu (valeur -> inf) : rejeté par la comparaison
+        with np.errstate(over='ignore', invalid='ignore'):
+            narrowed = values.astype(dtype).astype(np.float64)
+        return np.array_equal(narrowed, values, equal_nan=True)
+    return True
+
+
+def apply_schema(df, schema=None):
+    """
+    Convertit les colonnes selon RESULTS_SCHEMA (en place).
+    
+    Les conversions qui perdraient des valeurs (débordement, NaN dans une
+    colonne entière, flottant non représentable exactement) sont ignorées
+    et la colonne garde son type d'origine.
+    
+    Returns:
+        dict {"before": octets, "after": octets, "skipped": [colonnes]}
+    """
+    schema = RESULTS_SCHEMA if schema is None else schema
+    before = int(df.memory_usage(deep=True).sum())
+    skipped = []
+    
+    for col, dtype in schema.items():
+        if col not in df.columns or str(df[col].dtype) == dtype:
+            continue
+        if dtype == 'string[pyarrow]' and pa is None:
+            continue
+        if dtype not in ('category', 'string[pyarrow]') and not _fits_dtype(df[col], dtype):
+            skipped.append(col)
+            continue
+        df[col] = df[col].astype(dtype)
+    
+    after = int(df.memory_usage(deep=True).sum())
+    return {"before": before, "after": after, "skipped": skipped}
+
 # =============================================================================
 # MAPPINGS
 # =============================================================================
@@ -206,33 +353,98 @@ def get_circuit_name(circuit_id):
     """Retourne le nom du circuit à partir de son ID."""
     return CIRCUITS_MAP.get(circuit_id, f"Circuit #{circuit_id}")
 
+# Index inverses (clés en minuscules), construits une fois à l'import.
+# En cas de doublon, la première entrée du mapping l'emporte (comme les
+# anciennes recherches linéaires).
+
+def _first_by_lower(pairs):
+    """Construit {nom.lower(): valeur} en gardant la première occurrence."""
+    index = {}
+    for value, name in pairs:
+        index.setdefault(name.lower(), value)
+    return index
+
+
+def _substring_index(names):
+    """
+    Table {sous-chaîne: rang du premier nom qui la contient} pour tous les
+    noms (en minuscules). Remplace le test `requete in nom` par un accès dict.
+    """
+    index = {}
+    for rank, name in enumerate(names):
+        name = name.lower()
+        for i in range(len(name) + 1):
+            for j in range(i, len(name) + 1):
+                index.setdefault(name[i:j], rank)
+    return index
+
+
+_DRIVER_NUMBER_INDEX = _first_by_lower(DRIVERS_MAP.items())
+_CONSTRUCTOR_ID_INDEX = _first_by_lower(CONSTRUCTORS_MAP.items())
+_GRID_INDEX = _first_by_lower((d, d["name"]) for d in GRID_2025)
+
+_CIRCUIT_IDS = list(CIRCUITS_MAP.keys())
+_CIRCUIT_SUBSTRINGS = _substring_index(CIRCUITS_MAP.values())
+
+_TEAM_NAMES = list(TEAM_COLORS.keys())
+_TEAM_RANKS = _first_by_lower(enumerate(_TEAM_NAMES))
+_TEAM_SUBSTRINGS = _substring_index(_TEAM_NAMES)
+
+
+def _map_values(values, func):
+    """Applique func une seule fois par valeur distincte d'une Series/liste."""
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    uniques = series.dropna().unique()
+    return series.map({value: func(value) for value in uniques})
+
+
+@lru_cache(maxsize=1024)
 def get_team_color(team_name):
     """Retourne la couleur d'une équipe."""
-    for team, color in TEAM_COLORS.items():
-        if team.lower() in team_name.lower() or team_name.lower() in team.lower():
-            return color
-    return "#FFFFFF"
+    query = team_name.lower()
+    
+    # Équipe dont le nom contient la requête
+    best = _TEAM_SUBSTRINGS.get(query)
+    
+    # Équipe dont le nom est contenu dans la requête
+    for i in range(len(query)):
+        for j in range(i + 1, len(query) + 1):
+            rank = _TEAM_RANKS.get(query[i:j])
+            if rank is not None and (best is None or rank < best):
+                best = rank
+    
+    if best is None:
+        return "#FFFFFF"
+    return TEAM_COLORS[_TEAM_NAMES[best]]
+
+def get_team_colors(team_names):
+    """Version vectorisée de get_team_color (Series ou liste de noms)."""
+    return _map_values(team_names, get_team_color)
 
 def get_driver_number(driver_name):
     """Retourne le numéro d'un pilote à partir de son nom."""
-    for number, name in DRIVERS_MAP.items():
-        if name.lower() == driver_name.lower():
-            return number
-    return None
+    return _DRIVER_NUMBER_INDEX.get(driver_name.lower())
+
+def get_driver_numbers(driver_names):
+    """Version vectorisée de get_driver_number (Series ou liste de noms)."""
+    return _map_values(driver_names, get_driver_number).astype('Int64')
 
 def get_constructor_id(constructor_name):
     """Retourne l'ID d'un constructeur à partir de son nom."""
-    for cid, name in CONSTRUCTORS_MAP.items():
-        if name.lower() == constructor_name.lower():
-            return cid
-    return None
+    return _CONSTRUCTOR_ID_INDEX.get(constructor_name.lower())
+
+def get_constructor_ids(constructor_names):
+    """Version vectorisée de get_constructor_id (Series ou liste de noms)."""
+    return _map_values(constructor_names, get_constructor_id).astype('Int64')
 
 def get_circuit_id(circuit_name):
     """Retourne l'ID d'un circuit à partir de son nom."""
-    for cid, name in CIRCUITS_MAP.items():
-        if circuit_name.lower() in name.lower():
-            return cid
-    return None
+    rank = _CIRCUIT_SUBSTRINGS.get(circuit_name.lower())
+    return None if rank is None else _CIRCUIT_IDS[rank]
+
+def get_circuit_ids(circuit_names):
+    """Version vectorisée de get_circuit_id (Series ou liste de noms)."""
+    return _map_values(circuit_names, get_circuit_id).astype('Int64')
 
 
 # =============================================================================
@@ -242,34 +454,73 @@ def get_circuit_id(circuit_name):
 class F1DataLoader:
     """Classe pour charger et gérer les données F1."""
     
-    def __init__(self, csv_path=None):
-        self.csv_path = csv_path or CSV_PATH
+    def __init__(self, csv_path=None, use_cache=True, cache_dir=None, partitions_dir=None):
+        self.csv_path = Path(csv_path or CSV_PATH)
+        self.use_cache = use_cache and pa is not None
+        self.cache_dir = Path(cache_dir or CACHE_DIR)
+        self.partitions_dir = Path(partitions_dir or PARTITIONS_DIR)
         self.df = None
         self.loaded = False
+        self.memory_report = None
+        
+        # Index construits au chargement (clé -> positions des lignes)
+        self._year_rows = {}
+        self._driver_rows = {}
+        self._year_driver_rows = {}
+        self._circuit_rows = {}
+        self._location_index = {}
         
+        # Classements pré-calculés
+        self._round_points = {}
+        self._standings_cache = {}
+        
+        # Agrégats historiques (construits au premier appel de get_feature_store)
+        self._feature_store = None
+        self._driver_ids = {}
+        
+        # Partitions ingérées (version du manifeste, fichiers déjà lus, abonnés)
+        self.partitions_version = 0
+        self._partitions_seen = set()
+        self._manifest_signature = None
+        self._listeners = []
+        self._ingest_lock = threading.RLock()
+        
+    @property
+    def cache_path(self):
+        """Chemin du cache Arrow associé au CSV."""
+        return self.cache_dir / f"{self.csv_path.stem}.arrow"
+    
+    @property
+    def feature_store_path(self):
+        """Chemin du feature store persisté associé au CSV."""
+        return self.cache_dir / f"{self.csv_path.stem}.features.arrow"
+    
+    @property
+    def manifest_path(self):
+        """Manifeste des partitions ingérées."""
+        return self.partitions_dir / MANIFEST_NAME
+    
     def load(self):
-        """Charge le CSV."""
+        """Charge le CSV (via le cache Arrow s'il est à jour) puis les partitions ingérées."""
         try:
-            self.df = pd.read_csv(self.csv_path)
-            
-            # Ajouter les colonnes de noms
-            if 'number_driver' in self.df.columns:
-                self.df['driver_name'] = self.df['number_driver'].map(DRIVERS_MAP)
-                self.df['driver_name'] = self.df['driver_name'].fillna(
-                    self.df['number_driver'].apply(lambda x: f"Pilote #{x}")
-                )
+            df = self._load_cache() if self.use_cache else None
             
-            if 'constructorId' in self.df.columns:
-                self.df['constructor_name'] = self.df['constructorId'].map(CONSTRUCTORS_MAP)
-                self.df['constructor_name'] = self.df['constructor_name'].fillna(
-                    self.df['constructorId'].apply(lambda x: f"Constructeur #{x}")
-                )
+            if df is None:
+                df = self._enrich(pd.read_csv(self.csv_path))
+                self.memory_report = apply_schema(df)
+                if self.use_cache:
+                    self._write_cache(df)
             
-            if 'circuitId' in self.df.columns:
-                self.df['circuit_name'] = self.df['circuitId'].map(CIRCUITS_MAP)
-                # Utiliser 'location' si circuit_name est manquant
-                if 'location' in self.df.columns:
-                    self.df['circuit_name'] = self.df['circuit_name'].fillna(self.df['location'])
+            with self._ingest_lock:
+                self.df = df
+                self._feature_store = None
+                self._build_indexes()
+                self._build_standings()
+                
+                self.partitions_version = 0
+                self._partitions_seen = set()
+                self._manifest_signature = None
+                self._refresh(notify=False)
             
             self.loaded = True
             return True
@@ -278,6 +529,403 @@ class F1DataLoader:
             print(f"Erreur de chargement: {e}")
             return False
     
+    @staticmethod
+    def _enrich(df):
+        """Ajoute les colonnes de noms (pilote, constructeur, circuit)."""
+        if 'number_driver' in df.columns:
+            df['driver_name'] = df['number_driver'].map(DRIVERS_MAP).fillna(
+                "Pilote #" + df['number_driver'].astype(str)
+            )
+        
+        if 'constructorId' in df.columns:
+            df['constructor_name'] = df['constructorId'].map(CONSTRUCTORS_MAP).fillna(
+                "Constructeur #" + df['constructorId'].astype(str)
+            )
+        
+        if 'circuitId' in df.columns:
+            df['circuit_name'] = df['circuitId'].map(CIRCUITS_MAP)
+            # Utiliser 'location' si circuit_name est manquant
+            if 'location' in df.columns:
+                df['circuit_name'] = df['circuit_name'].fillna(df['location'])
+        
+        return df
+    
+    def _build_indexes(self):
+        """
+        Construit les index de groupes (année, pilote, circuit, location)
+        une seule fois, pour des recherches sans rescanner le DataFrame.
+        """
+        self._year_rows = {}
+        self._driver_rows = {}
+        self._year_driver_rows = {}
+        self._circuit_rows = {}
+        self._driver_ids = {}
+        self._location_index = {}
+        self._extend_indexes(self.df, 0)
+    
+    def _extend_indexes(self, df, offset):
+        """
+        Ajoute aux index les lignes de `df`, situées à partir de la
+        position `offset` dans self.df (ingestion incrémentale).
+        """
+        cols = df.columns
+        
+        def extend(index, keys):
+            if not all(k in cols for k in keys):
+                return
+            grouped = df.groupby(keys if len(keys) > 1 else keys[0], observed=True, sort=False)
+            for key, rows in grouped.indices.items():
+                key = _plain_key(key)
+                rows = rows + offset
+                index[key] = rows if key not in index else np.concatenate([index[key], rows])
+        
+        extend(self._year_rows, ['year'])
+        extend(self._driver_rows, ['driver_name'])
+        extend(self._year_driver_rows, ['year', 'driver_name'])
+        extend(self._circuit_rows, ['circuitId'])
+        
+        if 'driver_name' in cols and 'driverId' in cols:
+            # Dernier driverId connu pour chaque nom (le plus récent l'emporte)
+            pairs = df[['driver_name', 'driverId']].dropna().drop_duplicates('driver_name', keep='last')
+            self._driver_ids.update(
+                (str(name).lower(), int(did)) for name, did in zip(pairs['driver_name'], pairs['driverId'])
+            )
+        
+        if 'location' in cols and 'circuitId' in cols:
+            pairs = df[['location', 'circuitId']].dropna().drop_duplicates('location')
+            for loc, cid in zip(pairs['location'], pairs['circuitId']):
+                self._location_index.setdefault(str(loc).lower(), int(cid))
+    
+    def _rows(self, index, key):
+        """Sous-ensemble du DataFrame pour une clé d'index (DataFrame vide si absente)."""
+        rows = index.get(key)
+        if rows is None:
+            return self.df.iloc[0:0]
+        return self.df.iloc[rows]
+    
+    def get_year_data(self, year):
+        """Retourne les lignes d'une saison (via l'index par année)."""
+        if self.df is None:
+            return None
+        return self._rows(self._year_rows, year)
+    
+    def get_driver_data(self, driver_name, year=None):
+        """Retourne les lignes d'un pilote, éventuellement pour une seule saison."""
+        if self.df is None:
+            return None
+        if year is None:
+            return self._rows(self._driver_rows, driver_name)
+        return self._rows(self._year_driver_rows, (year, driver_name))
+    
+    def get_circuit_data(self, circuit_id):
+        """Retourne les lignes d'un circuit (via l'index par circuitId)."""
+        if self.df is None:
+            return None
+        return self._rows(self._circuit_rows, circuit_id)
+    
+    def _source_signature(self):
+        """Signature (mtime, taille) du CSV source."""
+        stat = os.stat(self.csv_path)
+        return str(stat.st_mtime_ns), str(stat.st_size)
+    
+    def _source_hash(self):
+        """Empreinte SHA-256 du CSV source."""
+        digest = hashlib.sha256()
+        with open(self.csv_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def _matches_source(self, meta):
+        """
+        Vérifie qu'un fichier dérivé (métadonnées str -> str) correspond au CSV.
+        
+        Le mtime/taille évite de relire le CSV ; en cas de différence
+        (fichier touché), l'empreinte SHA-256 tranche.
+        """
+        if (meta.get('source_mtime_ns'), meta.get('source_size')) == self._source_signature():
+            return True
+        return meta.get('source_sha256') == self._source_hash()
+    
+    def _source_metadata(self):
+        """Métadonnées identifiant le CSV source (signature et empreinte)."""
+        mtime, size = self._source_signature()
+        return {"source_mtime_ns": mtime, "source_size": size, "source_sha256": self._source_hash()}
+    
+    def _load_cache(self):
+        """
+        Charge le cache Arrow en mémoire mappée s'il correspond au CSV.
+        """
+        if not self.cache_path.exists():
+            return None
+        
+        try:
+            source = pa.memory_map(str(self.cache_path), 'r')
+            reader = pa.ipc.open_file(source)
+            meta = reader.schema.metadata or {}
+            
+            if meta.get(b'cache_version', b'').decode() != CACHE_VERSION:
+                return None
+            
+            if not self._matches_source({k.decode(): v.decode() for k, v in meta.items() if k != b'pandas'}):
+                return None
+            
+            df = reader.read_all().to_pandas(split_blocks=True, types_mapper=_arrow_string_mapper)
+            self.memory_report = {
+                "before": int(meta.get(b'memory_before', b'0')),
+                "after": int(df.memory_usage(deep=True).sum()),
+                "skipped": [],
+            }
+            return df
+        except (OSError, pa.ArrowException):
+            return None
+    
+    def _write_cache(self, df):
+        """Écrit le DataFrame enrichi en Arrow IPC (écriture atomique)."""
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}),
+                b'cache_version': CACHE_VERSION.encode(),
+                **{k.encode(): v.encode() for k, v in self._source_metadata().items()},
+                b'memory_before': str((self.memory_report or {}).get("before", 0)).encode(),
+            })
+            
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with pa.OSFile(str(tmp_path), 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Cache Arrow non écrit: {e}")
+    
+    # -------------------------------------------------------------------------
+    # Ingestion incrémentale
+    # -------------------------------------------------------------------------
+    def validate_rows(self, rows):
+        """
+        Valide de nouveaux résultats (DataFrame ou liste de dicts) contre
+        les colonnes du dataset et RESULTS_SCHEMA.
+        
+        Returns:
+            DataFrame aux colonnes du CSV, types numériques convertis
+        
+        Raises:
+            ValueError: colonnes manquantes/inconnues, valeurs non numériques
+                        ou hors schéma, lignes (raceId, driverId) en double
+        """
+        if self.df is None:
+            raise ValueError("Données non chargées : appeler load() avant d'ingérer")
+        
+        rows = pd.DataFrame(rows).reset_index(drop=True)
+        columns = [c for c in self.df.columns if c not in NAME_COLUMNS]
+        
+        # Colonne d'index du CSV : numérotation continuée si absente
+        if 'Unnamed: 0' in columns and 'Unnamed: 0' not in rows.columns:
+            start = int(self.df['Unnamed: 0'].max()) + 1 if len(self.df) else 0
+            rows['Unnamed: 0'] = np.arange(start, start + len(rows))
+        
+        missing = [c for c in columns if c not in rows.columns]
+        if missing:
+            raise ValueError(f"Colonnes manquantes: {', '.join(missing)}")
+        unknown = [c for c in rows.columns if c not in columns and c not in NAME_COLUMNS]
+        if unknown:
+            raise ValueError(f"Colonnes inconnues: {', '.join(map(str, unknown))}")
+        rows = rows[columns].copy()
+        
+        for col in columns:
+            dtype = RESULTS_SCHEMA.get(col)
+            if dtype is None or dtype in ('category', 'string[pyarrow]'):
+                continue
+            values = pd.to_numeric(rows[col], errors='coerce')
+            if (values.isna() & rows[col].notna()).any():
+                raise ValueError(f"Valeurs non numériques dans {col}")
+            if str(self.df[col].dtype) == dtype and not _fits_dtype(values, dtype):
+                raise ValueError(f"Valeurs hors schéma dans {col} ({dtype})")
+            rows[col] = values
+        
+        if rows.duplicated(ROW_KEY).any():
+            raise ValueError("Lignes (raceId, driverId) en double")
+        known = set(self.df['raceId'].unique().tolist())
+        already = sorted(set(rows['raceId'].astype(int).tolist()) & known)
+        if already:
+            raise ValueError(f"Courses déjà présentes: {already}")
+        
+        return rows
+    
+    @contextmanager
+    def _manifest_lock(self):
+        """
+        Verrou inter-processus (fichier manifest.lock) autour de la séquence
+        lecture -> écriture -> renommage du manifeste : deux ingestions
+        concurrentes (application Streamlit, tâche cron...) ne perdent pas
+        les partitions l'une de l'autre.
+        """
+        self.partitions_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.partitions_dir / MANIFEST_LOCK_NAME, 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK abandonne après ~10 s : on réessaie
+                        time.sleep(0.1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    
+    def ingest(self, rows):
+        """
+        Ajoute les résultats d'une ou plusieurs nouvelles courses sans réécrire le CSV.
+        
+        Les lignes validées sont écrites dans une partition Parquet par
+        (année, manche), enregistrées dans le manifeste (version + 1), puis
+        ajoutées en mémoire : index, classements et feature store sont mis à
+        jour sans recharger l'historique, et les abonnés sont notifiés.
+        Le manifeste est relu et réécrit sous un verrou inter-processus.
+        
+        Returns:
+            Nombre de lignes ajoutées
+        """
+        with self._ingest_lock, self._manifest_lock():
+            # Partitions écrites entre-temps par un autre processus (relues sous le verrou)
+            self._refresh()
+            
+            rows = self.validate_rows(rows)
+            if rows.empty:
+                return 0
+            
+            manifest = self._read_manifest()
+            version = manifest["version"] + 1
+            written = []
+            for (year, rnd), part in rows.groupby(['year', 'round'], sort=True):
+                rel_path = f"year={int(year)}/round={int(rnd):02d}/part-{version:05d}.parquet"
+                path = self.partitions_dir / rel_path
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+                pq.write_table(pa.Table.from_pandas(part, preserve_index=False), str(tmp_path))
+                os.replace(tmp_path, path)
+                written.append({"path": rel_path, "year": int(year), "round": int(rnd), "rows": len(part)})
+            
+            self._write_manifest({"version": version, "partitions": manifest["partitions"] + written})
+            self._partitions_seen.update(entry["path"] for entry in written)
+            self._manifest_signature = self._manifest_stat()
+            self.partitions_version = version
+            
+            self._append(rows)
+            return len(rows)
+    
+    def subscribe(self, callback):
+        """Appelle `callback(nouvelles_lignes)` après chaque ingestion ou rafraîchissement."""
+        self._listeners.append(callback)
+        return callback
+    
+    def changes_pending(self):
+        """Vérification peu coûteuse (stat du manifeste) de partitions non encore chargées."""
+        return self._manifest_stat() != self._manifest_signature
+    
+    def refresh(self):
+        """
+        Charge les partitions ajoutées (par ce processus ou un autre)
+        depuis le dernier chargement ; sans effet si le manifeste n'a pas changé.
+        
+        Returns:
+            Nombre de lignes ajoutées
+        """
+        if self.df is None or not self.changes_pending():
+            return 0
+        with self._ingest_lock:
+            return self._refresh()
+    
+    def _refresh(self, notify=True):
+        signature = self._manifest_stat()
+        if signature == self._manifest_signature:
+            return 0
+        
+        manifest = self._read_manifest()
+        entries = [e for e in manifest["partitions"] if e["path"] not in self._partitions_seen]
+        parts = [
+            pq.read_table(str(self.partitions_dir / e["path"]), partitioning=None).to_pandas(types_mapper=_arrow_string_mapper)
+            for e in entries
+        ]
+        self._partitions_seen.update(e["path"] for e in entries)
+        self._manifest_signature = signature
+        self.partitions_version = manifest["version"]
+        
+        if not parts:
+            return 0
+        rows = pd.concat(parts, ignore_index=True)
+        self._append(rows, notify=notify)
+        return len(rows)
+    
+    def _manifest_stat(self):
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _read_manifest(self):
+        """Manifeste {"version", "partitions": [{"path", "year", "round", "rows"}]}."""
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"version": 0, "partitions": []}
+    
+    def _write_manifest(self, manifest):
+        """Écriture atomique du manifeste (les lecteurs voient l'ancienne ou la nouvelle version)."""
+        self.partitions_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+    
+    def _append(self, rows, notify=True):
+        """Ajoute des lignes validées en mémoire et met à jour les structures dérivées."""
+        new = self._enrich(rows)
+        apply_schema(new)
+        
+        # Mêmes types que l'historique (catégories étendues plutôt que repassées en object)
+        for col in new.columns:
+            if col not in self.df.columns:
+                continue
+            dtype = self.df[col].dtype
+            if isinstance(dtype, pd.CategoricalDtype):
+                extra = pd.Index(new[col].dropna().astype(object).unique()).difference(dtype.categories)
+                if len(extra):
+                    self.df[col] = self.df[col].cat.add_categories(extra)
+                new[col] = new[col].astype(object).astype(self.df[col].dtype)
+            elif new[col].dtype != dtype:
+                new[col] = new[col].astype(dtype)
+        
+        offset = len(self.df)
+        self.df = pd.concat([self.df, new[self.df.columns]], ignore_index=True)
+        self._extend_indexes(new, offset)
+        self._extend_standings(new)
+        
+        if self._feature_store is not None:
+            try:
+                self._feature_store.update(new)
+                self._save_feature_store(self._feature_store)
+            except ValueError:
+                # Course antérieure à l'historique du store : reconstruit au prochain appel
+                self._feature_store = None
+        
+        if notify:
+            for callback in self._listeners:
+                callback(new)
+    
     def get_all_drivers(self):
         """Retourne la liste de tous les pilotes uniques."""
         if self.df is not None and 'driver_name' in self.df.columns:
@@ -306,31 +954,30 @@ class F1DataLoader:
     def get_driver_info(self, driver_name):
         """Retourne les infos d'un pilote."""
         # Chercher dans la grille 2025
-        for driver in GRID_2025:
-            if driver["name"].lower() == driver_name.lower():
-                return driver
+        driver = _GRID_INDEX.get(driver_name.lower())
+        if driver is not None:
+            return driver
         
         # Chercher dans le dataset
-        if self.df is not None and 'driver_name' in self.df.columns:
-            driver_df = self.df[self.df['driver_name'] == driver_name]
-            if not driver_df.empty:
-                row = driver_df.iloc[-1]  # Prendre la dernière entrée
-                return {
-                    "name": driver_name,
-                    "number": row.get('number_driver', 0),
-                    "team": row.get('constructor_name', 'Unknown'),
-                    "constructor_id": row.get('constructorId', 0)
-                }
+        rows = self._driver_rows.get(driver_name)
+        if self.df is not None and rows is not None:
+            row = self.df.iloc[rows[-1]]  # Prendre la dernière entrée
+            return {
+                "name": driver_name,
+                "number": row.get('number_driver', 0),
+                "team": row.get('constructor_name', 'Unknown'),
+                "constructor_id": row.get('constructorId', 0)
+            }
         
         # Chercher dans le mapping
-        for number, name in DRIVERS_MAP.items():
-            if name.lower() == driver_name.lower():
-                return {
-                    "name": name,
-                    "number": number,
-                    "team": "Unknown",
-                    "constructor_id": 0
-                }
+        number = get_driver_number(driver_name)
+        if number is not None:
+            return {
+                "name": DRIVERS_MAP[number],
+                "number": number,
+                "team": "Unknown",
+                "constructor_id": 0
+            }
         
         return None
     
@@ -338,83 +985,151 @@ class F1DataLoader:
         """Retourne le constructeur d'un pilote pour une année donnée."""
         # Chercher dans la grille 2025
         if year >= 2025:
-            for driver in GRID_2025:
-                if driver["name"].lower() == driver_name.lower():
-                    return driver["team"]
+            driver = _GRID_INDEX.get(driver_name.lower())
+            if driver is not None:
+                return driver["team"]
         
         # Chercher dans le dataset
-        if self.df is not None:
-            df_filtered = self.df.copy()
-            
-            if 'year' in df_filtered.columns:
-                df_filtered = df_filtered[df_filtered['year'] == year]
-            
-            if 'driver_name' in df_filtered.columns:
-                driver_df = df_filtered[df_filtered['driver_name'] == driver_name]
-                if not driver_df.empty:
-                    return driver_df['constructor_name'].iloc[-1]
+        rows = self._year_driver_rows.get((year, driver_name))
+        if self.df is not None and rows is not None and 'constructor_name' in self.df.columns:
+            return self.df['constructor_name'].iat[rows[-1]]
         
         return None
     
     def get_circuit_id_from_name(self, circuit_name):
         """Retourne l'ID du circuit à partir de son nom."""
         # Chercher dans le mapping
-        for cid, name in CIRCUITS_MAP.items():
-            if circuit_name.lower() in name.lower():
-                return cid
+        cid = get_circuit_id(circuit_name)
+        if cid is not None:
+            return cid
         
         # Chercher dans le dataset via location
-        if self.df is not None and 'location' in self.df.columns:
-            circuit_df = self.df[self.df['location'].str.lower() == circuit_name.lower()]
-            if not circuit_df.empty:
-                return circuit_df['circuitId'].iloc[0]
+        return self._location_index.get(circuit_name.lower())
+    
+    def get_driver_id(self, driver_name):
+        """Retourne le driverId du dataset pour un nom de pilote (None si inconnu)."""
+        return self._driver_ids.get(driver_name.lower())
+    
+    def get_feature_store(self, window=5):
+        """
+        Feature store historique (agrégats par pilote/circuit/année), relu
+        depuis le cache s'il correspond au CSV, sinon construit puis persisté.
+        """
+        if self.df is None:
+            return None
+        if self._feature_store is not None and self._feature_store.window == window:
+            return self._feature_store
         
-        return None
+        store = None
+        if self.use_cache:
+            meta = FeatureStore.read_metadata(self.feature_store_path)
+            if (meta is not None and meta.get('window') == str(window)
+                    and meta.get('partitions_version') == str(self.partitions_version)
+                    and self._matches_source(meta)):
+                store = FeatureStore.read(self.feature_store_path)
+        
+        if store is None:
+            store = FeatureStore.build(self.df, window=window)
+            self._save_feature_store(store)
+        
+        self._feature_store = store
+        return store
+    
+    def _save_feature_store(self, store):
+        """Persiste le feature store avec la signature du CSV et la version des partitions."""
+        if not self.use_cache:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            store.save(self.feature_store_path, metadata={
+                **self._source_metadata(), "partitions_version": self.partitions_version,
+            })
+        except OSError as e:
+            print(f"Feature store non écrit: {e}")
     
     def get_unique_years(self):
         """Retourne les années disponibles."""
-        if self.df is not None and 'year' in self.df.columns:
-            return sorted(self.df['year'].dropna().unique().tolist(), reverse=True)
+        if self.df is not None and self._year_rows:
+            return sorted(self._year_rows, reverse=True)
         return [2025, 2024, 2023, 2022, 2021, 2020]
     
-    def get_latest_standings(self, year=2024):
-        """Retourne le classement pilotes pour une année."""
-        if self.df is None or 'year' not in self.df.columns:
-            return None
+    def _standings(self, kind, year):
+        """
+        Classement final et progression cumulée par manche pour une saison,
+        calculés une seule fois par (kind, année) puis servis depuis la mémoire.
         
-        df_year = self.df[self.df['year'] == year]
+        Args:
+            kind: "driver" ou "constructor"
         
-        if df_year.empty:
-            return None
+        Returns:
+            (classement, progression) ou None si pas de données
+        """
+        key = (kind, year)
+        if key in self._standings_cache:
+            return self._standings_cache[key]
         
-        # Calculer les points totaux par pilote
-        if 'driver_name' in df_year.columns and 'points' in df_year.columns:
-            standings = df_year.groupby('driver_name')['points'].sum().reset_index()
-            standings = standings.sort_values('points', ascending=False).reset_index(drop=True)
-            standings['position'] = range(1, len(standings) + 1)
-            standings.columns = ['Pilote', 'Points', 'Position']
-            return standings[['Position', 'Pilote', 'Points']]
-        
-        return None
-    
-    def get_constructor_standings(self, year=2024):
-        """Retourne le classement constructeurs pour une année."""
-        if self.df is None or 'year' not in self.df.columns:
+        name_col, label = STANDINGS_KINDS[kind]
+        round_points = self._round_points.get(kind)
+        if round_points is None or year not in self._year_rows:
             return None
         
-        df_year = self.df[self.df['year'] == year]
+        # Points par manche (manches × noms), cumulés pour la progression
+        season = round_points.xs(year, level='year')
+        season.index = season.index.remove_unused_levels()
+        progression = season.unstack(name_col, fill_value=0).sort_index().cumsum()
+        progression.columns = progression.columns.astype(str)
+        progression.columns.name = label
         
-        if df_year.empty:
-            return None
+        standings = progression.iloc[-1].sort_index().rename('points').reset_index()
+        standings = standings.sort_values('points', ascending=False).reset_index(drop=True)
+        standings['position'] = range(1, len(standings) + 1)
+        standings.columns = [label, 'Points', 'Position']
+        standings = standings[['Position', label, 'Points']]
+        
+        self._standings_cache[key] = (standings, progression)
+        return self._standings_cache[key]
+    
+    def _build_standings(self):
+        """Points par (année, manche, pilote/constructeur) en un seul groupby par type."""
+        self._round_points = {}
+        self._standings_cache = {}
+        self._extend_standings(self.df)
+    
+    def _extend_standings(self, df):
+        """Ajoute les points de nouvelles lignes et invalide les classements des saisons touchées."""
+        if not {'year', 'round', 'points'}.issubset(df.columns):
+            return
         
-        if 'constructor_name' in df_year.columns and 'points' in df_year.columns:
-            standings = df_year.groupby('constructor_name')['points'].sum().reset_index()
-            standings = standings.sort_values('points', ascending=False).reset_index(drop=True)
-            standings['position'] = range(1, len(standings) + 1)
-            standings.columns = ['Constructeur', 'Points', 'Position']
-            return standings[['Position', 'Constructeur', 'Points']]
+        for kind, (name_col, _) in STANDINGS_KINDS.items():
+            if name_col not in df.columns:
+                continue
+            points = df.groupby(['year', 'round', name_col], observed=True)['points'].sum()
+            previous = self._round_points.get(kind)
+            if previous is not None:
+                points = pd.concat([previous, points]).groupby(level=[0, 1, 2], observed=True).sum()
+            self._round_points[kind] = points
         
-        return None
+        for year in df['year'].unique().tolist():
+            for kind in STANDINGS_KINDS:
+                self._standings_cache.pop((kind, year), None)
+    
+    def get_latest_standings(self, year=2024):
+        """Retourne le classement pilotes pour une année."""
+        result = self._standings("driver", year)
+        return None if result is None else result[0].copy()
+    
+    def get_constructor_standings(self, year=2024):
+        """Retourne le classement constructeurs pour une année."""
+        result = self._standings("constructor", year)
+        return None if result is None else result[0].copy()
+    
+    def get_standings_progression(self, year=2024, kind="driver"):
+        """
+        Retourne les points cumulés manche par manche (index = manche,
+        colonnes = pilotes ou constructeurs selon `kind`).
+        """
+        result = self._standings(kind, year)
+        return None if result is None else result[1].copy()
     
     def get_columns(self):
         """Retourne la liste des colonnes."""
@@ -0,0 +1,352 @@
+"""
+Feature store historique dérivé du CSV de résultats
+
+Agrégats glissants par pilote (forme récente, écarts de qualification à la
+pole, rythme relatif, arrêts aux stands) et références par circuit (pole,
+tour moyen, meilleur tour, nombre de tours de la dernière édition), calculés
+en une passe groupby/rolling vectorisée et indexés par (driverId, circuitId, year).
+
+Chaque entrée ne contient que l'information connue *avant* la course
+(aucune fuite de son résultat). Les entrées par défaut d'une course se
+lisent en O(1) ; une clé absente (course future) combine le dernier état
+connu du pilote et la dernière édition du circuit.
+
+Usage :
+    store = FeatureStore.build(loader.df)
+    store.default_inputs(driver_id=830, circuit_id=3, year=2025)
+    store.update(nouvelles_lignes)         # courses ajoutées en fin d'historique
+    store.save(path) ; FeatureStore.read(path)
+"""
+import os
+
+import numpy as np
+
+from src.features import times_to_seconds
+from src.lazy import lazy_import
+
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+
+STORE_VERSION = "1"
+
+KEY_COLUMNS = ['driverId', 'circuitId', 'year']
+ORDER_COLUMNS = ['year', 'round']
+
+# Colonnes du CSV nécessaires à la construction
+SOURCE_COLUMNS = KEY_COLUMNS + [
+    'raceId', 'round', 'points', 'positionOrder', 'grid', 'q1', 'q2', 'q3',
+    'fastestLapTime', 'avg_lap_ms', 'pit_stop_count', 'avg_pit_duration_s', 'laps',
+]
+
+# Références par course (une valeur par raceId), reprises par circuit
+RACE_REFERENCES = {
+    'pole_q1': ('q1_sec', 'min'),
+    'pole_q2': ('q2_sec', 'min'),
+    'pole_q3': ('q3_sec', 'min'),
+    'avg_lap_ms': ('avg_lap_ms', 'median'),
+    'fastest_lap': ('fastest_lap', 'min'),
+    'laps': ('laps', 'max'),
+}
+
+# État glissant par pilote : nom -> (mesure par course, agrégat sur la fenêtre)
+DRIVER_STATE = {
+    'form_points': ('points', 'mean'),
+    'form_position': ('positionOrder', 'mean'),
+    'form_grid': ('grid', 'mean'),
+    'gap_q1': ('q1_gap', 'median'),
+    'gap_q2': ('q2_gap', 'median'),
+    'gap_q3': ('q3_gap', 'median'),
+    'q3_rate': ('reached_q3', 'mean'),
+    'pace': ('pace_ratio', 'median'),
+    'fastest_pace': ('fastest_ratio', 'median'),
+    'pit_stops': ('pit_stop_count', 'median'),
+    'pit_duration_s': ('avg_pit_duration_s', 'median'),
+}
+
+CIRCUIT_STATE = [f"ref_{name}" for name in RACE_REFERENCES]
+
+DRIVER_MEASURES = sorted({source for source, _ in DRIVER_STATE.values()})
+RACE_COLUMNS = [f"race_{name}" for name in RACE_REFERENCES]
+
+
+def _derive(df):
+    """
+    Mesures par ligne pilote-course : temps en secondes, écarts relatifs à
+    la pole et au rythme médian de la course, références de la course.
+
+    Returns:
+        DataFrame trié par (year, round), index 0..n-1
+    """
+    missing = [c for c in SOURCE_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Colonnes manquantes: {', '.join(missing)}")
+
+    rows = pd.DataFrame({c: df[c].to_numpy() for c in KEY_COLUMNS + ['raceId', 'round']})
+    for col in ['points', 'positionOrder', 'grid', 'avg_lap_ms', 'pit_stop_count',
+                'avg_pit_duration_s', 'laps']:
+        rows[col] = df[col].to_numpy(dtype=float)
+
+    # Sentinelles (999 pour les temps de qualification, 9999 pour le meilleur tour) -> NaN
+    for stage in ('q1', 'q2', 'q3'):
+        seconds = times_to_seconds(df[stage].to_numpy(dtype=object))
+        rows[f'{stage}_sec'] = np.where(seconds >= 999, np.nan, seconds)
+    fastest = df['fastestLapTime'].to_numpy(dtype=float)
+    rows['fastest_lap'] = np.where(fastest >= 999, np.nan, fastest)
+
+    race = rows.groupby('raceId', sort=False)
+    for name, (source, agg) in RACE_REFERENCES.items():
+        rows[f'race_{name}'] = race[source].transform(agg)
+
+    for stage in ('q1', 'q2', 'q3'):
+        rows[f'{stage}_gap'] = rows[f'{stage}_sec'] / rows[f'race_pole_{stage}'] - 1
+    rows['reached_q3'] = rows['q3_sec'].notna().astype(float)
+    rows['pace_ratio'] = rows['avg_lap_ms'] / rows['race_avg_lap_ms']
+    rows['fastest_ratio'] = rows['fastest_lap'] / rows['race_fastest_lap']
+
+    rows = rows[KEY_COLUMNS + ['raceId', 'round'] + DRIVER_MEASURES + RACE_COLUMNS]
+    return rows.sort_values(ORDER_COLUMNS, kind='stable').reset_index(drop=True)
+
+
+def _driver_states(rows, window):
+    """
+    État glissant de chaque pilote *après* chaque course (fenêtre de
+    `window` courses), en un passage groupby/rolling par type d'agrégat.
+    """
+    grouped = rows.groupby('driverId', sort=False)
+    states = pd.DataFrame(index=rows.index)
+    for agg in ('mean', 'median'):
+        names = [name for name, (_, a) in DRIVER_STATE.items() if a == agg]
+        sources = [DRIVER_STATE[name][0] for name in names]
+        rolled = getattr(grouped[sources].rolling(window, min_periods=1), agg)()
+        rolled = rolled.reset_index(level=0, drop=True)
+        for name, source in zip(names, sources):
+            states[name] = rolled[source]
+    return states[list(DRIVER_STATE)]
+
+
+def _race_references(rows):
+    """Références par course (une ligne par raceId), dans l'ordre chronologique."""
+    races = rows.drop_duplicates('raceId')[['raceId', 'circuitId'] + RACE_COLUMNS]
+    return races.rename(columns=dict(zip(RACE_COLUMNS, CIRCUIT_STATE)))
+
+
+def _with_states(rows, window, context=None, latest_circuits=None):
+    """
+    Ajoute aux lignes l'état pilote et les références circuit connus avant
+    chaque course.
+
+    Args:
+        rows: Lignes dérivées à compléter (triées)
+        context: Dernières lignes connues des mêmes pilotes (mise à jour incrémentale)
+        latest_circuits: Références de la dernière édition connue de chaque circuit
+    """
+    history = rows if context is None else pd.concat([context, rows], ignore_index=True)
+    before = _driver_states(history, window).groupby(history['driverId'].to_numpy()).shift(1)
+    before = before.iloc[len(history) - len(rows):].reset_index(drop=True)
+
+    races = _race_references(rows)
+    if latest_circuits is not None and len(latest_circuits):
+        races = pd.concat([latest_circuits.assign(raceId=-1), races], ignore_index=True)
+    refs = races.groupby('circuitId', sort=False)[CIRCUIT_STATE].shift(1)
+    refs['raceId'] = races['raceId'].to_numpy()
+    refs = refs[refs['raceId'] >= 0]
+
+    out = pd.concat([rows.reset_index(drop=True), before], axis=1)
+    return out.merge(refs, on='raceId', how='left', sort=False)
+
+
+class FeatureStore:
+    """Agrégats historiques par (driverId, circuitId, year), persistés et mis à jour incrémentalement."""
+
+    def __init__(self, table, window=5):
+        """
+        Args:
+            table: Lignes dérivées + états (voir build)
+            window: Nombre de courses de la fenêtre glissante
+        """
+        self.window = window
+        self.table = table.reset_index(drop=True)
+        self._index()
+
+    @classmethod
+    def build(cls, df, window=5):
+        """Construit le store à partir du DataFrame de résultats complet."""
+        rows = _derive(df)
+        return cls(_with_states(rows, window), window)
+
+    # ------------------------------------------------------------------
+    # Index et lecture
+    # ------------------------------------------------------------------
+    def _index(self):
+        """Dicts clé -> état : entrées historiques et derniers états connus."""
+        self._entries = {}
+        self._latest_drivers = {}
+        self._latest_circuits = {}
+        self._extend_index(self.table, self.table)
+
+    def _extend_index(self, added, history):
+        """
+        Indexe de nouvelles lignes.
+
+        Args:
+            added: Lignes ajoutées (avec états)
+            history: Lignes des pilotes concernés, dont au moins leurs `window` dernières
+        """
+        columns = list(DRIVER_STATE) + CIRCUIT_STATE
+
+        # Deux courses au même circuit la même année : l'état avant la première (sans fuite)
+        first = added.drop_duplicates(KEY_COLUMNS, keep='first')
+        keys = zip(*(first[c].astype(int).tolist() for c in KEY_COLUMNS))
+        for key, entry in zip(keys, first[columns].to_dict('records')):
+            self._entries.setdefault(key, entry)
+
+        # État après la dernière course de chaque pilote / références de la dernière édition
+        context = history.groupby('driverId', sort=False).tail(self.window).reset_index(drop=True)
+        after = pd.concat([context[['driverId']], _driver_states(context, self.window)], axis=1)
+        after = after.groupby('driverId', sort=False).tail(1)
+        self._latest_drivers.update(zip(after['driverId'].astype(int).tolist(),
+                                        after[list(DRIVER_STATE)].to_dict('records')))
+
+        circuits = _race_references(added).groupby('circuitId', sort=False).tail(1)
+        self._latest_circuits.update(zip(circuits['circuitId'].astype(int).tolist(),
+                                         circuits[CIRCUIT_STATE].to_dict('records')))
+
+    def __len__(self):
+        return len(self.table)
+
+    def lookup(self, driver_id, circuit_id, year):
+        """
+        Agrégats connus avant la course (pilote, circuit, année).
+
+        Returns:
+            Dict état pilote + références circuit (NaN si inconnus), ou None
+            si ni le pilote ni le circuit n'ont d'historique
+        """
+        entry = self._entries.get((int(driver_id), int(circuit_id), int(year)))
+        if entry is not None:
+            return dict(entry)
+
+        driver = self._latest_drivers.get(int(driver_id))
+        circuit = self._latest_circuits.get(int(circuit_id))
+        if driver is None and circuit is None:
+            return None
+
+        entry = dict.fromkeys(list(DRIVER_STATE) + CIRCUIT_STATE, np.nan)
+        entry.update(driver or {})
+        entry.update(circuit or {})
+        return entry
+
+    def circuit_reference(self, circuit_id):
+        """Références (pole Q1/Q2/Q3, tour moyen, meilleur tour, tours) de la dernière édition, ou None."""
+        refs = self._latest_circuits.get(int(circuit_id))
+        return None if refs is None else dict(refs)
+
+    def default_inputs(self, driver_id, circuit_id, year):
+        """
+        Entrées driver_win par défaut d'un pilote pour une course :
+        temps de référence du circuit × écarts habituels du pilote.
+
+        Returns:
+            Dict des arguments de build_driver_win_matrix (NaN si inconnus ;
+            q3_sec = 999.0 si le pilote atteint rarement la Q3), ou None
+        """
+        entry = self.lookup(driver_id, circuit_id, year)
+        if entry is None:
+            return None
+
+        grid = entry['form_grid']
+        return {
+            'grid': float(np.clip(np.round(grid), 1, 20)) if grid == grid else np.nan,
+            'laps': entry['ref_laps'],
+            'q1_sec': entry['ref_pole_q1'] * (1 + entry['gap_q1']),
+            'q2_sec': entry['ref_pole_q2'] * (1 + entry['gap_q2']),
+            'q3_sec': entry['ref_pole_q3'] * (1 + entry['gap_q3']) if entry['q3_rate'] >= 0.5 else 999.0,
+            'fastest_lap_time': entry['ref_fastest_lap'] * entry['fastest_pace'],
+            'avg_lap_ms': entry['ref_avg_lap_ms'] * entry['pace'],
+            'pit_stop_count': float(np.round(entry['pit_stops'])),
+            'avg_pit_duration_s': entry['pit_duration_s'],
+        }
+
+    # ------------------------------------------------------------------
+    # Mise à jour incrémentale
+    # ------------------------------------------------------------------
+    def update(self, df):
+        """
+        Ajoute de nouvelles courses (complètes) en fin d'historique.
+
+        Seules les `window` dernières lignes des pilotes concernés et la
+        dernière édition des circuits concernés sont relues.
+
+        Returns:
+            Nombre de lignes ajoutées
+        """
+        rows = _derive(df)
+        if rows.empty:
+            return 0
+
+        known = set(self.table['raceId'].tolist())
+        if known.intersection(rows['raceId'].tolist()):
+            raise ValueError("Courses déjà présentes dans le feature store")
+
+        last = tuple(self.table[ORDER_COLUMNS].iloc[-1]) if len(self.table) else None
+        if last is not None and tuple(rows[ORDER_COLUMNS].iloc[0]) <= last:
+            raise ValueError(f"Les nouvelles courses doivent suivre la dernière connue {last}")
+
+        drivers = self.table['driverId'].isin(rows['driverId'].unique())
+        context = self.table[drivers].groupby('driverId', sort=False).tail(self.window)
+        context = context[rows.columns].reset_index(drop=True)
+
+        latest = pd.DataFrame(
+            [{'circuitId': cid, **self._latest_circuits[cid]}
+             for cid in rows['circuitId'].unique().tolist() if cid in self._latest_circuits],
+            columns=['circuitId'] + CIRCUIT_STATE,
+        )
+
+        added = _with_states(rows, self.window, context=context, latest_circuits=latest)
+        self.table = pd.concat([self.table, added[self.table.columns]], ignore_index=True)
+        self._extend_index(added, pd.concat([context, rows], ignore_index=True))
+        return len(added)
+
+    # ------------------------------------------------------------------
+    # Persistance (Arrow IPC, comme le cache du F1DataLoader)
+    # ------------------------------------------------------------------
+    def save(self, path, metadata=None):
+        """Écrit le store en Arrow IPC (écriture atomique)."""
+        table = pa.Table.from_pandas(self.table, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            b'store_version': STORE_VERSION.encode(),
+            b'window': str(self.window).encode(),
+            **{k.encode(): str(v).encode() for k, v in (metadata or {}).items()},
+        })
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def read_metadata(path):
+        """Métadonnées (str -> str) d'un store persisté, ou None s'il est illisible."""
+        try:
+            with pa.memory_map(str(path), 'r') as source:
+                meta = pa.ipc.open_file(source).schema.metadata or {}
+        except (OSError, pa.ArrowException):
+            return None
+        return {k.decode(): v.decode() for k, v in meta.items() if k != b'pandas'}
+
+    @classmethod
+    def read(cls, path):
+        """
+        Relit un store persisté.
+
+        Returns:
+            FeatureStore, ou None si le fichier est absent, illisible ou d'une autre version
+        """
+        meta = cls.read_metadata(path)
+        if meta is None or meta.get('store_version') != STORE_VERSION:
+            return None
+        source = pa.memory_map(str(path), 'r')
+        table = pa.ipc.open_file(source).read_all().to_pandas()
+        return cls(table, int(meta['window']))
@@ -0,0 +1,354 @@
+"""
+Format d'artefact numérique (sans pickle) pour les couples modèle/scaler
+
+Un couple est exporté en deux fichiers dans models/ :
+    <clé>.json   schéma : type de modèle et de scaler, noms des features,
+                 position (offset, forme) de chaque tableau
+    <clé>.bin    tableaux float64 little-endian contigus (moyennes, échelles,
+                 coefficients, centres de clusters), lisibles par mmap
+
+Les classes Numeric* reproduisent les opérations de sklearn dans le même
+ordre (résultats identiques bit à bit) et permettent au ModelLoader de
+scorer sans sklearn ni joblib. L'export vérifie cette parité avant d'écrire.
+
+Usage :
+    python -m src.artifacts export [--models-dir models]
+    python -m src.artifacts verify [--models-dir models]
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from src.lazy import is_dataframe
+
+FORMAT_VERSION = 1
+DTYPE = "<f8"
+
+
+def numeric_paths(key, models_dir):
+    """Chemins (schéma JSON, données binaires) d'un couple au format numérique."""
+    models_dir = Path(models_dir)
+    return models_dir / f"{key}.json", models_dir / f"{key}.bin"
+
+
+def _as_matrix(X, feature_names):
+    """Features en array float64 (copie), colonnes réordonnées si DataFrame."""
+    if is_dataframe(X) and feature_names is not None:
+        X = X[list(feature_names)]
+    return np.array(X, dtype=np.float64)
+
+
+# =============================================================================
+# ESTIMATEURS NUMÉRIQUES (interface minimale de sklearn)
+# =============================================================================
+
+class NumericStandardScaler:
+    """Équivalent de StandardScaler.transform / inverse_transform."""
+
+    def __init__(self, mean, scale, with_mean=True, with_std=True, feature_names=None):
+        self.mean_ = mean
+        self.scale_ = scale
+        self.with_mean = with_mean
+        self.with_std = with_std
+        self.feature_names_in_ = np.array(feature_names, dtype=object) if feature_names else None
+        self.n_features_in_ = len(scale)
+
+    def transform(self, X):
+        X = _as_matrix(X, self.feature_names_in_)
+        if self.with_mean:
+            X -= self.mean_
+        if self.with_std:
+            X /= self.scale_
+        return X
+
+    def inverse_transform(self, X):
+        X = np.array(X, dtype=np.float64)
+        if self.with_std:
+            X *= self.scale_
+        if self.with_mean:
+            X += self.mean_
+        return X
+
+
+class NumericMinMaxScaler:
+    """Équivalent de MinMaxScaler.transform / inverse_transform."""
+
+    def __init__(self, scale, min_, data_min, feature_range=(0, 1), clip=False, feature_names=None):
+        self.scale_ = scale
+        self.min_ = min_
+        self.data_min_ = data_min
+        self.feature_range = tuple(feature_range)
+        self.clip = clip
+        self.feature_names_in_ = np.array(feature_names, dtype=object) if feature_names else None
+        self.n_features_in_ = len(scale)
+
+    def transform(self, X):
+        X = _as_matrix(X, self.feature_names_in_)
+        X *= self.scale_
+        X += self.min_
+        if self.clip:
+            np.clip(X, self.feature_range[0], self.feature_range[1], out=X)
+        return X
+
+    def inverse_transform(self, X):
+        X = np.array(X, dtype=np.float64)
+        X -= self.min_
+        X /= self.scale_
+        return X
+
+
+class NumericLinearModel:
+    """Équivalent de Ridge / LinearRegression.predict (sortie unique)."""
+
+    def __init__(self, coef, intercept):
+        self.coef_ = coef
+        self.intercept_ = float(intercept)
+        self.n_features_in_ = len(coef)
+
+    def predict(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+
+class NumericKMeans:
+    """Équivalent de KMeans.predict (centre le plus proche)."""
+
+    def __init__(self, cluster_centers):
+        self.cluster_centers_ = cluster_centers
+        self.n_clusters = len(cluster_centers)
+        self.n_features_in_ = cluster_centers.shape[1]
+        # ||c||² précalculé : même décomposition que l'implémentation Lloyd de sklearn
+        self._centers_sq = np.einsum("ij,ij->i", cluster_centers, cluster_centers)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        distances = self._centers_sq - 2.0 * (X @ self.cluster_centers_.T)
+        return distances.argmin(axis=1).astype(np.int32)
+
+
+# =============================================================================
+# EXPORT / IMPORT
+# =============================================================================
+
+def _feature_names(scaler):
+    names = getattr(scaler, "feature_names_in_", None)
+    return [str(name) for name in names] if names is not None else None
+
+
+def _describe(model, scaler):
+    """Schéma et tableaux d'un couple sklearn ; ValueError si le type n'est pas pris en charge."""
+    arrays = {}
+
+    if hasattr(scaler, "data_min_"):
+        scaler_info = {
+            "type": "minmax",
+            "feature_range": list(scaler.feature_range),
+            "clip": bool(getattr(scaler, "clip", False)),
+        }
+        arrays["scaler.scale"] = scaler.scale_
+        arrays["scaler.min"] = scaler.min_
+        arrays["scaler.data_min"] = scaler.data_min_
+    elif hasattr(scaler, "scale_") or hasattr(scaler, "mean_"):
+        with_mean = bool(scaler.with_mean) and scaler.mean_ is not None
+        with_std = bool(scaler.with_std) and scaler.scale_ is not None
+        n_features = scaler.n_features_in_
+        scaler_info = {"type": "standard", "with_mean": with_mean, "with_std": with_std}
+        arrays["scaler.mean"] = scaler.mean_ if with_mean else np.zeros(n_features)
+        arrays["scaler.scale"] = scaler.scale_ if with_std else np.ones(n_features)
+    else:
+        raise ValueError(f"Scaler non pris en charge: {type(scaler).__name__}")
+
+    if hasattr(model, "cluster_centers_"):
+        model_info = {"type": "kmeans", "n_clusters": int(model.cluster_centers_.shape[0])}
+        arrays["model.cluster_centers"] = model.cluster_centers_
+    elif hasattr(model, "coef_") and np.ndim(model.coef_) == 1:
+        model_info = {"type": "linear"}
+        arrays["model.coef"] = model.coef_
+        arrays["model.intercept"] = np.atleast_1d(model.intercept_)
+    else:
+        raise ValueError(f"Modèle non pris en charge: {type(model).__name__}")
+
+    model_info["source"] = type(model).__name__
+    scaler_info["source"] = type(scaler).__name__
+    return {"model": model_info, "scaler": scaler_info, "feature_names": _feature_names(scaler)}, arrays
+
+
+def _build(schema, arrays):
+    """Reconstruit (modèle, scaler) numériques à partir du schéma et des tableaux."""
+    names = schema["feature_names"]
+    scaler_info = schema["scaler"]
+    model_info = schema["model"]
+
+    if scaler_info["type"] == "minmax":
+        scaler = NumericMinMaxScaler(
+            arrays["scaler.scale"], arrays["scaler.min"], arrays["scaler.data_min"],
+            feature_range=scaler_info["feature_range"], clip=scaler_info["clip"], feature_names=names,
+        )
+    elif scaler_info["type"] == "standard":
+        scaler = NumericStandardScaler(
+            arrays["scaler.mean"], arrays["scaler.scale"],
+            with_mean=scaler_info["with_mean"], with_std=scaler_info["with_std"], feature_names=names,
+        )
+    else:
+        raise ValueError(f"Type de scaler inconnu: {scaler_info['type']}")
+
+    if model_info["type"] == "linear":
+        model = NumericLinearModel(arrays["model.coef"], arrays["model.intercept"][0])
+    elif model_info["type"] == "kmeans":
+        model = NumericKMeans(arrays["model.cluster_centers"])
+    else:
+        raise ValueError(f"Type de modèle inconnu: {model_info['type']}")
+
+    return model, scaler
+
+
+def load_numeric(key, models_dir, mmap=True):
+    """
+    Charge un couple au format numérique.
+
+    Args:
+        key: Clé du couple ("driver_win", "driver_time", "team_perf")
+        models_dir: Dossier contenant <clé>.json et <clé>.bin
+        mmap: Projeter le fichier binaire en mémoire plutôt que le lire
+
+    Returns:
+        (model, scaler) numériques
+    """
+    schema_path, data_path = numeric_paths(key, models_dir)
+    with open(schema_path, encoding="utf-8") as f:
+        schema = json.load(f)
+    if schema.get("format") != FORMAT_VERSION:
+        raise ValueError(f"{schema_path.name}: version de format non prise en charge ({schema.get('format')})")
+
+    if mmap:
+        data = np.memmap(data_path, dtype=DTYPE, mode="r")
+    else:
+        data = np.fromfile(data_path, dtype=DTYPE)
+    if data.size != schema["size"]:
+        raise ValueError(f"{data_path.name}: taille inattendue ({data.size} au lieu de {schema['size']})")
+
+    arrays = {
+        name: data[spec["offset"]:spec["offset"] + int(np.prod(spec["shape"]))].reshape(spec["shape"])
+        for name, spec in schema["arrays"].items()
+    }
+    return _build(schema, arrays)
+
+
+def _parity_inputs(scaler, n_random=2000, seed=0):
+    """Points de contrôle : statistiques du scaler, perturbations et tirages aléatoires."""
+    rng = np.random.default_rng(seed)
+    n_features = scaler.n_features_in_
+    if hasattr(scaler, "data_min_"):
+        low = np.asarray(scaler.data_min_, dtype=float)
+        high = np.asarray(scaler.data_max_, dtype=float)
+        center, spread = (low + high) / 2, np.maximum(high - low, 1.0)
+    else:
+        center = np.asarray(scaler.mean_, dtype=float) if scaler.mean_ is not None else np.zeros(n_features)
+        spread = np.asarray(scaler.scale_, dtype=float) if scaler.scale_ is not None else np.ones(n_features)
+    return np.vstack([
+        center,
+        center + np.eye(n_features) * spread,
+        center + rng.standard_normal((n_random, n_features)) * spread * 2,
+    ])
+
+
+def check_parity(model, scaler, numeric_model, numeric_scaler):
+    """
+    Compare les prédictions sklearn et numériques bit à bit.
+
+    Returns:
+        Nombre de points de contrôle (ValueError en cas d'écart)
+    """
+    import pandas as pd
+
+    X = _parity_inputs(scaler)
+    names = _feature_names(scaler)
+    X_in = pd.DataFrame(X, columns=names) if names is not None else X
+
+    scaled = scaler.transform(X_in)
+    numeric_scaled = numeric_scaler.transform(X_in)
+    if not np.array_equal(scaled, numeric_scaled):
+        raise ValueError("Parité du scaler non respectée")
+
+    expected = model.predict(scaled)
+    actual = numeric_model.predict(numeric_scaled)
+    if not np.array_equal(np.asarray(expected), np.asarray(actual)):
+        raise ValueError("Parité des prédictions non respectée")
+
+    if hasattr(model, "cluster_centers_"):
+        centers = scaler.inverse_transform(model.cluster_centers_)
+        if not np.array_equal(centers, numeric_scaler.inverse_transform(numeric_model.cluster_centers_)):
+            raise ValueError("Parité de inverse_transform non respectée")
+
+    return len(X)
+
+
+def export_numeric(key, model, scaler, models_dir):
+    """
+    Exporte un couple sklearn au format numérique après contrôle de parité.
+
+    Returns:
+        (chemin du schéma, nombre de points de contrôle)
+    """
+    schema, arrays = _describe(model, scaler)
+
+    layout = {}
+    offset = 0
+    flat = []
+    for name, values in arrays.items():
+        values = np.asarray(values, dtype=np.float64)
+        layout[name] = {"offset": offset, "shape": list(values.shape)}
+        flat.append(values.ravel())
+        offset += values.size
+
+    numeric_model, numeric_scaler = _build(schema, {
+        name: np.asarray(values, dtype=np.float64) for name, values in arrays.items()
+    })
+    n_checked = check_parity(model, scaler, numeric_model, numeric_scaler)
+
+    schema.update({"format": FORMAT_VERSION, "key": key, "dtype": DTYPE, "size": offset, "arrays": layout})
+    schema_path, data_path = numeric_paths(key, models_dir)
+
+    # Écriture atomique : les données d'abord, le schéma (qui les référence) ensuite
+    for path, write in (
+        (data_path, lambda f: np.concatenate(flat).astype(DTYPE).tofile(f)),
+        (schema_path, lambda f: f.write(json.dumps(schema, indent=2).encode("utf-8"))),
+    ):
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+
+    return schema_path, n_checked
+
+
+def main():
+    from src.models import MODEL_KEYS, MODELS_DIR, ModelLoader
+
+    parser = argparse.ArgumentParser(description="Export / vérification des artefacts numériques")
+    parser.add_argument("command", choices=["export", "verify"])
+    parser.add_argument("--models-dir", default=str(MODELS_DIR))
+    args = parser.parse_args()
+
+    loader = ModelLoader(models_dir=args.models_dir, artifact_format="pickle")
+    for key in MODEL_KEYS:
+        if not loader.load(key):
+            print(f"⚠️  {key}: pickles indisponibles, ignoré")
+            continue
+        artifact = loader.artifact(key)
+        try:
+            if args.command == "export":
+                path, n_checked = export_numeric(key, artifact.model, artifact.scaler, args.models_dir)
+                print(f"✅ {key}: {path.name} ({n_checked} points identiques bit à bit)")
+            else:
+                numeric_model, numeric_scaler = load_numeric(key, args.models_dir)
+                n_checked = check_parity(artifact.model, artifact.scaler, numeric_model, numeric_scaler)
+                print(f"✅ {key}: parité bit à bit sur {n_checked} points")
+        except (OSError, ValueError) as e:
+            print(f"❌ {key}: {e}")
+
+
+if __name__ == "__main__":
+    main()
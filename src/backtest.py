@@ -0,0 +1,242 @@
+"""
+Backtest walk-forward du modèle driver_win sur toutes les courses historiques
+
+Chaque course du dataset est rejouée dans l'ordre chronologique (année,
+manche) : features driver_win construites à partir des lignes réelles,
+scoring de la grille, probabilités Plackett-Luce, puis log-loss, score de
+Brier et taux de vainqueur trouvé par rapport à positionOrder.
+
+Le scoring est groupé (un seul appel au modèle par saison, softmax par
+course via des réductions segmentées) et les saisons sont réparties sur un
+pool de processus. Sert à valider un model_driver_win.pkl ré-entraîné avant
+de le promouvoir (comparaison avec --baseline-dir).
+
+Usage :
+    python -m src.backtest [--models-dir models] [--baseline-dir models_prod]
+                           [--workers 4] [--years 2023 2024] [--output backtest.csv]
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.features import build_driver_win_matrix, times_to_seconds
+from src.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+RACE_ORDER = ['year', 'round', 'raceId']
+
+# Colonnes du tableau de résultats (une ligne par course)
+RESULT_COLUMNS = [
+    'year', 'round', 'raceId', 'circuitId', 'n_drivers', 'winner_driverId',
+    'predicted_driverId', 'p_winner', 'p_predicted', 'log_loss', 'brier', 'hit',
+]
+
+# Probabilité minimale dans la log-loss (évite log(0))
+EPSILON = 1e-15
+
+# ModelLoader propre à chaque processus du pool
+_worker_loader = None
+
+
+def race_feature_matrix(df):
+    """
+    Features driver_win des lignes réelles (une par pilote et par course).
+
+    Returns:
+        Matrice float64 (n_lignes, 9) dans l'ordre DRIVER_WIN_FEATURES
+    """
+    return build_driver_win_matrix(
+        grid=df['grid'],
+        laps=df['laps'],
+        q1_sec=times_to_seconds(df['q1'].to_numpy(dtype=object)),
+        q2_sec=times_to_seconds(df['q2'].to_numpy(dtype=object)),
+        q3_sec=times_to_seconds(df['q3'].to_numpy(dtype=object)),
+        fastest_lap_time=df['fastestLapTime'],
+        avg_lap_ms=df['avg_lap_ms'],
+        pit_stop_count=df['pit_stop_count'],
+        avg_pit_duration_s=df['avg_pit_duration_s'],
+    )
+
+
+def score_races(df, model_loader):
+    """
+    Score toutes les courses de `df` en un seul appel au modèle.
+
+    La softmax Plackett-Luce et les métriques sont calculées par course
+    avec des réductions segmentées (np.*.reduceat) sur les lignes triées.
+
+    Returns:
+        DataFrame d'une ligne par course (colonnes RESULT_COLUMNS), ordre chronologique
+    """
+    df = df.sort_values(RACE_ORDER, kind='stable')
+    if df.empty:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    thetas = np.asarray(model_loader.predict_thetas(race_feature_matrix(df)), dtype=float)
+    race_ids = df['raceId'].to_numpy()
+    starts = np.flatnonzero(np.r_[True, race_ids[1:] != race_ids[:-1]])
+    counts = np.diff(np.r_[starts, len(df)])
+
+    # Softmax par course (décalage par le max de la course pour la stabilité)
+    exp_thetas = np.exp(thetas - np.repeat(np.maximum.reduceat(thetas, starts), counts))
+    probabilities = exp_thetas / np.repeat(np.add.reduceat(exp_thetas, starts), counts)
+
+    won = (df['positionOrder'].to_numpy() == 1).astype(float)
+    has_winner = np.add.reduceat(won, starts) > 0
+    p_winner = np.add.reduceat(probabilities * won, starts)
+
+    # Favori et vainqueur de chaque course : maximum de chaque segment
+    segments = np.repeat(np.arange(len(starts)), counts)
+    favorite = np.lexsort((-probabilities, segments))[starts]
+    winner_rows = np.lexsort((-won, segments))[starts]
+    driver_ids = df['driverId'].to_numpy()
+
+    first = df.iloc[starts]
+    results = pd.DataFrame({
+        'year': first['year'].to_numpy(dtype=int),
+        'round': first['round'].to_numpy(dtype=int),
+        'raceId': first['raceId'].to_numpy(dtype=int),
+        'circuitId': first['circuitId'].to_numpy(dtype=int),
+        'n_drivers': counts,
+        'winner_driverId': np.where(has_winner, driver_ids[winner_rows], -1),
+        'predicted_driverId': driver_ids[favorite],
+        'p_winner': np.where(has_winner, p_winner, np.nan),
+        'p_predicted': probabilities[favorite],
+        'log_loss': np.where(has_winner, -np.log(np.clip(p_winner, EPSILON, 1.0)), np.nan),
+        'brier': np.where(has_winner, np.add.reduceat((probabilities - won) ** 2, starts), np.nan),
+        'hit': np.where(has_winner, won[favorite], np.nan),
+    })
+    return results[RESULT_COLUMNS]
+
+
+def _init_worker(models_dir, artifact_format):
+    global _worker_loader
+    from src.models import ModelLoader
+
+    _worker_loader = ModelLoader(models_dir=models_dir, artifact_format=artifact_format)
+    _worker_loader.load("driver_win")
+
+
+def _score_season(season):
+    return score_races(season, _worker_loader)
+
+
+def _load_driver_win(models_dir, artifact_format):
+    """ModelLoader dont le modèle driver_win est chargé (ValueError sinon)."""
+    from src.models import ModelLoader
+
+    loader = ModelLoader(models_dir=models_dir, artifact_format=artifact_format)
+    if not loader.load("driver_win"):
+        raise ValueError(f"Modèle driver_win non chargé: {'; '.join(loader.errors)}")
+    return loader
+
+
+def run_backtest(df, models_dir=None, artifact_format="auto", workers=None, years=None):
+    """
+    Rejoue toutes les courses de `df` (ordre chronologique) avec le modèle
+    driver_win de `models_dir`.
+
+    Args:
+        df: Résultats historiques (F1DataLoader.df)
+        models_dir: Dossier du modèle à évaluer (MODELS_DIR par défaut)
+        artifact_format: Voir ModelLoader
+        workers: Processus du pool, une saison par tâche (None = nombre de CPU ;
+                 1 = scoring dans le processus courant)
+        years: Saisons à rejouer (toutes par défaut)
+
+    Returns:
+        DataFrame d'une ligne par course (RESULT_COLUMNS), plus les moyennes
+        cumulées cum_log_loss / cum_brier / cum_hit_rate dans l'ordre de rejeu
+    """
+    if years is not None:
+        df = df[df['year'].isin(list(years))]
+    seasons = [season for _, season in df.groupby('year', sort=True)]
+
+    # Vérifie le modèle une fois avant de lancer le pool (erreur lisible)
+    loader = _load_driver_win(models_dir, artifact_format)
+
+    workers = min(workers or os.cpu_count() or 1, len(seasons))
+    if workers <= 1:
+        parts = [score_races(season, loader) for season in seasons]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(models_dir, artifact_format)) as pool:
+            parts = list(pool.map(_score_season, seasons))
+
+    if not parts:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    results = pd.concat(parts, ignore_index=True)
+
+    # Moyennes cumulées du walk-forward (courses sans vainqueur ignorées)
+    scored = results['p_winner'].notna()
+    n_scored = scored.cumsum().replace(0, np.nan)
+    results['cum_log_loss'] = results['log_loss'].fillna(0).cumsum() / n_scored
+    results['cum_brier'] = results['brier'].fillna(0).cumsum() / n_scored
+    results['cum_hit_rate'] = results['hit'].fillna(0).cumsum() / n_scored
+    return results
+
+
+def summarize(results, by=None):
+    """
+    Métriques moyennes d'un backtest.
+
+    Args:
+        by: Colonne de regroupement (ex. "year"), ou None pour le total
+
+    Returns:
+        Dict {races, log_loss, brier, hit_rate}, ou DataFrame par groupe si `by`
+    """
+    scored = results[results['p_winner'].notna()]
+    metrics = {'races': ('raceId', 'count'), 'log_loss': ('log_loss', 'mean'),
+               'brier': ('brier', 'mean'), 'hit_rate': ('hit', 'mean')}
+    if by is not None:
+        return scored.groupby(by).agg(**metrics)
+    return {name: float(getattr(scored[col], agg)()) for name, (col, agg) in metrics.items()}
+
+
+def main():
+    from data.data_loader import F1DataLoader
+    from src.models import MODELS_DIR
+
+    parser = argparse.ArgumentParser(description="Backtest walk-forward du modèle driver_win")
+    parser.add_argument("--models-dir", default=str(MODELS_DIR), help="Modèle à évaluer")
+    parser.add_argument("--baseline-dir", default=None, help="Modèle de référence à comparer")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--years", type=int, nargs="*", default=None)
+    parser.add_argument("--output", default=None, help="CSV des résultats par course")
+    args = parser.parse_args()
+
+    data_loader = F1DataLoader()
+    if not data_loader.load():
+        raise SystemExit("❌ Données non chargées")
+
+    runs = {"candidat": args.models_dir}
+    if args.baseline_dir:
+        runs["référence"] = args.baseline_dir
+
+    summaries = {}
+    for name, models_dir in runs.items():
+        try:
+            results = run_backtest(data_loader.df, models_dir=models_dir,
+                                   workers=args.workers, years=args.years)
+        except ValueError as e:
+            raise SystemExit(f"❌ {name}: {e}")
+        summaries[name] = summarize(results)
+
+        print(f"\n== {name} ({models_dir}) ==")
+        print(summarize(results, by="year").round(4).to_string())
+        if args.output and name == "candidat":
+            results.to_csv(args.output, index=False)
+            print(f"Résultats par course: {args.output}")
+
+    print()
+    for name, summary in summaries.items():
+        print(f"{name:<10} {summary['races']:>5.0f} courses  log-loss {summary['log_loss']:.4f}  "
+              f"Brier {summary['brier']:.4f}  vainqueur trouvé {summary['hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
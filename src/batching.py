@@ -0,0 +1,208 @@
+"""
+Micro-batching des requêtes de scoring theta
+
+Les requêtes concurrentes arrivant dans une fenêtre courte (ex : 2 ms) ou
+jusqu'à N lignes sont empilées en une seule matrice, scorées en un seul
+appel scaler + modèle, puis les résultats sont redistribués aux appelants.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from src.features import DRIVER_WIN_FEATURES, plackett_luce_probability
+
+
+class _Request:
+    """Requête en attente : features aplaties, forme d'origine et future."""
+
+    __slots__ = ("X", "shape", "future", "submitted")
+
+    def __init__(self, X, shape):
+        self.X = X
+        self.shape = shape
+        self.future = Future()
+        self.submitted = time.perf_counter()
+
+
+class MicroBatcher:
+    """
+    Regroupe les appels predict_thetas concurrents en lots.
+
+    Un thread de fond prend la première requête en attente, attend au plus
+    `max_wait` secondes (ou `max_rows` lignes) d'autres requêtes, puis fait un
+    seul appel model_loader.predict_thetas sur la matrice empilée.
+    """
+
+    def __init__(self, model_loader, max_wait=0.002, max_rows=1024):
+        """
+        Args:
+            model_loader: ModelLoader avec driver_win chargé
+            max_wait: Fenêtre de regroupement en secondes
+            max_rows: Nombre de lignes déclenchant l'envoi immédiat du lot
+        """
+        self.model_loader = model_loader
+        self.max_wait = max_wait
+        self.max_rows = max_rows
+        self.n_features = len(DRIVER_WIN_FEATURES)
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._reset_metrics()
+
+        self._thread = threading.Thread(target=self._run, name="theta-microbatcher", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # API publique
+    # ------------------------------------------------------------------
+    def submit(self, X):
+        """
+        Ajoute une requête au prochain lot.
+
+        Args:
+            X: Features (n_pilotes, 9) ou (n_courses, n_pilotes, 9)
+
+        Returns:
+            Future dont le résultat est l'array des theta (forme X.shape[:-1])
+        """
+        X = np.asarray(X, dtype=float)
+        if X.ndim not in (2, 3) or X.shape[-1] != self.n_features:
+            raise ValueError(
+                f"Features driver_win de forme invalide {X.shape} "
+                f"(attendu (n, {self.n_features}) ou (courses, n, {self.n_features}))"
+            )
+
+        request = _Request(X.reshape(-1, self.n_features), X.shape[:-1])
+        # Test et dépôt atomiques vis-à-vis de close() : aucune requête
+        # ne peut être déposée derrière la sentinelle de fin
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher fermé")
+            self._queue.put(request)
+        return request.future
+
+    def predict_thetas(self, X, timeout=None):
+        """Équivalent bloquant de ModelLoader.predict_thetas, via le lot courant."""
+        return self.submit(X).result(timeout)
+
+    def predict_win_probabilities_batch(self, X, timeout=None):
+        """Équivalent de ModelLoader.predict_win_probabilities_batch, via le lot courant."""
+        thetas = self.predict_thetas(X, timeout)
+        return thetas, plackett_luce_probability(thetas)
+
+    def metrics(self):
+        """
+        Retourne un instantané des métriques :
+            requests, rows, batches, mean_batch_requests, mean_batch_rows,
+            max_batch_rows, queue_depth, max_queue_depth, mean_wait_ms,
+            batch_rows_histogram ({borne supérieure puissance de 2: nb lots})
+        """
+        with self._lock:
+            m = dict(self._metrics)
+            m["batch_rows_histogram"] = dict(sorted(self._metrics["batch_rows_histogram"].items()))
+
+        batches = max(m["batches"], 1)
+        m["mean_batch_requests"] = m["requests"] / batches
+        m["mean_batch_rows"] = m["rows"] / batches
+        m["mean_wait_ms"] = m.pop("total_wait") * 1000 / max(m["requests"], 1)
+        m["queue_depth"] = self._queue.qsize()
+        return m
+
+    def reset_metrics(self):
+        """Remet les compteurs à zéro."""
+        with self._lock:
+            self._reset_metrics()
+
+    def close(self, timeout=1.0):
+        """Arrête le thread de fond après avoir traité les requêtes en attente."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # Thread de fond
+    # ------------------------------------------------------------------
+    def _reset_metrics(self):
+        self._metrics = {
+            "requests": 0,
+            "rows": 0,
+            "batches": 0,
+            "max_batch_rows": 0,
+            "max_queue_depth": 0,
+            "total_wait": 0.0,
+            "batch_rows_histogram": {},
+        }
+
+    def _run(self):
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            batch = [first]
+            rows = len(first.X)
+            deadline = time.perf_counter() + self.max_wait
+
+            while rows < self.max_rows:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+                rows += len(request.X)
+
+            self._execute(batch, rows)
+
+        # Filet de sécurité : toute requête restée derrière la sentinelle
+        # échoue au lieu de laisser son appelant bloqué indéfiniment
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                request.future.set_exception(RuntimeError("MicroBatcher fermé"))
+
+    def _execute(self, batch, rows):
+        started = time.perf_counter()
+        self._record(batch, rows, started)
+
+        try:
+            X = batch[0].X if len(batch) == 1 else np.concatenate([r.X for r in batch])
+            thetas = self.model_loader.predict_thetas(X)
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        offset = 0
+        for request in batch:
+            n = len(request.X)
+            request.future.set_result(thetas[offset:offset + n].reshape(request.shape))
+            offset += n
+
+    def _record(self, batch, rows, started):
+        bucket = 1 << max(rows - 1, 0).bit_length()
+        with self._lock:
+            m = self._metrics
+            m["requests"] += len(batch)
+            m["rows"] += rows
+            m["batches"] += 1
+            m["max_batch_rows"] = max(m["max_batch_rows"], rows)
+            m["max_queue_depth"] = max(m["max_queue_depth"], self._queue.qsize() + len(batch))
+            m["total_wait"] += sum(started - r.submitted for r in batch)
+            m["batch_rows_histogram"][bucket] = m["batch_rows_histogram"].get(bucket, 0) + 1
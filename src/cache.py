@@ -0,0 +1,139 @@
+"""
+Cache de prédictions theta (LRU / TTL)
+
+Chaque ligne de features est quantifiée puis mise en cache avec la version
+de l'artefact driver_win : d'un calcul à l'autre, seules les lignes modifiées
+(ex : la grille d'un seul pilote) repassent par le modèle.
+"""
+import threading
+
+import numpy as np
+from cachetools import LRUCache, TTLCache
+
+from src.features import DRIVER_WIN_FEATURES, plackett_luce_probability
+from src.lazy import is_dataframe, lazy_import
+
+pd = lazy_import("pandas")
+
+
+class PredictionCache:
+    """
+    Cache thread-safe autour de ModelLoader.predict_thetas.
+
+    Clé : (version de l'artefact, moteur, ligne de features arrondie à
+    `decimals` décimales). Les lignes absentes du cache sont scorées en un
+    seul appel au modèle. Une instance peut être partagée entre sessions
+    Streamlit (st.cache_resource).
+    """
+
+    def __init__(self, model_loader, maxsize=4096, ttl=None, decimals=6):
+        """
+        Args:
+            model_loader: ModelLoader avec driver_win chargé
+            maxsize: Nombre maximal de lignes en cache (éviction LRU)
+            ttl: Durée de vie d'une entrée en secondes (None = pas d'expiration)
+            decimals: Décimales conservées lors de la quantification des features
+        """
+        self.model_loader = model_loader
+        self.decimals = decimals
+        self.n_features = len(DRIVER_WIN_FEATURES)
+        self._cache = LRUCache(maxsize) if ttl is None else TTLCache(maxsize, ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _quantize(self, X):
+        X = np.round(np.asarray(X, dtype=float), self.decimals)
+        X += 0.0  # -0.0 -> 0.0 : même clé pour les deux zéros
+        return np.ascontiguousarray(X)
+
+    def predict_thetas(self, X):
+        """
+        Équivalent de ModelLoader.predict_thetas avec cache par ligne.
+
+        Args:
+            X: Matrice (n_pilotes, 9), (n_courses, n_pilotes, 9) ou DataFrame
+
+        Returns:
+            Array des theta de forme (n_pilotes,) ou (n_courses, n_pilotes)
+        """
+        if is_dataframe(X):
+            X = X[DRIVER_WIN_FEATURES].to_numpy(dtype=float)
+        X = np.asarray(X, dtype=float)
+        if X.ndim not in (2, 3) or X.shape[-1] != self.n_features:
+            raise ValueError(
+                f"Features driver_win de forme invalide {X.shape} "
+                f"(attendu (n, {self.n_features}) ou (courses, n, {self.n_features}))"
+            )
+
+        rows = self._quantize(X.reshape(-1, self.n_features))
+        # Clé de version et scoring sur le même artefact (remplacement à chaud entre les deux)
+        artifact = self.model_loader.snapshot("driver_win")
+        version = (artifact.version, self.model_loader.engine)
+        keys = [(version, row.tobytes()) for row in rows]
+
+        thetas = np.empty(len(rows))
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                theta = self._cache.get(key)
+                if theta is None:
+                    missing.append(i)
+                else:
+                    thetas[i] = theta
+            self.hits += len(rows) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            # Lignes dupliquées dans la requête : un seul calcul par clé
+            first = {}
+            for i in missing:
+                first.setdefault(keys[i], i)
+            scored = self.model_loader.predict_thetas(rows[list(first.values())], artifact=artifact)
+            theta_by_key = dict(zip(first, scored.tolist()))
+
+            for i in missing:
+                thetas[i] = theta_by_key[keys[i]]
+            with self._lock:
+                self._cache.update(theta_by_key)
+
+        return thetas.reshape(X.shape[:-1])
+
+    def predict_win_probabilities_batch(self, X):
+        """Équivalent de ModelLoader.predict_win_probabilities_batch avec cache."""
+        thetas = self.predict_thetas(X)
+        return thetas, plackett_luce_probability(thetas)
+
+    def predict_win_probabilities(self, drivers_features_list):
+        """Équivalent de ModelLoader.predict_win_probabilities avec cache."""
+        if not drivers_features_list:
+            return []
+
+        names = [driver_name for driver_name, _ in drivers_features_list]
+        X_all = pd.concat([X for _, X in drivers_features_list], ignore_index=True)
+        thetas, probabilities = self.predict_win_probabilities_batch(X_all)
+
+        return [
+            {"driver": name, "theta": theta, "win_probability": prob}
+            for name, theta, prob in zip(names, thetas, probabilities)
+        ]
+
+    def stats(self):
+        """Retourne hits, misses, hit_rate, size et maxsize."""
+        with self._lock:
+            hits, misses, size = self.hits, self.misses, len(self._cache)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+            "size": size,
+            "maxsize": self._cache.maxsize,
+        }
+
+    def clear(self):
+        """Vide le cache et remet les compteurs à zéro."""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
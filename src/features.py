@@ -1,9 +1,36 @@
 """
 Préparation des features pour chaque modèle
 """
-import pandas as pd
+from functools import lru_cache
+
 import numpy as np
 
+from src.lazy import lazy_import
+
+# pandas / pyarrow importés au premier usage (None si pyarrow absent)
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+pc = lazy_import("pyarrow.compute")
+
+# Ordre des colonnes attendu par scaler_driver_win / model_driver_win
+DRIVER_WIN_FEATURES = [
+    'grid', 'laps', 'q1_sec', 'q2_sec', 'q3_sec',
+    'fastestLapTime', 'avg_lap_ms', 'pit_stop_count', 'avg_pit_duration_s',
+]
+
+# Ordre des colonnes attendu par scaler_driver_time / model_driver_time
+DRIVER_TIME_FEATURES = ['grid', 'circuitId', 'constructorId', 'number_driver', 'year']
+
+# Ordre des colonnes attendu par scaler_team_perf / model_team_perf
+TEAM_PERF_FEATURES = ['points', 'Quali_Pace_Ratio']
+
+# Valeurs de temps traitées comme "pas de temps" (sentinelle 999.0)
+MISSING_TIMES = ['DNQ', 'DNS', '', 'nan']
+
+# Formats canoniques "M:SS.mmm" et "SS.mmm" (les autres passent par time_to_seconds)
+_MINUTES_SECONDS = r'^\s*(?P<minutes>[0-9]+):(?P<seconds>[0-9]+(?:\.[0-9]+)?)\s*$'
+_SECONDS_ONLY = r'^\s*(?P<seconds>[0-9]+(?:\.[0-9]+)?)\s*$'
+
 
 def time_to_seconds(time_str):
     """Convertit un temps MM:SS.mmm en secondes."""
@@ -23,6 +50,70 @@ def time_to_seconds(time_str):
         return 999.0
 
 
+def _parse_canonical_times(text):
+    """
+    Analyse un array Arrow de chaînes au format "M:SS.mmm" ou "SS.mmm".
+    
+    Returns:
+        (secondes, reconnu) : array float64 et masque des valeurs reconnues
+    """
+    seconds = np.full(len(text), np.nan)
+    
+    mmss = pc.extract_regex(text, _MINUTES_SECONDS)
+    matched = pc.is_valid(mmss).to_numpy(zero_copy_only=False)
+    if matched.any():
+        minutes = pc.cast(pc.struct_field(mmss, [0]), pa.float64()).to_numpy(zero_copy_only=False)
+        secs = pc.cast(pc.struct_field(mmss, [1]), pa.float64()).to_numpy(zero_copy_only=False)
+        seconds[matched] = minutes[matched] * 60 + secs[matched]
+    
+    plain = pc.extract_regex(text, _SECONDS_ONLY)
+    plain_matched = pc.is_valid(plain).to_numpy(zero_copy_only=False) & ~matched
+    if plain_matched.any():
+        values = pc.cast(pc.struct_field(plain, [0]), pa.float64()).to_numpy(zero_copy_only=False)
+        seconds[plain_matched] = values[plain_matched]
+    
+    return seconds, matched | plain_matched
+
+
+def times_to_seconds(values):
+    """
+    Version vectorisée de time_to_seconds pour une colonne entière
+    (Series pandas, array Arrow, liste...).
+    
+    Chaque valeur distincte n'est analysée qu'une fois ; les formats
+    "M:SS.mmm" et "SS.mmm" sont traités par regex Arrow sur tout le lot,
+    DNQ/DNS/vide/manquant donnent 999.0, et les rares valeurs hors format
+    sont déléguées à time_to_seconds (résultat identique au scalaire).
+    
+    Returns:
+        Series (même index) si l'entrée est une Series, sinon array float64
+    """
+    is_series = isinstance(values, pd.Series)
+    if not is_series and hasattr(values, 'to_pandas'):
+        values = values.to_pandas()
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    
+    codes, uniques = pd.factorize(series.astype(object))
+    uniques = np.asarray(uniques, dtype=object)
+    parsed = np.full(len(uniques), 999.0)
+    
+    todo = np.flatnonzero(~pd.Series(uniques, dtype=object).isin(MISSING_TIMES).to_numpy())
+    if todo.size:
+        recognized = np.zeros(todo.size, dtype=bool)
+        if pa is not None:
+            text = pa.array([str(v) for v in uniques[todo]], type=pa.string())
+            seconds, recognized = _parse_canonical_times(text)
+            parsed[todo[recognized]] = seconds[recognized]
+        parsed[todo[~recognized]] = [time_to_seconds(v) for v in uniques[todo[~recognized]]]
+    
+    # Code -1 : valeur manquante (NaN / None / NA)
+    result = np.where(codes >= 0, parsed[codes] if len(parsed) else 999.0, 999.0)
+    
+    if is_series:
+        return pd.Series(result, index=series.index, name=series.name)
+    return result
+
+
 def build_features_driver_win(grid, laps, q1_sec, q2_sec, q3_sec,
                                fastest_lap_time, avg_lap_ms, pit_stop_count, avg_pit_duration_s):
     """
@@ -79,23 +170,188 @@ def build_features_team_perf(points, quali_pace_ratio):
     return pd.DataFrame(data)
 
 
-def plackett_luce_probability(theta_scores):
+def _column(values, n):
+    """Colonne float64 de longueur n (un scalaire est répété)."""
+    if hasattr(values, 'to_numpy'):
+        values = values.to_numpy(dtype=float, na_value=np.nan)
+    column = np.asarray(values, dtype=float)
+    if column.ndim == 0:
+        return np.full(n, float(column))
+    if column.shape != (n,):
+        raise ValueError(f"Colonne de taille {column.shape} (attendu ({n},))")
+    return column
+
+
+def _bulk_matrix(columns, integer_columns=(), time_columns=()):
+    """
+    Assemble des colonnes (listes, arrays, Series ou scalaires) en une matrice
+    float64 contiguë (n, n_colonnes), dans l'ordre de `columns`.
+    
+    Les colonnes entières sont tronquées vers zéro (comme int()) ; dans les
+    colonnes de temps, manquant / 0 / 999 deviennent la sentinelle 999.0.
+    
+    Écarts avec les build_features_* scalaires, limités aux valeurs
+    manquantes : un temps NaN donne 999.0 (comme times_to_seconds) là où le
+    scalaire le laisse à NaN, et un NaN dans une colonne entière reste NaN
+    là où int() lève une ValueError. Pour toute entrée finie, les lignes
+    sont identiques bit à bit à celles des builders scalaires.
+    """
+    lengths = {len(v) for v in columns.values() if np.ndim(v) > 0}
+    if len(lengths) > 1:
+        raise ValueError(f"Colonnes de longueurs différentes: {sorted(lengths)}")
+    n = lengths.pop() if lengths else 1
+    
+    X = np.empty((n, len(columns)), dtype=np.float64)
+    for j, (name, values) in enumerate(columns.items()):
+        column = _column(values, n)
+        if name in integer_columns:
+            column = np.trunc(column)
+        if name in time_columns:
+            column = np.where(np.isnan(column) | (column == 0) | (column == 999), 999.0, column)
+        X[:, j] = column
+    return X
+
+
+def build_driver_win_matrix(grid, laps, q1_sec, q2_sec, q3_sec,
+                            fastest_lap_time, avg_lap_ms, pit_stop_count, avg_pit_duration_s):
+    """
+    Version vectorisée de build_features_driver_win pour N pilotes.
+    
+    Chaque argument est une colonne (liste, array, Series d'un DataFrame) ou
+    un scalaire commun à tous les pilotes. Identique au builder scalaire pour
+    des entrées finies ; un temps de qualification NaN devient 999.0 (voir
+    _bulk_matrix).
+    
+    Returns:
+        Matrice float64 contiguë (n, 9), colonnes dans l'ordre DRIVER_WIN_FEATURES
+    """
+    return _bulk_matrix(
+        dict(zip(DRIVER_WIN_FEATURES, (grid, laps, q1_sec, q2_sec, q3_sec, fastest_lap_time,
+                                       avg_lap_ms, pit_stop_count, avg_pit_duration_s))),
+        integer_columns=('grid', 'laps', 'pit_stop_count'),
+        time_columns=('q1_sec', 'q2_sec', 'q3_sec'),
+    )
+
+
+def build_driver_time_matrix(grid, circuit_id, constructor_id, driver_number, year):
+    """
+    Version vectorisée de build_features_driver_time.
+    
+    Returns:
+        Matrice float64 contiguë (n, 5), colonnes dans l'ordre DRIVER_TIME_FEATURES
+    """
+    return _bulk_matrix(
+        dict(zip(DRIVER_TIME_FEATURES, (grid, circuit_id, constructor_id, driver_number, year))),
+        integer_columns=DRIVER_TIME_FEATURES,
+    )
+
+
+def build_team_perf_matrix(points, quali_pace_ratio):
+    """
+    Version vectorisée de build_features_team_perf.
+    
+    Returns:
+        Matrice float64 contiguë (n, 2), colonnes dans l'ordre TEAM_PERF_FEATURES
+    """
+    return _bulk_matrix(dict(zip(TEAM_PERF_FEATURES, (points, quali_pace_ratio))))
+
+
+def plackett_luce_probability(theta_scores, axis=-1):
     """
     Calcule les probabilités de victoire selon le modèle Plackett-Luce.
     
     Args:
         theta_scores: Liste/array des scores theta pour chaque pilote
+                      (ou array (n_courses, n_pilotes) pour plusieurs courses)
+        axis: Axe des pilotes (dernier axe par défaut)
     
     Returns:
-        Array des probabilités de victoire (somme = 1)
+        Array des probabilités de victoire (somme = 1 le long de `axis`)
     """
-    theta_scores = np.array(theta_scores)
+    theta_scores = np.asarray(theta_scores, dtype=float)
     # Stabilisation numérique : soustraire le max pour éviter overflow
-    exp_theta = np.exp(theta_scores - np.max(theta_scores))
-    probabilities = exp_theta / exp_theta.sum()
+    exp_theta = np.exp(theta_scores - np.max(theta_scores, axis=axis, keepdims=True))
+    probabilities = exp_theta / exp_theta.sum(axis=axis, keepdims=True)
     return probabilities
 
 
+@lru_cache(maxsize=256)
+def _plackett_luce_positions_cached(theta_key, k, tol):
+    """Programmation dynamique sur les sous-ensembles des k-1 premiers arrivés."""
+    thetas = np.array(theta_key, dtype=float)
+    n = thetas.size
+    weights = np.exp(thetas - thetas.max())
+    bits = np.left_shift(np.int64(1), np.arange(n, dtype=np.int64))
+    
+    positions = np.zeros((n, k))
+    
+    # Couche courante : sous-ensembles (bitmask) des premiers arrivés et
+    # probabilité que ce soient exactement eux
+    masks = np.zeros(1, dtype=np.int64)
+    probs = np.ones(1)
+    
+    for place in range(min(k, n)):
+        # P(sous-ensemble puis j) = P(sous-ensemble) * w_j / w(pilotes restants)
+        free = (masks[:, None] & bits[None, :]) == 0
+        # Somme directe des poids restants : W - w(sous-ensemble) perd toute
+        # précision quand un pilote dominant est déjà placé
+        remaining = np.maximum(np.where(free, weights[None, :], 0.0).sum(axis=1), np.finfo(float).tiny)
+        step = probs[:, None] * weights[None, :] / remaining[:, None]
+        step = np.where(free, step, 0.0)
+        positions[:, place] = step.sum(axis=0)
+        
+        if place == k - 1:
+            break
+        
+        # Mémoïsation : fusionner les ordres menant au même sous-ensemble
+        rows, cols = np.nonzero(step > tol)
+        new_masks = masks[rows] | bits[cols]
+        masks, inverse = np.unique(new_masks, return_inverse=True)
+        probs = np.bincount(inverse, weights=step[rows, cols], minlength=masks.size)
+    
+    positions.setflags(write=False)
+    return positions
+
+
+def plackett_luce_position_probabilities(theta_scores, k=3, tol=0.0):
+    """
+    Calcule exactement P(pilote i termine à la position p) pour p = 1..k
+    selon le modèle Plackett-Luce (sans simulation).
+    
+    Les sous-ensembles déjà placés sont fusionnés à chaque étape
+    (programmation dynamique mémoïsée) ; les états de probabilité <= tol
+    sont élagués. Le résultat est mis en cache par vecteur theta.
+    
+    Args:
+        theta_scores: Liste/array des scores theta pour chaque pilote
+        k: Nombre de positions à calculer (k <= 3 conseillé)
+        tol: Seuil d'élagage (0.0 = calcul exact)
+    
+    Returns:
+        Array (n_pilotes, k) ; la colonne 0 est égale à plackett_luce_probability
+    """
+    theta_scores = np.asarray(theta_scores, dtype=float)
+    if theta_scores.ndim != 1 or theta_scores.size == 0:
+        raise ValueError("theta_scores doit être un vecteur non vide")
+    if theta_scores.size > 62:
+        raise ValueError("Au plus 62 pilotes sont supportés")
+    if k < 1:
+        raise ValueError("k doit être >= 1")
+    
+    key = tuple(float(t) for t in theta_scores)
+    return _plackett_luce_positions_cached(key, int(k), float(tol)).copy()
+
+
+def plackett_luce_top_k_probability(theta_scores, k=3):
+    """
+    Probabilité exacte de terminer dans le top k (k=3 : podium).
+    
+    Returns:
+        Array des probabilités (somme = k)
+    """
+    return plackett_luce_position_probabilities(theta_scores, k).sum(axis=1)
+
+
 def milliseconds_to_time_string(ms):
     """Convertit des millisecondes en format lisible."""
     if pd.isna(ms) or ms <= 0:
@@ -0,0 +1,43 @@
+"""
+Imports différés des dépendances lourdes (pandas, pyarrow)
+
+Les modules du projet référencent `pd` / `pa` comme d'habitude ; l'import réel
+n'a lieu qu'au premier accès à un attribut, ce qui évite ~0,7 s de démarrage
+aux processus qui ne s'en servent jamais.
+"""
+import importlib
+import importlib.util
+import sys
+import types
+
+
+class _LazyModule(types.ModuleType):
+    """Module importé au premier accès à l'un de ses attributs."""
+
+    def __getattr__(self, attr):
+        # Appelé seulement pour les attributs absents : après le premier
+        # import, le dictionnaire du vrai module est recopié ici
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    """
+    Retourne un module chargé au premier usage, ou None si le paquet
+    n'est pas installé (vérifié sans l'importer).
+
+    Args:
+        name: Nom du module (ex : "pandas", "pyarrow.compute")
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    if importlib.util.find_spec(name.partition(".")[0]) is None:
+        return None
+    return _LazyModule(name)
+
+
+def is_dataframe(obj):
+    """isinstance(obj, pandas.DataFrame) sans importer pandas s'il ne l'est pas déjà."""
+    pandas = sys.modules.get("pandas")
+    return pandas is not None and isinstance(obj, pandas.DataFrame)
@@ -1,10 +1,24 @@
 """
 Chargement des modèles et scalers
 """
-import joblib
+import hashlib
+import os
+import threading
+import time
+
 import numpy as np
 from pathlib import Path
 
+from src.lazy import is_dataframe, lazy_import
+from src.features import (
+    DRIVER_TIME_FEATURES,
+    DRIVER_WIN_FEATURES,
+    TEAM_PERF_FEATURES,
+    plackett_luce_probability,
+)
+
+pd = lazy_import("pandas")
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 MODELS_DIR = BASE_DIR / "models"
 
@@ -15,44 +29,360 @@ TIER_NAMES = {
     2: "Top Teams"
 }
 
+# Moteurs de scoring disponibles pour les modèles linéaires
+ENGINES = ("sklearn", "fused")
+
+# Formats d'artefacts : pickles joblib, format numérique (src.artifacts),
+# ou numérique s'il a été exporté, pickles sinon
+ARTIFACT_FORMATS = ("auto", "pickle", "numeric")
+
+# Couples modèle/scaler (models/model_<clé>.pkl, models/scaler_<clé>.pkl)
+MODEL_KEYS = ("driver_win", "driver_time", "team_perf")
+LINEAR_MODELS = ("driver_win", "driver_time")
+
+
+def _fold_linear_pipeline(scaler, model):
+    """
+    Replie un scaler (StandardScaler / MinMaxScaler) suivi d'un modèle linéaire
+    en un seul couple (poids, biais) : model(scaler(x)) = x @ poids + biais.
+    
+    Returns:
+        (weights, bias) ou None si le pipeline n'est pas linéaire
+    """
+    coef = getattr(model, "coef_", None)
+    intercept = getattr(model, "intercept_", None)
+    if coef is None or intercept is None or np.ndim(coef) != 1:
+        return None
+    coef = np.asarray(coef, dtype=float)
+    
+    if hasattr(scaler, "data_min_"):
+        # MinMaxScaler : x * scale + min
+        weights = coef * np.asarray(scaler.scale_, dtype=float)
+        bias = float(intercept) + float(np.dot(coef, scaler.min_))
+    elif hasattr(scaler, "mean_"):
+        # StandardScaler : (x - mean) / scale, selon with_mean / with_std
+        with_mean = getattr(scaler, "with_mean", True) and scaler.mean_ is not None
+        with_std = getattr(scaler, "with_std", True) and scaler.scale_ is not None
+        mean = np.asarray(scaler.mean_, dtype=float) if with_mean else np.zeros_like(coef)
+        scale = np.asarray(scaler.scale_, dtype=float) if with_std else np.ones_like(coef)
+        weights = coef / scale
+        bias = float(intercept) - float(np.dot(weights, mean))
+    else:
+        return None
+    
+    return np.ascontiguousarray(weights), bias
+
+
+def _artifact_version(*paths):
+    """Empreinte courte (sha256) du contenu des fichiers d'un modèle et de son scaler."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def artifact_paths(key, models_dir=None, artifact_format="pickle"):
+    """
+    Chemins des deux fichiers d'un couple dans models_dir (MODELS_DIR par défaut) :
+    (modèle, scaler) en pickle, (schéma, données) au format numérique.
+    """
+    models_dir = Path(models_dir) if models_dir is not None else MODELS_DIR
+    if artifact_format == "numeric":
+        return models_dir / f"{key}.json", models_dir / f"{key}.bin"
+    return models_dir / f"model_{key}.pkl", models_dir / f"scaler_{key}.pkl"
+
+
+def artifact_signature(paths):
+    """(mtime_ns, taille) de chaque fichier, ou None s'il en manque un."""
+    try:
+        return tuple((st.st_mtime_ns, st.st_size) for st in map(os.stat, paths))
+    except OSError:
+        return None
+
+
+class ModelArtifact:
+    """
+    Couple modèle/scaler chargé, immuable une fois installé : les prédictions
+    lisent un seul objet, un remplacement à chaud ne mélange jamais deux versions.
+    """
+    
+    __slots__ = ("key", "model", "scaler", "fused", "tiers", "version", "signature", "loaded_at")
+    
+    def __init__(self, key, model, scaler, fused, version, signature, tiers=None):
+        self.key = key
+        self.model = model
+        self.scaler = scaler
+        self.fused = fused
+        self.tiers = tiers
+        self.version = version
+        self.signature = signature
+        self.loaded_at = time.time()
+
+
+def _tier_mapping(model, scaler):
+    """
+    Tier (0, 1, 2) de chaque cluster K-Means, d'après les points des centres
+    (échelle d'origine) : le meilleur cluster = Top Teams, le deuxième =
+    Mid-field, le troisième = Back-markers, les éventuels suivants = Mid-field.
+    
+    Returns:
+        Array (n_clusters,) des tier_label
+    """
+    centers_original = scaler.inverse_transform(model.cluster_centers_)
+    
+    # Trier les clusters par points (colonne 0), ordre stable en cas d'égalité
+    sorted_clusters = np.argsort(-centers_original[:, 0], kind="stable")
+    
+    tiers = np.ones(len(centers_original), dtype=int)
+    for rank, cluster in enumerate(sorted_clusters[:3]):
+        tiers[cluster] = 2 - rank
+    return tiers
+
 
 class ModelLoader:
-    """Classe pour charger et gérer les modèles."""
+    """
+    Classe pour charger et gérer les modèles.
     
-    def __init__(self):
+    Chaque couple modèle/scaler est chargé à la première utilisation
+    (thread-safe) ; load_all() reste disponible pour un chargement immédiat
+    et warmup() pour préchauffer les modèles en arrière-plan. install()
+    remplace un couple à chaud (voir src.registry).
+    """
+    
+    def __init__(self, engine="sklearn", models_dir=None, artifact_format="auto"):
+        """
+        Args:
+            engine: "sklearn" (scaler.transform + model.predict) ou "fused"
+                    (scaler et modèle linéaire repliés en un produit scalaire NumPy)
+            models_dir: Dossier des artefacts (MODELS_DIR par défaut)
+            artifact_format: "pickle", "numeric" (sans sklearn, voir src.artifacts)
+                             ou "auto" (numérique s'il existe, pickles sinon)
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Moteur inconnu: {engine} (attendu: {', '.join(ENGINES)})")
+        if artifact_format not in ARTIFACT_FORMATS:
+            raise ValueError(f"Format inconnu: {artifact_format} (attendu: {', '.join(ARTIFACT_FORMATS)})")
+        self.engine = engine
+        self.artifact_format = artifact_format
+        self.models_dir = Path(models_dir) if models_dir is not None else MODELS_DIR
         self.models = {}
         self.scalers = {}
+        self.fused = {}
+        self.versions = {}
         self.loaded = False
         self.errors = []
+        self._artifacts = {}
+        self._attempted = set()
+        self._lock = threading.RLock()
+    
+    def load(self, key):
+        """
+        Charge un couple modèle/scaler s'il ne l'a pas encore été.
+        
+        Args:
+            key: "driver_win", "driver_time" ou "team_perf"
+        
+        Returns:
+            True si le modèle est disponible
+        """
+        if key not in MODEL_KEYS:
+            raise ValueError(f"Modèle inconnu: {key} (attendu: {', '.join(MODEL_KEYS)})")
+        
+        if key not in self._attempted:
+            with self._lock:
+                if key not in self._attempted:
+                    try:
+                        self.install(key, self.read_artifact(key))
+                    except Exception as e:
+                        self.errors.append(f"{key}: {str(e)}")
+                    self._attempted.add(key)
+        return key in self._artifacts
+    
+    def artifact_files(self, key):
+        """
+        Returns:
+            (format, chemins) des fichiers qui seront lus pour ce couple
+        """
+        artifact_format = self.artifact_format
+        if artifact_format == "auto":
+            schema_path, _ = artifact_paths(key, self.models_dir, "numeric")
+            artifact_format = "numeric" if schema_path.exists() else "pickle"
+        return artifact_format, artifact_paths(key, self.models_dir, artifact_format)
+    
+    def artifact_signature(self, key):
+        """Format et (mtime_ns, taille) des fichiers du couple, ou None s'il en manque un."""
+        artifact_format, paths = self.artifact_files(key)
+        signature = artifact_signature(paths)
+        return (artifact_format, signature) if signature is not None else None
+    
+    def read_artifact(self, key):
+        """
+        Lit un couple modèle/scaler sur disque sans l'installer.
+        
+        Returns:
+            ModelArtifact (noyau fusionné inclus si engine="fused")
+        """
+        artifact_format, paths = self.artifact_files(key)
+        signature = self.artifact_signature(key)
+        
+        if artifact_format == "numeric":
+            from src.artifacts import load_numeric
+            model, scaler = load_numeric(key, self.models_dir)
+        else:
+            import joblib  # import différé : ~100 ms et plusieurs Mo évités sans prédiction
+            model = joblib.load(paths[0])
+            scaler = joblib.load(paths[1])
+        version = _artifact_version(*paths)
+        
+        fused = None
+        if self.engine == "fused" and key in LINEAR_MODELS:
+            fused = self._fused_kernel(key, model, scaler)
+        
+        # Correspondance cluster -> tier calculée une fois par modèle chargé
+        tiers = _tier_mapping(model, scaler) if hasattr(model, "cluster_centers_") else None
+        return ModelArtifact(key, model, scaler, fused, version, signature, tiers=tiers)
+    
+    def install(self, key, artifact):
+        """
+        Installe un artefact (remplacement atomique pour les prédictions en cours).
+        
+        Returns:
+            L'artefact remplacé, ou None
+        """
+        with self._lock:
+            previous = self._artifacts.get(key)
+            self._artifacts[key] = artifact
+            self._attempted.add(key)
+            
+            # Vues par type conservées pour l'affichage et la compatibilité
+            self.models[key] = artifact.model
+            self.scalers[key] = artifact.scaler
+            self.versions[key] = artifact.version
+            if artifact.fused is not None:
+                self.fused[key] = artifact.fused
+            else:
+                self.fused.pop(key, None)
+        return previous
+    
+    def artifact(self, key):
+        """Artefact installé (sans déclencher de chargement), ou None."""
+        return self._artifacts.get(key)
+    
+    def snapshot(self, key):
+        """
+        Artefact installé, chargé au besoin. Le même objet sert à la clé de
+        version et au scoring : un remplacement à chaud entre les deux est sans effet.
+        
+        Raises:
+            ValueError: modèle indisponible
+        """
+        self.load(key)
+        artifact = self._artifacts.get(key)
+        if artifact is None:
+            raise ValueError(f"Modèle {key} non chargé")
+        return artifact
     
     def load_all(self):
         """Charge tous les modèles et scalers."""
-        self.errors = []
-        
-        # Modèle Win Probability (Ridge pour theta)
-        try:
-            self.models["driver_win"] = joblib.load(MODELS_DIR / "model_driver_win.pkl")
-            self.scalers["driver_win"] = joblib.load(MODELS_DIR / "scaler_driver_win.pkl")
-        except Exception as e:
-            self.errors.append(f"driver_win: {str(e)}")
-        
-        # Modèle Temps de Course
-        try:
-            self.models["driver_time"] = joblib.load(MODELS_DIR / "model_driver_time.pkl")
-            self.scalers["driver_time"] = joblib.load(MODELS_DIR / "scaler_driver_time.pkl")
-        except Exception as e:
-            self.errors.append(f"driver_time: {str(e)}")
-        
-        # Modèle Team Performance (K-Means)
-        try:
-            self.models["team_perf"] = joblib.load(MODELS_DIR / "model_team_perf.pkl")
-            self.scalers["team_perf"] = joblib.load(MODELS_DIR / "scaler_team_perf.pkl")
-        except Exception as e:
-            self.errors.append(f"team_perf: {str(e)}")
+        with self._lock:
+            self.models = {}
+            self.scalers = {}
+            self.fused = {}
+            self.versions = {}
+            self.errors = []
+            self._artifacts = {}
+            self._attempted = set()
+            
+            # Win Probability (Ridge pour theta), Temps de Course, Team Performance (K-Means)
+            for key in MODEL_KEYS:
+                self.load(key)
         
         self.loaded = len(self.errors) == 0
         return self.loaded
     
+    def status(self, key):
+        """Retourne "loaded", "error" ou "pending" (pas encore chargé) sans déclencher de chargement."""
+        if key in self._artifacts:
+            return "loaded"
+        return "error" if key in self._attempted else "pending"
+    
+    def version(self, key):
+        """Empreinte de l'artefact (chargé au besoin), None si indisponible."""
+        self.load(key)
+        artifact = self._artifacts.get(key)
+        return artifact.version if artifact is not None else None
+    
+    def dummy_prediction(self, key, artifact=None):
+        """
+        Prédiction factice sur des features nulles (préchauffage, validation
+        d'un nouvel artefact avant installation). Lève une exception en cas d'échec.
+        """
+        artifact = artifact if artifact is not None else self._artifacts.get(key)
+        if artifact is None:
+            raise ValueError(f"Modèle {key} non chargé")
+        
+        columns = {
+            "driver_win": DRIVER_WIN_FEATURES,
+            "driver_time": DRIVER_TIME_FEATURES,
+            "team_perf": TEAM_PERF_FEATURES,
+        }[key]
+        X = pd.DataFrame(np.zeros((1, len(columns))), columns=columns)
+        return artifact.model.predict(artifact.scaler.transform(X))
+    
+    def warmup(self, keys=MODEL_KEYS, background=True):
+        """
+        Charge les modèles et exécute une prédiction factice par modèle, pour
+        que la première vraie requête ne paie ni l'import de sklearn ni
+        l'initialisation des estimateurs.
+        
+        Args:
+            keys: Modèles à préchauffer
+            background: Exécuter dans un thread démon (retourné) plutôt que sur place
+        
+        Returns:
+            Le thread de préchauffage, ou None si background=False
+        """
+        def run():
+            for key in keys:
+                if not self.load(key):
+                    continue
+                try:
+                    self.dummy_prediction(key)
+                except Exception:
+                    # Le préchauffage ne doit jamais faire échouer l'application
+                    pass
+        
+        if not background:
+            run()
+            return None
+        
+        thread = threading.Thread(target=run, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+    
+    def _fused_kernel(self, key, model, scaler):
+        """Replie un pipeline linéaire et vérifie l'équivalence avec sklearn."""
+        folded = _fold_linear_pipeline(scaler, model)
+        if folded is None:
+            return None
+        weights, bias = folded
+        
+        # Contrôle d'équivalence sur quelques points autour des statistiques du scaler
+        n_features = len(weights)
+        center = getattr(scaler, "mean_", None)
+        if center is None:
+            center = getattr(scaler, "data_min_", np.zeros(n_features))
+        probe = np.asarray(center, dtype=float) + np.vstack([np.zeros(n_features), np.eye(n_features)])
+        columns = getattr(scaler, "feature_names_in_", None)
+        probe_in = pd.DataFrame(probe, columns=columns) if columns is not None else probe
+        expected = model.predict(scaler.transform(probe_in))
+        
+        if np.allclose(probe @ weights + bias, expected, rtol=1e-9, atol=1e-6):
+            return weights, bias
+        self.errors.append(f"{key}: noyau fusionné non équivalent, repli sur sklearn")
+        return None
+    
     def predict_theta(self, X):
         """
         Prédit le score theta (force) pour un pilote.
@@ -63,16 +393,61 @@ class ModelLoader:
         Returns:
             Score theta (float)
         """
-        model = self.models.get("driver_win")
-        scaler = self.scalers.get("driver_win")
+        return self.predict_thetas(X)[0]
+    
+    def predict_thetas(self, X, artifact=None):
+        """
+        Prédit les scores theta d'un lot de pilotes en un seul appel scaler + Ridge.
+        
+        Args:
+            X: Matrice des features (n_pilotes, 9), ou plusieurs courses empilées
+               (n_courses, n_pilotes, 9). Un DataFrame avec les colonnes
+               DRIVER_WIN_FEATURES est aussi accepté.
+            artifact: Artefact driver_win à utiliser (snapshot() ; installé par défaut)
+        
+        Returns:
+            Array des theta de forme (n_pilotes,) ou (n_courses, n_pilotes)
+        """
+        # Un seul artefact lu : un remplacement à chaud ne mélange pas deux versions
+        if artifact is None:
+            artifact = self.snapshot("driver_win")
+        model, scaler, fused = artifact.model, artifact.scaler, artifact.fused
+        
+        if is_dataframe(X):
+            X = X[DRIVER_WIN_FEATURES].to_numpy(dtype=float)
+        X = np.asarray(X, dtype=float)
+        
+        n_features = len(DRIVER_WIN_FEATURES)
+        if X.ndim not in (2, 3) or X.shape[-1] != n_features:
+            raise ValueError(
+                f"Features driver_win de forme invalide {X.shape} "
+                f"(attendu (n, {n_features}) ou (courses, n, {n_features}))"
+            )
+        
+        if fused is not None:
+            # Moteur fusionné : un seul produit matriciel, sans validation sklearn
+            weights, bias = fused
+            return X @ weights + bias
+        
+        # Aplatir les courses pour un seul passage scaler + modèle
+        X_flat = pd.DataFrame(X.reshape(-1, n_features), columns=DRIVER_WIN_FEATURES)
+        thetas = model.predict(scaler.transform(X_flat))
         
-        if model is None or scaler is None:
-            raise ValueError("Modèle driver_win non chargé")
+        return np.asarray(thetas, dtype=float).reshape(X.shape[:-1])
+    
+    def predict_win_probabilities_batch(self, X):
+        """
+        Version vectorisée de predict_win_probabilities.
         
-        X_scaled = scaler.transform(X)
-        theta = model.predict(X_scaled)[0]
+        Args:
+            X: Matrice (n_pilotes, 9) ou (n_courses, n_pilotes, 9)
         
-        return theta
+        Returns:
+            thetas: Array (n_pilotes,) ou (n_courses, n_pilotes)
+            probabilities: Probabilités Plackett-Luce, même forme (somme = 1 par course)
+        """
+        thetas = self.predict_thetas(X)
+        return thetas, plackett_luce_probability(thetas)
     
     def predict_win_probabilities(self, drivers_features_list):
         """
@@ -85,43 +460,37 @@ class ModelLoader:
         Returns:
             Liste de tuples (driver_name, theta, win_probability)
         """
-        model = self.models.get("driver_win")
-        scaler = self.scalers.get("driver_win")
-        
-        if model is None or scaler is None:
-            raise ValueError("Modèle driver_win non chargé")
-        
-        # Calculer theta pour chaque pilote
-        results = []
-        thetas = []
+        if not drivers_features_list:
+            return []
         
-        for driver_name, X in drivers_features_list:
-            X_scaled = scaler.transform(X)
-            theta = model.predict(X_scaled)[0]
-            thetas.append(theta)
-            results.append({"driver": driver_name, "theta": theta})
+        names = [driver_name for driver_name, _ in drivers_features_list]
+        X_all = pd.concat([X for _, X in drivers_features_list], ignore_index=True)
         
-        # Appliquer Plackett-Luce pour obtenir les probabilités
-        thetas = np.array(thetas)
-        exp_theta = np.exp(thetas - np.max(thetas))  # Stabilisation numérique
-        probabilities = exp_theta / exp_theta.sum()
+        # Un seul appel scaler + modèle pour toute la grille
+        thetas, probabilities = self.predict_win_probabilities_batch(X_all)
         
-        # Ajouter les probabilités aux résultats
-        for i, prob in enumerate(probabilities):
-            results[i]["win_probability"] = prob
-        
-        return results
+        return [
+            {"driver": name, "theta": theta, "win_probability": prob}
+            for name, theta, prob in zip(names, thetas, probabilities)
+        ]
     
     def predict_race_time(self, X):
         """Prédit le temps de course en millisecondes."""
-        model = self.models.get("driver_time")
-        scaler = self.scalers.get("driver_time")
-        
-        if model is None or scaler is None:
-            raise ValueError("Modèle driver_time non chargé")
+        artifact = self.snapshot("driver_time")
         
-        X_scaled = scaler.transform(X)
-        return model.predict(X_scaled)
+        if artifact.fused is not None:
+            # Pas de contrôle feature_names_in_ de sklearn : colonnes remises dans l'ordre du modèle
+            if is_dataframe(X):
+                X = X[DRIVER_TIME_FEATURES].to_numpy(dtype=float)
+            X = np.asarray(X, dtype=float)
+            n_features = len(DRIVER_TIME_FEATURES)
+            if X.ndim != 2 or X.shape[1] != n_features:
+                raise ValueError(f"Features driver_time de forme invalide {X.shape} (attendu (n, {n_features}))")
+            weights, bias = artifact.fused
+            return X @ weights + bias
+
+        X_scaled = artifact.scaler.transform(X)
+        return artifact.model.predict(X_scaled)
     
     def predict_team_tier(self, X):
         """
@@ -131,31 +500,48 @@ class ModelLoader:
             cluster: Numéro du cluster (0, 1, 2)
             tier_name: Nom du tier ("Back-markers", "Mid-field", "Top Teams")
         """
-        model = self.models.get("team_perf")
-        scaler = self.scalers.get("team_perf")
+        artifact = self._team_perf_artifact()
         
-        if model is None or scaler is None:
-            raise ValueError("Modèle team_perf non chargé")
+        X_scaled = artifact.scaler.transform(X)
+        cluster = artifact.model.predict(X_scaled)[0]
         
-        X_scaled = scaler.transform(X)
-        cluster = model.predict(X_scaled)[0]
+        tier_label = int(artifact.tiers[cluster])
+        tier_name = TIER_NAMES.get(tier_label, "Unknown")
+        
+        return cluster, tier_label, tier_name
+    
+    def predict_team_tiers(self, X):
+        """
+        Classe un lot d'équipes en un seul calcul vectorisé du centre le plus proche.
         
-        # Déterminer le tier basé sur les centres des clusters
-        centers = model.cluster_centers_
-        centers_original = scaler.inverse_transform(centers)
+        Args:
+            X: DataFrame (colonnes TEAM_PERF_FEATURES) ou matrice (n_équipes, 2)
         
-        # Trier les clusters par points (colonne 0)
-        sorted_clusters = sorted(range(len(centers_original)), 
-                                  key=lambda i: centers_original[i][0], 
-                                  reverse=True)
+        Returns:
+            Dict d'arrays :
+                cluster (n,), tier_label (n,), tier_name (n,),
+                distances (n, n_clusters) : distances euclidiennes aux centres (espace standardisé),
+                scores (n, n_clusters) : affectation souple softmax(-distance²), somme = 1 par équipe
+        """
+        artifact = self._team_perf_artifact()
         
-        tier_mapping = {
-            sorted_clusters[0]: 2,  # Top Teams
-            sorted_clusters[1]: 1,  # Mid-field
-            sorted_clusters[2]: 0,  # Back-markers
-        }
+        if not is_dataframe(X) and getattr(artifact.scaler, "feature_names_in_", None) is not None:
+            X = pd.DataFrame(np.asarray(X, dtype=float).reshape(-1, len(TEAM_PERF_FEATURES)),
+                             columns=TEAM_PERF_FEATURES)
+        X_scaled = np.asarray(artifact.scaler.transform(X), dtype=float)
         
-        tier_label = tier_mapping.get(cluster, 1)
-        tier_name = TIER_NAMES.get(tier_label, "Unknown")
+        centers = np.asarray(artifact.model.cluster_centers_, dtype=float)
+        squared = ((X_scaled[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        clusters = squared.argmin(axis=1)
+        tier_labels = artifact.tiers[clusters]
         
-        return cluster, tier_label, tier_name
\ No newline at end of file
+        return {
+            "cluster": clusters,
+            "tier_label": tier_labels,
+            "tier_name": np.array([TIER_NAMES.get(int(t), "Unknown") for t in tier_labels], dtype=object),
+            "distances": np.sqrt(squared),
+            "scores": plackett_luce_probability(-squared),  # softmax stable sur les clusters
+        }
+    
+    def _team_perf_artifact(self):
+        return self.snapshot("team_perf")
@@ -0,0 +1,204 @@
+"""
+Registre des versions de modèles avec rechargement à chaud
+
+Surveille models/ (watchdog, ou scrutation périodique à défaut), recharge
+les couples modèle/scaler modifiés, les valide par une prédiction factice
+puis les installe atomiquement dans le ModelLoader. La version précédente
+est conservée pour un retour arrière immédiat.
+
+Usage :
+    registry = ModelRegistry(model_loader)
+    registry.start()          # surveillance en arrière-plan
+    registry.check()          # ou vérification manuelle
+    registry.rollback("driver_win")
+"""
+import threading
+import time
+
+from src.models import MODEL_KEYS
+
+# Fichiers d'artefacts surveillés (pickles et format numérique)
+ARTIFACT_SUFFIXES = (".pkl", ".json", ".bin")
+
+
+class ModelRegistry:
+    """Suivi des versions (empreinte sha256 + mtime) et remplacement à chaud des modèles."""
+
+    def __init__(self, model_loader, debounce=1.0, poll_interval=5.0):
+        """
+        Args:
+            model_loader: ModelLoader dont les artefacts sont remplacés
+            debounce: Délai (s) après le dernier événement fichier avant rechargement
+                      (le modèle et le scaler sont écrits l'un après l'autre)
+            poll_interval: Période (s) de scrutation si watchdog est indisponible
+        """
+        self.model_loader = model_loader
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.previous = {}
+        self.history = []
+        self.errors = []
+
+        # Signature disque ignorée après un retour arrière (jusqu'au prochain changement)
+        self._pinned = {}
+        self._lock = threading.RLock()
+        self._timer = None
+        self._observer = None
+        self._poller = None
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Versions
+    # ------------------------------------------------------------------
+    def versions(self):
+        """
+        Returns:
+            Dict {clé: {"version", "loaded_at", "previous"}} des modèles installés
+        """
+        info = {}
+        for key in MODEL_KEYS:
+            artifact = self.model_loader.artifact(key)
+            previous = self.previous.get(key)
+            info[key] = {
+                "version": artifact.version if artifact is not None else None,
+                "loaded_at": artifact.loaded_at if artifact is not None else None,
+                "previous": previous.version if previous is not None else None,
+            }
+        return info
+
+    def _record(self, key, action, version):
+        self.history.append({"time": time.time(), "key": key, "action": action, "version": version})
+
+    # ------------------------------------------------------------------
+    # Rechargement et retour arrière
+    # ------------------------------------------------------------------
+    def check(self):
+        """
+        Recharge les couples dont les fichiers ont changé sur disque.
+
+        Returns:
+            Liste des clés dont la version installée a changé
+        """
+        swapped = []
+        with self._lock:
+            for key in MODEL_KEYS:
+                if self.model_loader.status(key) == "pending":
+                    # Jamais utilisé : le chargement paresseux lira la version courante
+                    continue
+
+                signature = self.model_loader.artifact_signature(key)
+                artifact = self.model_loader.artifact(key)
+                if signature is None or signature == self._pinned.get(key):
+                    continue
+                if artifact is not None and signature == artifact.signature:
+                    continue
+
+                if self.reload(key):
+                    swapped.append(key)
+        return swapped
+
+    def reload(self, key):
+        """
+        Lit, valide et installe la version sur disque d'un couple.
+
+        Returns:
+            True si une nouvelle version a été installée
+        """
+        with self._lock:
+            try:
+                artifact = self.model_loader.read_artifact(key)
+                self.model_loader.dummy_prediction(key, artifact)
+            except Exception as e:
+                # Fichier en cours d'écriture ou artefact invalide : on garde la version actuelle
+                self.errors.append(f"{key}: rechargement refusé ({e})")
+                return False
+
+            self._pinned.pop(key, None)
+            current = self.model_loader.artifact(key)
+            if current is not None and current.version == artifact.version:
+                # Fichiers réécrits à l'identique : pas de nouvelle version
+                self.model_loader.install(key, artifact)
+                return False
+
+            replaced = self.model_loader.install(key, artifact)
+            if replaced is not None:
+                self.previous[key] = replaced
+            self._record(key, "reload", artifact.version)
+            return True
+
+    def rollback(self, key):
+        """
+        Réinstalle la version précédente d'un couple (un second appel annule le retour arrière).
+
+        Returns:
+            Version réinstallée
+        """
+        with self._lock:
+            previous = self.previous.get(key)
+            if previous is None:
+                raise ValueError(f"Aucune version précédente pour {key}")
+
+            self.previous[key] = self.model_loader.install(key, previous)
+            # Ne pas recharger aussitôt la version (plus récente) présente sur disque
+            self._pinned[key] = self.model_loader.artifact_signature(key)
+            self._record(key, "rollback", previous.version)
+            return previous.version
+
+    # ------------------------------------------------------------------
+    # Surveillance
+    # ------------------------------------------------------------------
+    def _schedule_check(self):
+        """Regroupe les événements rapprochés en une seule vérification."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self.check)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def start(self):
+        """Démarre la surveillance de models/ (watchdog, sinon scrutation)."""
+        if self._observer is not None or self._poller is not None:
+            return self
+
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            self._stop.clear()
+            self._poller = threading.Thread(target=self._poll, name="model-registry-poll", daemon=True)
+            self._poller.start()
+            return self
+
+        registry = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                paths = (getattr(event, "src_path", ""), getattr(event, "dest_path", ""))
+                if any(str(path).endswith(ARTIFACT_SUFFIXES) for path in paths):
+                    registry._schedule_check()
+
+        self._observer = Observer()
+        self._observer.daemon = True
+        self._observer.schedule(Handler(), str(self.model_loader.models_dir), recursive=False)
+        self._observer.start()
+        return self
+
+    def _poll(self):
+        while not self._stop.wait(self.poll_interval):
+            self.check()
+
+    def stop(self):
+        """Arrête la surveillance."""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        if self._poller is not None:
+            self._stop.set()
+            self._poller.join()
+            self._poller = None
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
@@ -0,0 +1,152 @@
+"""
+Scoring incrémental : ne re-score que les pilotes dont les entrées ont changé
+"""
+import numpy as np
+
+from src.features import DRIVER_WIN_FEATURES, build_driver_win_matrix
+
+# Circuit sans référence : pole générique (~1:20.000)
+DEFAULT_POLE_S = 80.0
+
+
+def reference_times(circuit_refs=None):
+    """
+    Temps de référence d'un circuit pour l'onglet podium.
+
+    Args:
+        circuit_refs: Série FeatureStore.circuit_reference (None ou sans pole : pole générique)
+
+    Returns:
+        Tuple (pole_q1, pole_q2, pole_q3, ref_fastest_lap, ref_avg_lap_ms), hashable
+    """
+    if circuit_refs is not None and circuit_refs["ref_pole_q3"] == circuit_refs["ref_pole_q3"]:
+        return tuple(float(circuit_refs[name]) for name in (
+            "ref_pole_q1", "ref_pole_q2", "ref_pole_q3", "ref_fastest_lap", "ref_avg_lap_ms"))
+    pole_q3 = DEFAULT_POLE_S
+    # Q1/Q2 environ 1.5s / 0.7s plus lents
+    return pole_q3 + 1.5, pole_q3 + 0.7, pole_q3, pole_q3, pole_q3 * 1000 + 2500
+
+
+def driver_win_row_builder(references):
+    """
+    Constructeur de lignes driver_win pour IncrementalScorer.update.
+
+    Les configurations sont (grille, delta Q, tours, arrêts, durée arrêt) ;
+    les temps du circuit (`references`, voir reference_times) ne font pas
+    partie de la configuration : ils doivent entrer dans la version passée
+    à update(), sans quoi un changement de circuit garderait des theta périmés.
+    """
+    pole_q1, pole_q2, pole_q3, ref_fastest_lap, ref_avg_lap_ms = references
+
+    def build_rows(driver_inputs):
+        grid, q_delta, race_laps, stops, pit_duration = (np.array(col, dtype=float) for col in zip(*driver_inputs))
+
+        # Q1, Q2, Q3 : temps de pole du circuit + écart du pilote
+        q1_time = pole_q1 + q_delta
+        q2_time = pole_q2 + q_delta
+        q3_time = np.where(grid <= 10, pole_q3 + q_delta, 999)  # Hors Q3 si grille > 10
+
+        # Rythme en course proportionnel à l'écart en qualification
+        pace = (pole_q3 + q_delta) / pole_q3
+        fastest_lap_s = ref_fastest_lap * pace  # fastestLapTime est en secondes dans le dataset
+        avg_lap_ms = ref_avg_lap_ms * pace
+
+        return build_driver_win_matrix(
+            grid=grid,
+            laps=race_laps,
+            q1_sec=q1_time,
+            q2_sec=q2_time,
+            q3_sec=q3_time,
+            fastest_lap_time=fastest_lap_s,
+            avg_lap_ms=avg_lap_ms,
+            pit_stop_count=stops,
+            avg_pit_duration_s=pit_duration
+        )
+
+    return build_rows
+
+
+class IncrementalScorer:
+    """
+    État de scoring d'une course : theta et exp(theta) de chaque pilote.
+
+    À chaque mise à jour, seules les lignes dont la configuration a changé
+    sont reconstruites (un seul appel au constructeur de matrice) et
+    re-scorées (un seul appel au modèle) ; les
+    probabilités Plackett-Luce sont renormalisées en O(n) à partir des
+    exp(theta) en cache.
+    """
+
+    def __init__(self, scorer):
+        """
+        Args:
+            scorer: Objet exposant predict_thetas (ModelLoader, PredictionCache, MicroBatcher)
+        """
+        self.scorer = scorer
+        self.names = []
+        self.inputs = {}
+        self.features = np.empty((0, len(DRIVER_WIN_FEATURES)))
+        self.thetas = np.empty(0)
+        self.exp_thetas = np.empty(0)
+        self.shift = 0.0
+        self.version = None
+        self.last_rescored = 0
+
+    def update(self, inputs, build_rows, version=None):
+        """
+        Met à jour l'état à partir des entrées de chaque pilote.
+
+        Args:
+            inputs: Dict {pilote: configuration hashable} (ordre = ordre d'affichage)
+            build_rows: Fonction liste de configurations -> matrice de features
+                        driver_win (n, 9), ex. via build_driver_win_matrix
+            version: Version du modèle driver_win ; un changement re-score tout
+
+        Returns:
+            Liste des pilotes re-scorés
+        """
+        names = list(inputs)
+        if names != self.names or version != self.version:
+            # Grille ou modèle différents : tout reconstruire
+            self._reset(names)
+            self.version = version
+
+        changed = [i for i, name in enumerate(names) if self.inputs.get(name) != inputs[name]]
+        self.last_rescored = len(changed)
+        if not changed:
+            return []
+
+        rows = np.asarray(build_rows([inputs[names[i]] for i in changed]), dtype=float)
+        self.features[changed] = rows
+        new_thetas = np.asarray(self.scorer.predict_thetas(rows), dtype=float)
+        self.thetas[changed] = new_thetas
+        for i in changed:
+            self.inputs[names[i]] = inputs[names[i]]
+
+        if len(changed) == len(names) or new_thetas.max() > self.shift:
+            # Nouveau maximum : recentrer toutes les exponentielles (stabilité numérique)
+            self.shift = float(self.thetas.max())
+            self.exp_thetas = np.exp(self.thetas - self.shift)
+        else:
+            self.exp_thetas[changed] = np.exp(new_thetas - self.shift)
+
+        return [names[i] for i in changed]
+
+    def probabilities(self):
+        """Probabilités de victoire Plackett-Luce (somme = 1)."""
+        return self.exp_thetas / self.exp_thetas.sum()
+
+    def results(self):
+        """Liste de dicts {driver, theta, win_probability}, comme ModelLoader.predict_win_probabilities."""
+        return [
+            {"driver": name, "theta": theta, "win_probability": prob}
+            for name, theta, prob in zip(self.names, self.thetas, self.probabilities())
+        ]
+
+    def _reset(self, names):
+        self.names = names
+        self.inputs = {}
+        self.features = np.zeros((len(names), len(DRIVER_WIN_FEATURES)))
+        self.thetas = np.zeros(len(names))
+        self.exp_thetas = np.zeros(len(names))
+        self.shift = 0.0
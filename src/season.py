@@ -0,0 +1,336 @@
+"""
+Projection du championnat : simulation des courses restantes de la saison
+
+Usage :
+    python -m src.season [--n-sims 100000] [--seed 42] [--n-jobs 1]
+"""
+import numpy as np
+import pandas as pd
+
+from src.features import build_driver_win_matrix
+from src.scoring import DEFAULT_POLE_S
+from src.simulation import DEFAULT_MEMORY_BUDGET, plan_jobs, points_vector, run_jobs
+
+# Arguments de build_driver_win_matrix (mêmes clés que FeatureStore.default_inputs)
+RACE_INPUTS = ['grid', 'laps', 'q1_sec', 'q2_sec', 'q3_sec', 'fastest_lap_time',
+               'avg_lap_ms', 'pit_stop_count', 'avg_pit_duration_s']
+
+
+def remaining_races(calendar):
+    """Retourne les courses non disputées (completed: False) du calendrier."""
+    return [race for race in calendar if not race["completed"]]
+
+
+def race_inputs(feature_store, driver_ids, circuit_id, year, laps=None):
+    """
+    Entrées driver_win attendues de chaque pilote pour une course, d'après
+    le feature store (FeatureStore.default_inputs).
+
+    Une valeur inconnue (pilote sans historique) prend la médiane des autres
+    pilotes ; sans référence du circuit, les temps sont dérivés d'une pole
+    générique (DEFAULT_POLE_S) ou du Q1. La grille est l'ordre du Q1 attendu
+    (inconnus en fin de grille), comme les valeurs par défaut de l'onglet podium.
+
+    Args:
+        feature_store: FeatureStore
+        driver_ids: driverId de chaque pilote (None si inconnu)
+        circuit_id: circuitId de la course
+        year: Saison
+        laps: Nombre de tours du calendrier (référence du circuit sinon)
+
+    Returns:
+        Dict {argument: array (n_pilotes,)} pour build_driver_win_matrix
+    """
+    entries = [feature_store.default_inputs(driver_id, circuit_id, year) if driver_id is not None else None
+               for driver_id in driver_ids]
+    inputs = {name: np.array([np.nan if e is None else e[name] for e in entries], dtype=float)
+              for name in RACE_INPUTS}
+    if laps is not None:
+        inputs['laps'][:] = laps
+
+    for name, column in inputs.items():
+        known = column[~np.isnan(column)]
+        if known.size and known.size < column.size:
+            column[np.isnan(column)] = np.median(known)
+
+    fallbacks = {
+        'q1_sec': lambda: DEFAULT_POLE_S + 1.5,
+        'q2_sec': lambda: DEFAULT_POLE_S + 0.7,
+        'q3_sec': lambda: DEFAULT_POLE_S,
+        'fastest_lap_time': lambda: inputs['q1_sec'],
+        'avg_lap_ms': lambda: (inputs['fastest_lap_time'] + 2.5) * 1000,
+    }
+    for name, fallback in fallbacks.items():
+        if np.isnan(inputs[name]).all():
+            inputs[name][:] = fallback()
+
+    q1 = inputs['q1_sec']
+    order = np.lexsort((np.arange(len(q1)), np.where(np.isnan(q1), np.inf, q1)))
+    inputs['grid'][order] = np.arange(1, len(q1) + 1)
+    return inputs
+
+
+def remaining_race_features(data_loader, drivers, races, year=2025):
+    """
+    Features driver_win de chaque course restante.
+
+    Args:
+        data_loader: F1DataLoader chargé
+        drivers: Liste de dicts {"name", "team", ...} (ex : GRID_2025)
+        races: Courses du calendrier (dicts {"circuit_id", "laps", ...})
+        year: Saison en cours
+
+    Returns:
+        Array (n_courses, n_pilotes, 9) dans l'ordre DRIVER_WIN_FEATURES
+    """
+    features = np.empty((len(races), len(drivers), len(RACE_INPUTS)))
+    if not races:
+        return features
+
+    feature_store = data_loader.get_feature_store()
+    driver_ids = [data_loader.get_driver_id(d["name"]) for d in drivers]
+    for i, race in enumerate(races):
+        inputs = race_inputs(feature_store, driver_ids, race["circuit_id"], year, laps=race.get("laps"))
+        features[i] = build_driver_win_matrix(**inputs)
+    return features
+
+
+def current_driver_points(data_loader, drivers, year=2025):
+    """
+    Points actuels de chaque pilote de `drivers` (ordre conservé).
+
+    Args:
+        data_loader: F1DataLoader chargé
+        drivers: Liste de dicts {"name", "team", ...} (ex : GRID_2025)
+        year: Saison en cours
+
+    Returns:
+        Array (n_drivers,) des points (0 pour un pilote absent du classement)
+    """
+    standings = data_loader.get_latest_standings(year) if data_loader is not None else None
+    if standings is None or standings.empty:
+        return np.zeros(len(drivers))
+
+    points_by_name = dict(zip(standings["Pilote"], standings["Points"]))
+    return np.array([float(points_by_name.get(d["name"], 0.0)) for d in drivers])
+
+
+def team_membership(drivers):
+    """
+    Matrice d'appartenance pilote × équipe.
+
+    Returns:
+        teams: Liste des équipes (ordre de première apparition)
+        membership: Array (n_drivers, n_teams) de 0/1
+    """
+    teams = list(dict.fromkeys(d["team"] for d in drivers))
+    index = {team: i for i, team in enumerate(teams)}
+    membership = np.zeros((len(drivers), len(teams)))
+    for i, driver in enumerate(drivers):
+        membership[i, index[driver["team"]]] = 1.0
+    return teams, membership
+
+
+def _season_block_size(n_races, n_drivers, memory_budget):
+    """Saisons simulées par bloc : ~3 tableaux (courses × saisons × pilotes) float32/int64."""
+    per_season = max(n_races, 1) * max(n_drivers, 1) * (4 + 8 + 4)
+    return max(1, int(memory_budget // per_season))
+
+
+def _championship_counts(race_thetas, current_points, membership, points_table,
+                         block_size, n_sims, seed_seq):
+    """
+    Simule n_sims fins de saison et compte les titres pilotes / constructeurs.
+
+    Returns:
+        (driver_titles, team_titles, points_sum)
+    """
+    rng = np.random.default_rng(seed_seq)
+    n_races, n_drivers = race_thetas.shape
+    thetas = race_thetas.astype(np.float32)[:, None, :]
+    table = points_table.astype(np.float32)
+
+    driver_titles = np.zeros(n_drivers, dtype=np.int64)
+    team_titles = np.zeros(membership.shape[1], dtype=np.int64)
+    points_sum = np.zeros(n_drivers)
+
+    remaining = int(n_sims)
+    while remaining > 0:
+        size = min(block_size, remaining)
+
+        # Gumbel-max vectorisé sur (courses × saisons × pilotes)
+        noise = rng.random((n_races, size, n_drivers), dtype=np.float32)
+        np.clip(noise, np.finfo(np.float32).tiny, None, out=noise)
+        np.log(noise, out=noise)
+        np.negative(noise, out=noise)
+        np.log(noise, out=noise)
+        noise -= thetas  # -(theta + gumbel) : tri croissant = ordre d'arrivée
+        order = np.argsort(noise, axis=2)
+
+        race_points = np.empty((n_races, size, n_drivers), dtype=np.float32)
+        np.put_along_axis(race_points, order, np.broadcast_to(table, race_points.shape), axis=2)
+
+        totals = race_points.sum(axis=0, dtype=np.float64) + current_points
+        driver_titles += np.bincount(totals.argmax(axis=1), minlength=n_drivers)
+        team_titles += np.bincount((totals @ membership).argmax(axis=1), minlength=team_titles.size)
+        points_sum += totals.sum(axis=0)
+
+        remaining -= size
+
+    return driver_titles, team_titles, points_sum
+
+
+def simulate_championship(race_thetas, current_points, drivers, n_sims=1_000_000,
+                          seed=None, memory_budget=DEFAULT_MEMORY_BUDGET,
+                          n_jobs=1, points=None):
+    """
+    Simule la fin de saison n_sims fois et estime les probabilités de titre.
+
+    Args:
+        race_thetas: Array (n_courses, n_pilotes) des theta de chaque course restante
+        current_points: Array (n_pilotes,) des points déjà acquis
+        drivers: Liste de dicts {"name", "team"} alignée sur les colonnes (ex : GRID_2025)
+        n_sims: Nombre de saisons simulées
+        seed: Graine ; résultat reproductible pour (seed, n_jobs)
+        memory_budget: Budget mémoire par bloc, en octets
+        n_jobs: Nombre de processus (1 = séquentiel, -1 = tous les cœurs)
+        points: Barème de points (F1_POINTS par défaut)
+
+    Returns:
+        drivers_df: DataFrame (Pilote, Équipe, Points actuels, Points projetés, Titre)
+        constructors_df: DataFrame (Constructeur, Points actuels, Points projetés, Titre)
+    """
+    race_thetas = np.asarray(race_thetas, dtype=float)
+    if race_thetas.ndim == 1:
+        race_thetas = race_thetas[None, :]
+    current_points = np.asarray(current_points, dtype=float)
+
+    n_drivers = len(drivers)
+    if race_thetas.shape[1] != n_drivers or current_points.shape != (n_drivers,):
+        raise ValueError("race_thetas et current_points doivent être alignés sur drivers")
+    if n_sims <= 0:
+        raise ValueError("n_sims doit être positif")
+
+    teams, membership = team_membership(drivers)
+    current_team_points = current_points @ membership
+
+    if race_thetas.shape[0] == 0:
+        # Saison terminée : le classement actuel est définitif
+        driver_titles = np.zeros(n_drivers)
+        driver_titles[current_points.argmax()] = n_sims
+        team_titles = np.zeros(len(teams))
+        team_titles[current_team_points.argmax()] = n_sims
+        points_sum = current_points * n_sims
+    else:
+        table = points_vector(n_drivers, points)
+        block_size = _season_block_size(race_thetas.shape[0], n_drivers, memory_budget)
+        shares, seed_seqs = plan_jobs(n_sims, n_jobs, seed)
+        driver_titles, team_titles, points_sum = run_jobs(
+            _championship_counts, shares, seed_seqs,
+            race_thetas, current_points, membership, table, block_size,
+        )
+
+    expected_points = points_sum / n_sims
+
+    drivers_df = pd.DataFrame({
+        "Pilote": [d["name"] for d in drivers],
+        "Équipe": [d["team"] for d in drivers],
+        "Points actuels": current_points,
+        "Points projetés": expected_points,
+        "Titre": driver_titles / n_sims,
+    }).sort_values(["Titre", "Points projetés"], ascending=False).reset_index(drop=True)
+
+    constructors_df = pd.DataFrame({
+        "Constructeur": teams,
+        "Points actuels": current_team_points,
+        "Points projetés": expected_points @ membership,
+        "Titre": team_titles / n_sims,
+    }).sort_values(["Titre", "Points projetés"], ascending=False).reset_index(drop=True)
+
+    return drivers_df, constructors_df
+
+
+def project_championship(model_loader, race_features, current_points, drivers, **kwargs):
+    """
+    Projection du championnat à partir des features driver_win de chaque course restante.
+
+    Args:
+        model_loader: ModelLoader avec driver_win chargé
+        race_features: Array (n_courses, n_pilotes, 9) des features driver_win
+        current_points: Array (n_pilotes,) des points déjà acquis
+        drivers: Liste de dicts {"name", "team"} alignée sur les pilotes
+        **kwargs: Transmis à simulate_championship (n_sims, seed, n_jobs, ...)
+
+    Returns:
+        (drivers_df, constructors_df) comme simulate_championship
+    """
+    race_features = np.asarray(race_features, dtype=float)
+    if race_features.ndim == 2:
+        race_features = race_features[None, :, :]
+    if race_features.shape[0] == 0:
+        race_thetas = np.empty((0, len(drivers)))
+    else:
+        # Un seul appel au modèle pour toutes les courses restantes
+        race_thetas = model_loader.predict_thetas(race_features)
+    return simulate_championship(race_thetas, current_points, drivers, **kwargs)
+
+
+def project_remaining_season(model_loader, data_loader, drivers=None, calendar=None, year=2025, **kwargs):
+    """
+    Projection du championnat sur les courses restantes du calendrier, à
+    partir du classement actuel (F1DataLoader.get_latest_standings).
+
+    Args:
+        model_loader: ModelLoader (driver_win chargé au besoin)
+        data_loader: F1DataLoader chargé
+        drivers: Grille (GRID_2025 par défaut)
+        calendar: Calendrier (F1_CALENDAR_2025 par défaut)
+        year: Saison en cours
+        **kwargs: Transmis à simulate_championship (n_sims, seed, n_jobs, ...)
+
+    Returns:
+        (drivers_df, constructors_df) comme simulate_championship
+    """
+    from data.data_loader import F1_CALENDAR_2025, GRID_2025
+
+    drivers = GRID_2025 if drivers is None else drivers
+    races = remaining_races(F1_CALENDAR_2025 if calendar is None else calendar)
+
+    race_features = remaining_race_features(data_loader, drivers, races, year)
+    current_points = current_driver_points(data_loader, drivers, year)
+    return project_championship(model_loader, race_features, current_points, drivers, **kwargs)
+
+
+def main():
+    import argparse
+
+    from data.data_loader import F1DataLoader
+    from src.models import ModelLoader
+
+    parser = argparse.ArgumentParser(description="Projection du championnat sur les courses restantes")
+    parser.add_argument("--n-sims", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--n-jobs", type=int, default=1)
+    parser.add_argument("--year", type=int, default=2025)
+    args = parser.parse_args()
+
+    data_loader = F1DataLoader()
+    if not data_loader.load():
+        raise SystemExit("❌ Données non chargées")
+
+    try:
+        drivers_df, constructors_df = project_remaining_season(
+            ModelLoader(), data_loader, year=args.year,
+            n_sims=args.n_sims, seed=args.seed, n_jobs=args.n_jobs,
+        )
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+
+    pd.set_option("display.width", 120)
+    print(drivers_df.round(3).to_string(index=False))
+    print()
+    print(constructors_df.round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Service de prédiction HTTP/JSON (sans Streamlit)
+
+Charge ModelLoader une seule fois et expose :
+    GET  /health          état des modèles
+    POST /predict/win     theta + probabilités Plackett-Luce (une ou plusieurs courses)
+    POST /predict/time    temps de course (ms)
+    POST /predict/tier    tier K-Means des équipes
+    GET  /metrics         métriques du micro-batching (si activé)
+    GET  /models          versions installées / précédentes (si --watch-models)
+    POST /models/rollback retour à la version précédente : {"model": "driver_win"}
+
+Uniquement la bibliothèque standard : ThreadingHTTPServer en HTTP/1.1
+(keep-alive), un thread par connexion.
+
+Usage :
+    python -m src.service --host 127.0.0.1 --port 8000 --engine fused [--batch-window-ms 2] [--watch-models]
+"""
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from src.batching import MicroBatcher
+from src.features import DRIVER_TIME_FEATURES, DRIVER_WIN_FEATURES, TEAM_PERF_FEATURES
+from src.lazy import lazy_import
+from src.models import MODEL_KEYS, ModelLoader
+from src.registry import ModelRegistry
+
+pd = lazy_import("pandas")
+
+# Taille maximale d'un corps de requête (octets)
+MAX_BODY_BYTES = 4 * 1024 * 1024
+
+
+class ServiceError(Exception):
+    """Erreur renvoyée au client avec un code HTTP."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _feature_matrix(rows, columns):
+    """
+    Convertit une liste de lignes (listes ou dicts par nom de feature),
+    éventuellement imbriquée par course, en array float64 (..., n_features).
+    """
+    def convert(item):
+        if isinstance(item, dict):
+            missing = [c for c in columns if c not in item]
+            if missing:
+                raise ServiceError(400, f"Features manquantes: {', '.join(missing)}")
+            return [item[c] for c in columns]
+        if isinstance(item, list) and item and isinstance(item[0], (list, dict)):
+            return [convert(sub) for sub in item]
+        return item
+
+    if not isinstance(rows, list) or not rows:
+        raise ServiceError(400, "'features' doit être une liste non vide")
+
+    try:
+        X = np.asarray(convert(rows), dtype=float)
+    except (TypeError, ValueError) as e:
+        raise ServiceError(400, f"Features invalides: {e}")
+
+    if X.ndim < 2 or X.shape[-1] != len(columns):
+        raise ServiceError(400, f"Chaque ligne doit contenir {len(columns)} features: {columns}")
+    return X
+
+
+class PredictionService:
+    """Logique des endpoints, indépendante du transport HTTP."""
+
+    def __init__(self, model_loader, batcher=None, registry=None):
+        self.model_loader = model_loader
+        # MicroBatcher optionnel : regroupe les /predict/win concurrents
+        self.batcher = batcher
+        # ModelRegistry optionnel : rechargement à chaud de models/
+        self.registry = registry
+
+    def _require(self, key):
+        if not self.model_loader.load(key):
+            raise ServiceError(503, f"Modèle {key} non chargé")
+
+    def health(self, payload=None):
+        return {
+            "status": "ok",
+            "engine": self.model_loader.engine,
+            "models": sorted(self.model_loader.models),
+            "model_status": {key: self.model_loader.status(key) for key in MODEL_KEYS},
+            "versions": dict(self.model_loader.versions),
+            "errors": self.model_loader.errors,
+        }
+
+    def predict_win(self, payload):
+        """
+        Corps : {"features": [[9 valeurs] | {feature: valeur}, ...], "drivers": [noms]}
+        "features" peut aussi être une liste de courses (n_courses × n_pilotes × 9).
+        """
+        self._require("driver_win")
+        X = _feature_matrix(payload.get("features"), DRIVER_WIN_FEATURES)
+        if X.ndim > 3:
+            raise ServiceError(400, "Au plus 3 dimensions (courses × pilotes × features)")
+
+        scorer = self.batcher if self.batcher is not None else self.model_loader
+        thetas, probabilities = scorer.predict_win_probabilities_batch(X)
+        response = {"thetas": thetas.tolist(), "win_probabilities": probabilities.tolist()}
+        if "drivers" in payload:
+            response["drivers"] = payload["drivers"]
+        return response
+
+    def predict_time(self, payload):
+        """Corps : {"features": [[grid, circuitId, constructorId, number_driver, year], ...]}"""
+        self._require("driver_time")
+        X = _feature_matrix(payload.get("features"), DRIVER_TIME_FEATURES)
+        if X.ndim != 2:
+            raise ServiceError(400, "'features' doit être une matrice (n × 5)")
+
+        milliseconds = self.model_loader.predict_race_time(pd.DataFrame(X, columns=DRIVER_TIME_FEATURES))
+        return {"milliseconds": np.asarray(milliseconds, dtype=float).tolist()}
+
+    def metrics(self, payload=None):
+        if self.batcher is None:
+            raise ServiceError(404, "Micro-batching désactivé")
+        return self.batcher.metrics()
+
+    def _require_registry(self):
+        if self.registry is None:
+            raise ServiceError(404, "Registre de modèles désactivé")
+        return self.registry
+
+    def model_versions(self, payload=None):
+        registry = self._require_registry()
+        return {"models": registry.versions(), "history": registry.history[-20:], "errors": registry.errors[-20:]}
+
+    def rollback(self, payload):
+        """Corps : {"model": "driver_win" | "driver_time" | "team_perf"}"""
+        registry = self._require_registry()
+        key = payload.get("model")
+        if key not in MODEL_KEYS:
+            raise ServiceError(400, f"'model' doit être l'un de: {', '.join(MODEL_KEYS)}")
+        return {"model": key, "version": registry.rollback(key)}
+
+    def predict_tier(self, payload):
+        """Corps : {"features": [[points, Quali_Pace_Ratio], ...], "teams": [noms]}"""
+        self._require("team_perf")
+        X = _feature_matrix(payload.get("features"), TEAM_PERF_FEATURES)
+        if X.ndim != 2:
+            raise ServiceError(400, "'features' doit être une matrice (n × 2)")
+
+        result = self.model_loader.predict_team_tiers(X)
+        tiers = [
+            {"cluster": int(cluster), "tier_label": int(label), "tier_name": name,
+             "distances": distances.tolist(), "scores": scores.tolist()}
+            for cluster, label, name, distances, scores in zip(
+                result["cluster"], result["tier_label"], result["tier_name"],
+                result["distances"], result["scores"],
+            )
+        ]
+
+        response = {"tiers": tiers}
+        if "teams" in payload:
+            response["teams"] = payload["teams"]
+        return response
+
+
+def make_handler(service):
+    """Crée la classe de handler HTTP liée à un PredictionService."""
+    routes = {
+        ("GET", "/health"): service.health,
+        ("GET", "/metrics"): service.metrics,
+        ("GET", "/models"): service.model_versions,
+        ("POST", "/models/rollback"): service.rollback,
+        ("POST", "/predict/win"): service.predict_win,
+        ("POST", "/predict/time"): service.predict_time,
+        ("POST", "/predict/tier"): service.predict_tier,
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        server_version = "F1PredictionService/1.0"
+        # En-têtes et corps partent en deux écritures : sans TCP_NODELAY,
+        # Nagle + ACK retardé ajoutent ~40 ms par réponse en keep-alive
+        disable_nagle_algorithm = True
+
+        def _send_json(self, status, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            if self.close_connection:
+                self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_body(self):
+            header = (self.headers.get("Content-Length") or "0").strip()
+            if not (header.isascii() and header.isdigit()):
+                # Corps de longueur inconnue : impossible à consommer, connexion fermée
+                self.close_connection = True
+                raise ServiceError(400, f"Content-Length invalide: {header!r}")
+            length = int(header)
+            if length > MAX_BODY_BYTES:
+                # Corps non lu : la connexion keep-alive ne peut pas être réutilisée
+                self.close_connection = True
+                raise ServiceError(413, "Requête trop volumineuse")
+            return self.rfile.read(length) if length else b""
+
+        def _read_payload(self, method):
+            # Le corps est toujours consommé (même hors POST) pour que la
+            # requête suivante de la connexion keep-alive reste alignée
+            body = self._read_body()
+            if method != "POST" or not body:
+                return {}
+            try:
+                payload = json.loads(body)
+            except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                raise ServiceError(400, f"JSON invalide: {e}")
+            if not isinstance(payload, dict):
+                raise ServiceError(400, "Le corps doit être un objet JSON")
+            return payload
+
+        def _dispatch(self, method):
+            path = self.path.split("?", 1)[0]
+            try:
+                handler = routes.get((method, path))
+                payload = self._read_payload(method)
+                if handler is None:
+                    raise ServiceError(404, f"Route inconnue: {method} {path}")
+                self._send_json(200, handler(payload))
+            except ServiceError as e:
+                self._send_json(e.status, {"error": e.message})
+            except ValueError as e:
+                self._send_json(400, {"error": str(e)})
+            except Exception as e:
+                self._send_json(500, {"error": f"Erreur interne: {e}"})
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def log_message(self, format, *args):
+            # Pas de log par requête (coût non négligeable à fort débit)
+            pass
+
+    return Handler
+
+
+def create_server(host="127.0.0.1", port=8000, model_loader=None, engine="fused",
+                  batch_window_ms=None, batch_max_rows=1024, watch_models=False):
+    """
+    Crée le serveur HTTP ; charge les modèles si aucun ModelLoader n'est fourni.
+    batch_window_ms active le micro-batching de /predict/win (None = désactivé),
+    watch_models le rechargement à chaud des modèles de models/.
+    """
+    if model_loader is None:
+        model_loader = ModelLoader(engine=engine)
+        model_loader.load_all()
+
+    batcher = None
+    if batch_window_ms is not None:
+        batcher = MicroBatcher(model_loader, max_wait=batch_window_ms / 1000, max_rows=batch_max_rows)
+
+    registry = ModelRegistry(model_loader).start() if watch_models else None
+
+    service = PredictionService(model_loader, batcher, registry)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Service de prédiction F1 (HTTP/JSON)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--engine", default="fused", choices=["sklearn", "fused"])
+    parser.add_argument("--batch-window-ms", type=float, default=None,
+                        help="Fenêtre de micro-batching de /predict/win (désactivé par défaut)")
+    parser.add_argument("--batch-max-rows", type=int, default=1024)
+    parser.add_argument("--watch-models", action="store_true",
+                        help="Recharger à chaud les modèles ré-entraînés dans models/")
+    args = parser.parse_args()
+
+    model_loader = ModelLoader(engine=args.engine)
+    model_loader.load_all()
+    for err in model_loader.errors:
+        print(f"⚠️  {err}")
+
+    server = create_server(args.host, args.port, model_loader=model_loader,
+                           batch_window_ms=args.batch_window_ms, batch_max_rows=args.batch_max_rows,
+                           watch_models=args.watch_models)
+    print(f"Service de prédiction sur http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Simulation Monte Carlo des ordres d'arrivée complets (Plackett-Luce)
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Barème des points F1 (positions 1 à 10)
+F1_POINTS = np.array([25, 18, 15, 12, 10, 8, 6, 4, 2, 1], dtype=float)
+
+# Budget mémoire par défaut pour un bloc de simulations (octets)
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+
+def points_vector(n_drivers, points=None):
+    """Retourne le barème complété par des zéros pour n_drivers positions."""
+    points = F1_POINTS if points is None else np.asarray(points, dtype=float)
+    table = np.zeros(n_drivers)
+    k = min(n_drivers, len(points))
+    table[:k] = points[:k]
+    return table
+
+
+def chunk_size_for_budget(n_drivers, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Nombre de simulations par bloc pour rester sous `memory_budget` octets.
+
+    Un bloc alloue environ 4 tableaux (n_sims × n_drivers) de 8 octets
+    (scores perturbés, ordre, rangs, indices aplatis).
+    """
+    per_sim = 4 * 8 * max(int(n_drivers), 1)
+    return max(1, int(memory_budget // per_sim))
+
+
+def plan_jobs(n_sims, n_jobs=1, seed=None):
+    """
+    Répartit n_sims simulations entre n_jobs workers.
+
+    Returns:
+        shares: Nombre de simulations par worker
+        seed_seqs: Une SeedSequence indépendante par worker
+    """
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(int(n_jobs), int(n_sims)))
+    seed_seqs = np.random.SeedSequence(seed).spawn(n_jobs)
+    shares = [n_sims // n_jobs + (1 if i < n_sims % n_jobs else 0) for i in range(n_jobs)]
+    return shares, seed_seqs
+
+
+def run_jobs(func, shares, seed_seqs, *args):
+    """
+    Exécute func(*args, share, seed_seq) pour chaque worker et somme les résultats.
+
+    Séquentiel s'il n'y a qu'un worker, sinon dans un ProcessPoolExecutor.
+    """
+    if len(shares) == 1:
+        return func(*args, shares[0], seed_seqs[0])
+
+    with ProcessPoolExecutor(max_workers=len(shares)) as pool:
+        futures = [pool.submit(func, *args, share, seq) for share, seq in zip(shares, seed_seqs)]
+        results = [f.result() for f in futures]
+
+    if isinstance(results[0], tuple):
+        return tuple(sum(parts) for parts in zip(*results))
+    return sum(results)
+
+
+def sample_finishing_orders(thetas, n_sims, rng):
+    """
+    Tire des ordres d'arrivée complets selon Plackett-Luce (astuce Gumbel-max).
+
+    Trier theta + bruit de Gumbel par ordre décroissant donne exactement
+    un tirage Plackett-Luce de l'ordre d'arrivée.
+
+    Args:
+        thetas: Array (n_drivers,) des scores theta
+        n_sims: Nombre d'ordres à tirer
+        rng: np.random.Generator
+
+    Returns:
+        Array (n_sims, n_drivers) : indices des pilotes du 1er au dernier
+    """
+    thetas = np.asarray(thetas, dtype=float)
+    perturbed = rng.gumbel(size=(n_sims, thetas.size))
+    perturbed += thetas
+    return np.argsort(-perturbed, axis=1)
+
+
+def _position_counts(thetas, chunk_size, n_sims, seed_seq):
+    """Compte (pilote, position) sur n_sims simulations, bloc par bloc."""
+    thetas = np.asarray(thetas, dtype=float)
+    n = thetas.size
+    rng = np.random.default_rng(seed_seq)
+    counts = np.zeros(n * n, dtype=np.int64)
+    positions = np.arange(n)
+
+    remaining = int(n_sims)
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        order = sample_finishing_orders(thetas, size, rng)
+        # order[s, p] = pilote en position p -> index aplati pilote * n + p
+        counts += np.bincount((order * n + positions).ravel(), minlength=n * n)
+        remaining -= size
+
+    return counts.reshape(n, n)
+
+
+def simulate_finishing_positions(thetas, n_sims=100_000, seed=None,
+                                 memory_budget=DEFAULT_MEMORY_BUDGET,
+                                 n_jobs=1, points=None):
+    """
+    Simule n_sims courses complètes et agrège les distributions de positions.
+
+    Args:
+        thetas: Array (n_drivers,) des scores theta
+        n_sims: Nombre de courses simulées
+        seed: Graine (int ou SeedSequence) ; résultat reproductible pour (seed, n_jobs)
+        memory_budget: Budget mémoire par bloc, en octets
+        n_jobs: Nombre de processus (1 = séquentiel, -1 = tous les cœurs)
+        points: Barème de points (F1_POINTS par défaut)
+
+    Returns:
+        dict avec :
+            position_counts: (n_drivers, n_drivers) comptes pilote × position
+            position_probabilities: (n_drivers, n_drivers) fréquences
+            expected_position: (n_drivers,) position moyenne (1 = vainqueur)
+            expected_points: (n_drivers,) points moyens
+            n_sims: nombre de simulations
+    """
+    thetas = np.asarray(thetas, dtype=float)
+    if thetas.ndim != 1 or thetas.size == 0:
+        raise ValueError("thetas doit être un vecteur non vide")
+    if n_sims <= 0:
+        raise ValueError("n_sims doit être positif")
+
+    n = thetas.size
+    chunk_size = chunk_size_for_budget(n, memory_budget)
+
+    shares, seed_seqs = plan_jobs(n_sims, n_jobs, seed)
+    counts = run_jobs(_position_counts, shares, seed_seqs, thetas, chunk_size)
+
+    probabilities = counts / float(n_sims)
+    positions = np.arange(1, n + 1)
+
+    return {
+        "position_counts": counts,
+        "position_probabilities": probabilities,
+        "expected_position": probabilities @ positions,
+        "expected_points": probabilities @ points_vector(n, points),
+        "n_sims": int(n_sims),
+    }
+
+
+def top_k_probabilities(position_probabilities, k):
+    """
+    P(pilote termine dans le top k) à partir de la matrice pilote × position.
+
+    Ex : k=1 victoire, k=3 podium, k=10 dans les points.
+    """
+    position_probabilities = np.asarray(position_probabilities, dtype=float)
+    return position_probabilities[:, :k].sum(axis=1)
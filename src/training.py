@@ -0,0 +1,373 @@
+"""
+Ré-entraînement des trois modèles à partir des résultats historiques
+
+Reconstruit, depuis FinalCombinedCleanFinal.csv (et les partitions ingérées) :
+    driver_win   StandardScaler + Ridge, cible -positionOrder, alpha par
+                 GridSearchCV (GroupKFold par course)
+    driver_time  MinMaxScaler + meilleur modèle (MAE de test) parmi KNN,
+                 Random Forest et régression linéaire, GridSearchCV cv=3
+    team_perf    StandardScaler + K-Means (k=3) sur (points, Quali_Pace_Ratio)
+                 par constructeur et par saison
+
+Les trois entraînements tournent en parallèle dans un pool de processus ;
+les grilles de chaque modèle sont parallélisées par joblib (n_jobs) et
+threadpoolctl limite BLAS/OpenMP à un thread par worker pour ne pas
+dépasser le nombre de cœurs.
+
+Chaque entraînement écrit une version dans models/versions/<horodatage>/
+(pickles au format attendu par ModelLoader + metadata.json) ; --promote la
+copie dans models/, où le ModelRegistry la recharge à chaud.
+
+Usage :
+    python -m src.training [--keys driver_win team_perf] [--workers 3] [--n-jobs 2] [--promote]
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from src.backtest import race_feature_matrix
+from src.features import DRIVER_TIME_FEATURES, DRIVER_WIN_FEATURES, TEAM_PERF_FEATURES, times_to_seconds
+from src.lazy import lazy_import
+from src.models import MODEL_KEYS, MODELS_DIR, _artifact_version, artifact_paths
+
+pd = lazy_import("pandas")
+
+VERSIONS_DIR = MODELS_DIR / "versions"
+RANDOM_STATE = 42
+
+# Grilles d'hyperparamètres (noms des étapes de Pipeline : "model__...")
+DRIVER_WIN_GRID = {"model__alpha": [0.1, 1.0, 10.0, 100.0]}
+DRIVER_TIME_GRIDS = {
+    "knn": {"n_neighbors": [3, 5, 7, 9], "weights": ["uniform", "distance"]},
+    "random_forest": {"n_estimators": [100, 200], "max_depth": [None, 10, 20]},
+    "linear": {},
+}
+
+
+def _fingerprint(*frames):
+    """Empreinte courte des données d'entraînement (contenu, hors index)."""
+    digest = hashlib.sha256()
+    for frame in frames:
+        digest.update(pd.util.hash_pandas_object(pd.DataFrame(frame), index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+# =============================================================================
+# JEUX D'ENTRAÎNEMENT
+# =============================================================================
+def driver_win_dataset(df):
+    """
+    Returns:
+        (X DataFrame DRIVER_WIN_FEATURES, y = -positionOrder, groupes = raceId)
+    """
+    X = pd.DataFrame(race_feature_matrix(df), columns=DRIVER_WIN_FEATURES)
+    y = -df['positionOrder'].to_numpy(dtype=float)
+    return X, y, df['raceId'].to_numpy()
+
+
+def driver_time_dataset(df):
+    """
+    Returns:
+        (X DataFrame DRIVER_TIME_FEATURES, y = milliseconds) des pilotes classés "Finished"
+    """
+    finished = df[df['status'] == 'Finished']
+    X = finished[DRIVER_TIME_FEATURES].astype(float).reset_index(drop=True)
+    return X, finished['milliseconds'].to_numpy(dtype=float)
+
+
+def team_perf_dataset(df):
+    """
+    Une ligne par (année, constructeur) : points de la saison et
+    Quali_Pace_Ratio = moyenne du meilleur temps de qualification rapporté
+    à la pole de chaque course.
+
+    Returns:
+        DataFrame TEAM_PERF_FEATURES indexé par (year, constructorId)
+    """
+    best = np.full(len(df), np.nan)
+    for stage in ('q1', 'q2', 'q3'):
+        seconds = times_to_seconds(df[stage].to_numpy(dtype=object))
+        best = np.fmin(best, np.where(seconds >= 999, np.nan, seconds))
+
+    frame = pd.DataFrame({
+        'year': df['year'].to_numpy(),
+        'constructorId': df['constructorId'].to_numpy(),
+        'points': df['points'].to_numpy(dtype=float),
+        'best': best,
+        'raceId': df['raceId'].to_numpy(),
+    })
+    frame['ratio'] = frame['best'] / frame.groupby('raceId')['best'].transform('min')
+    season = frame.groupby(['year', 'constructorId']).agg(
+        points=('points', 'sum'), Quali_Pace_Ratio=('ratio', 'mean')
+    )
+    return season[TEAM_PERF_FEATURES]
+
+
+# =============================================================================
+# ENTRAÎNEMENT
+# =============================================================================
+def train_driver_win(df, n_jobs=1):
+    """Ridge sur features standardisées ; alpha choisi par validation croisée groupée par course."""
+    from sklearn.linear_model import Ridge
+    from sklearn.model_selection import GridSearchCV, GroupKFold
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    X, y, groups = driver_win_dataset(df)
+    search = GridSearchCV(
+        Pipeline([("scaler", StandardScaler()), ("model", Ridge())]),
+        DRIVER_WIN_GRID, cv=GroupKFold(n_splits=5), scoring="neg_root_mean_squared_error", n_jobs=n_jobs,
+    )
+    search.fit(X, y, groups=groups)
+
+    return {
+        "model": search.best_estimator_.named_steps["model"],
+        "scaler": search.best_estimator_.named_steps["scaler"],
+        "params": {"model": "Ridge", **{k.split("__", 1)[1]: v for k, v in search.best_params_.items()}},
+        "metrics": {"cv_rmse": float(-search.best_score_)},
+        "rows": len(X),
+        "data": _fingerprint(X, y),
+    }
+
+
+def train_driver_time(df, n_jobs=1):
+    """Comparaison KNN / Random Forest / régression linéaire ; le plus petit MAE de test l'emporte."""
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.linear_model import LinearRegression
+    from sklearn.metrics import mean_absolute_error
+    from sklearn.model_selection import GridSearchCV, train_test_split
+    from sklearn.neighbors import KNeighborsRegressor
+    from sklearn.preprocessing import MinMaxScaler
+
+    X, y = driver_time_dataset(df)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=RANDOM_STATE)
+    scaler = MinMaxScaler().fit(X_train)
+    X_train_scaled, X_test_scaled = scaler.transform(X_train), scaler.transform(X_test)
+
+    estimators = {
+        "knn": KNeighborsRegressor(),
+        "random_forest": RandomForestRegressor(random_state=RANDOM_STATE),
+        "linear": LinearRegression(),
+    }
+    candidates = {}
+    for name, estimator in estimators.items():
+        search = GridSearchCV(estimator, DRIVER_TIME_GRIDS[name], cv=3,
+                              scoring="neg_mean_absolute_error", n_jobs=n_jobs)
+        search.fit(X_train_scaled, y_train)
+        test_mae = mean_absolute_error(y_test, search.best_estimator_.predict(X_test_scaled))
+        candidates[name] = (test_mae, search)
+
+    best = min(candidates, key=lambda name: candidates[name][0])
+    test_mae, search = candidates[best]
+    return {
+        "model": search.best_estimator_,
+        "scaler": scaler,
+        "params": {"model": best, **search.best_params_},
+        "metrics": {"test_mae": float(test_mae),
+                    **{f"test_mae_{name}": float(mae) for name, (mae, _) in candidates.items()}},
+        "rows": len(X),
+        "data": _fingerprint(X, y),
+    }
+
+
+def train_team_perf(df, n_jobs=1):
+    """K-Means à 3 clusters (Top Teams / Mid-field / Back-markers) sur les saisons des constructeurs."""
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import silhouette_score
+    from sklearn.preprocessing import StandardScaler
+
+    X = team_perf_dataset(df).dropna()
+    scaler = StandardScaler().fit(X)
+    X_scaled = scaler.transform(X)
+    model = KMeans(n_clusters=3, random_state=RANDOM_STATE, n_init="auto").fit(X_scaled)
+
+    return {
+        "model": model,
+        "scaler": scaler,
+        "params": {"model": "KMeans", "n_clusters": 3},
+        "metrics": {"inertia": float(model.inertia_),
+                    "silhouette": float(silhouette_score(X_scaled, model.labels_))},
+        "rows": len(X),
+        "data": _fingerprint(X),
+    }
+
+
+TRAINERS = {
+    "driver_win": train_driver_win,
+    "driver_time": train_driver_time,
+    "team_perf": train_team_perf,
+}
+
+
+def _train_key(key, df, n_jobs):
+    """Entraîne un modèle avec BLAS/OpenMP limités à un thread (processus courant et workers joblib)."""
+    from joblib import parallel_config
+    from threadpoolctl import threadpool_limits
+
+    start = time.perf_counter()
+    with threadpool_limits(limits=1), parallel_config(backend="loky", inner_max_num_threads=1):
+        result = TRAINERS[key](df, n_jobs=n_jobs)
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def train_models(df, keys=MODEL_KEYS, workers=None, n_jobs=None):
+    """
+    Entraîne plusieurs modèles en parallèle (un processus par modèle).
+
+    Args:
+        df: Résultats historiques (F1DataLoader.df)
+        keys: Modèles à entraîner
+        workers: Processus du pool (None = un par modèle, borné au nombre de CPU)
+        n_jobs: Workers joblib par grille (None = CPU restants répartis entre les processus)
+
+    Returns:
+        Dict {clé: {"model", "scaler", "params", "metrics", "rows", "data", "seconds"}}
+    """
+    unknown = [key for key in keys if key not in TRAINERS]
+    if unknown:
+        raise ValueError(f"Modèles inconnus: {', '.join(unknown)} (attendu: {', '.join(TRAINERS)})")
+
+    cores = os.cpu_count() or 1
+    workers = max(1, min(workers or len(keys), len(keys), cores))
+    n_jobs = n_jobs or max(1, cores // workers)
+
+    if workers == 1:
+        return {key: _train_key(key, df, n_jobs) for key in keys}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {key: pool.submit(_train_key, key, df, n_jobs) for key in keys}
+        return {key: future.result() for key, future in futures.items()}
+
+
+# =============================================================================
+# VERSIONS
+# =============================================================================
+def save_version(results, versions_dir=None):
+    """
+    Écrit une version (pickles model_<clé>.pkl / scaler_<clé>.pkl + metadata.json)
+    dans un nouveau dossier horodaté, renommé atomiquement une fois complet.
+
+    Returns:
+        Chemin du dossier de la version (utilisable comme models_dir d'un ModelLoader)
+    """
+    import joblib
+    import sklearn
+
+    versions_dir = Path(versions_dir) if versions_dir is not None else VERSIONS_DIR
+    versions_dir.mkdir(parents=True, exist_ok=True)
+    name = time.strftime("%Y%m%d-%H%M%S")
+    while (versions_dir / name).exists():
+        name = f"{name}-{os.getpid()}"
+    tmp_dir = versions_dir / f".{name}.tmp"
+    tmp_dir.mkdir()
+
+    metadata = {"created_at": time.time(), "sklearn": sklearn.__version__, "models": {}}
+    for key, result in results.items():
+        model_path, scaler_path = artifact_paths(key, tmp_dir)
+        joblib.dump(result["model"], model_path)
+        joblib.dump(result["scaler"], scaler_path)
+        metadata["models"][key] = {
+            "version": _artifact_version(model_path, scaler_path),
+            **{field: result[field] for field in ("params", "metrics", "rows", "data", "seconds") if field in result},
+        }
+
+    with open(tmp_dir / "metadata.json", "w") as f:
+        json.dump(metadata, f, indent=2, default=str)
+    os.rename(tmp_dir, versions_dir / name)
+    return versions_dir / name
+
+
+def promote(version_dir, models_dir=None, keys=None):
+    """
+    Copie les couples d'une version dans models/ (remplacement atomique de
+    chaque fichier, scaler puis modèle ; le ModelRegistry regroupe les deux
+    événements). Un export numérique existant est régénéré, ou retiré si le
+    modèle n'est pas pris en charge par ce format.
+
+    Returns:
+        Liste des clés promues
+    """
+    from src.artifacts import export_numeric, numeric_paths
+
+    version_dir = Path(version_dir)
+    models_dir = Path(models_dir) if models_dir is not None else MODELS_DIR
+    with open(version_dir / "metadata.json") as f:
+        available = list(json.load(f)["models"])
+
+    promoted = []
+    for key in keys or available:
+        if key not in available:
+            raise ValueError(f"{key} absent de la version {version_dir.name}")
+
+        model_path, scaler_path = artifact_paths(key, models_dir)
+        for source, target in ((artifact_paths(key, version_dir)[1], scaler_path),
+                               (artifact_paths(key, version_dir)[0], model_path)):
+            tmp_path = target.with_suffix(f".{os.getpid()}.tmp")
+            shutil.copyfile(source, tmp_path)
+            os.replace(tmp_path, target)
+
+        numeric = numeric_paths(key, models_dir)
+        if any(path.exists() for path in numeric):
+            import joblib
+
+            try:
+                export_numeric(key, joblib.load(model_path), joblib.load(scaler_path), models_dir)
+            except ValueError:
+                # Ancien export numérique périmé : ModelLoader ("auto") repasse aux pickles
+                for path in numeric:
+                    path.unlink(missing_ok=True)
+        promoted.append(key)
+    return promoted
+
+
+def main():
+    from data.data_loader import F1DataLoader
+    from src.backtest import run_backtest, summarize
+
+    parser = argparse.ArgumentParser(description="Ré-entraînement parallèle des modèles")
+    parser.add_argument("--keys", nargs="*", default=list(MODEL_KEYS), choices=list(MODEL_KEYS))
+    parser.add_argument("--workers", type=int, default=None, help="Processus (un modèle par processus)")
+    parser.add_argument("--n-jobs", type=int, default=None, help="Workers joblib par grille")
+    parser.add_argument("--versions-dir", default=str(VERSIONS_DIR))
+    parser.add_argument("--models-dir", default=str(MODELS_DIR))
+    parser.add_argument("--promote", action="store_true", help="Installer la version dans models/")
+    args = parser.parse_args()
+
+    data_loader = F1DataLoader()
+    if not data_loader.load():
+        raise SystemExit("❌ Données non chargées")
+
+    start = time.perf_counter()
+    results = train_models(data_loader.df, keys=args.keys, workers=args.workers, n_jobs=args.n_jobs)
+    version_dir = save_version(results, args.versions_dir)
+    print(f"Version {version_dir} ({time.perf_counter() - start:.1f}s)")
+
+    for key, result in results.items():
+        metrics = ", ".join(f"{name}={value:.4g}" for name, value in result["metrics"].items())
+        print(f"  {key:<12} {result['params']}  {metrics}  ({result['rows']} lignes, {result['seconds']}s)")
+
+    if "driver_win" in results:
+        # Backtest walk-forward : nouvelle version vs modèle en place
+        for name, models_dir in (("nouvelle", version_dir), ("en place", args.models_dir)):
+            try:
+                summary = summarize(run_backtest(data_loader.df, models_dir=models_dir, workers=1))
+                print(f"  backtest {name:<9} log-loss {summary['log_loss']:.4f}  Brier {summary['brier']:.4f}  "
+                      f"vainqueur trouvé {summary['hit_rate']:.1%}")
+            except ValueError as e:
+                print(f"  backtest {name:<9} indisponible ({e})")
+
+    if args.promote:
+        promoted = promote(version_dir, args.models_dir)
+        print(f"✅ Promu dans {args.models_dir}: {', '.join(promoted)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Fixtures communes des tests
+
+Les données réelles sont lues depuis le CSV (sans cache Arrow ni
+partitions ingérées) une seule fois par session.
+"""
+import joblib
+import pytest
+
+from data.data_loader import F1DataLoader
+from src.training import driver_time_dataset
+
+
+@pytest.fixture(scope="session")
+def data_loader(tmp_path_factory):
+    """F1DataLoader chargé depuis le CSV."""
+    loader = F1DataLoader(use_cache=False, partitions_dir=tmp_path_factory.mktemp("partitions"))
+    assert loader.load()
+    return loader
+
+
+@pytest.fixture(scope="session")
+def results(data_loader):
+    """DataFrame des résultats historiques (F1DataLoader.df)."""
+    return data_loader.df
+
+
+@pytest.fixture(scope="session")
+def driver_time_dir(results, tmp_path_factory):
+    """
+    Dossier de modèles avec un couple driver_time MinMaxScaler + LinearRegression
+    ajusté sur les données (aucun model_driver_time.pkl n'est fourni).
+    """
+    from sklearn.linear_model import LinearRegression
+    from sklearn.preprocessing import MinMaxScaler
+
+    X, y = driver_time_dataset(results)
+    scaler = MinMaxScaler().fit(X)
+    model = LinearRegression().fit(scaler.transform(X), y)
+
+    models_dir = tmp_path_factory.mktemp("models")
+    joblib.dump(model, models_dir / "model_driver_time.pkl")
+    joblib.dump(scaler, models_dir / "scaler_driver_time.pkl")
+    return models_dir
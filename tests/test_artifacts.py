@@ -0,0 +1,133 @@
+"""
+Tests de parité bit à bit entre les artefacts numériques (.json/.bin) et
+les pickles sklearn
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.artifacts import export_numeric, load_numeric, numeric_paths
+from src.backtest import race_feature_matrix
+from src.features import DRIVER_TIME_FEATURES, DRIVER_WIN_FEATURES, TEAM_PERF_FEATURES
+from src.models import MODELS_DIR, ModelLoader
+from src.training import driver_time_dataset, team_perf_dataset
+
+FEATURES = {
+    "driver_win": DRIVER_WIN_FEATURES,
+    "driver_time": DRIVER_TIME_FEATURES,
+    "team_perf": TEAM_PERF_FEATURES,
+}
+
+PARAMETERS = {
+    "scaler": ["mean_", "scale_", "min_", "data_min_"],
+    "model": ["coef_", "intercept_", "cluster_centers_"],
+}
+
+
+def _seeded_grid(reference, n=2_000, seed=0):
+    """Points réels + tirages (graine fixe) dans et autour de leur plage."""
+    rng = np.random.default_rng(seed)
+    low, high = reference.min(axis=0), reference.max(axis=0)
+    span = np.where(high > low, high - low, 1.0)
+    return np.vstack([reference, rng.uniform(low - 0.5 * span, high + 0.5 * span, (n, reference.shape[1]))])
+
+
+@pytest.fixture(scope="module")
+def inputs(results):
+    """Grille d'entrées fixe par modèle (DataFrame aux colonnes du modèle)."""
+    driver_time, _ = driver_time_dataset(results)
+    teams = team_perf_dataset(results).dropna().to_numpy()
+
+    # team_perf : grille régulière couvrant les frontières entre clusters
+    points = np.linspace(0, teams[:, 0].max() * 1.2, 80)
+    ratios = np.linspace(teams[:, 1].min() * 0.98, teams[:, 1].max() * 1.02, 80)
+    team_grid = np.column_stack([g.ravel() for g in np.meshgrid(points, ratios)])
+
+    grids = {
+        "driver_win": _seeded_grid(race_feature_matrix(results)),
+        "driver_time": _seeded_grid(driver_time.to_numpy()),
+        "team_perf": np.vstack([teams, team_grid]),
+    }
+    return {key: pd.DataFrame(X, columns=FEATURES[key]) for key, X in grids.items()}
+
+
+@pytest.fixture(scope="module")
+def loaders(driver_time_dir, tmp_path_factory):
+    """(pickle, numérique) par modèle : couples exportés dans un dossier temporaire."""
+    numeric_dir = tmp_path_factory.mktemp("numeric")
+    pairs = {}
+    for key in FEATURES:
+        source = driver_time_dir if key == "driver_time" else MODELS_DIR
+        pickled = ModelLoader(models_dir=source, artifact_format="pickle")
+        assert pickled.load(key), pickled.errors
+
+        artifact = pickled.artifact(key)
+        export_numeric(key, artifact.model, artifact.scaler, numeric_dir)
+        numeric = ModelLoader(models_dir=numeric_dir, artifact_format="numeric")
+        assert numeric.load(key), numeric.errors
+        pairs[key] = (pickled, numeric)
+    return pairs
+
+
+@pytest.mark.parametrize("key", list(FEATURES))
+def test_exported_files(loaders, key):
+    schema_path, data_path = numeric_paths(key, loaders[key][1].models_dir)
+    assert schema_path.exists() and data_path.exists()
+    # Chargement par mmap ou lecture complète : mêmes tableaux
+    mapped, read = load_numeric(key, schema_path.parent), load_numeric(key, schema_path.parent, mmap=False)
+    for a, b in zip(mapped, read):
+        for name in PARAMETERS["scaler"] + PARAMETERS["model"]:
+            if hasattr(a, name):
+                assert np.array_equal(getattr(a, name), getattr(b, name))
+
+
+@pytest.mark.parametrize("key", list(FEATURES))
+def test_parameters_are_identical(loaders, key):
+    pickled, numeric = (loader.artifact(key) for loader in loaders[key])
+    for part, names in PARAMETERS.items():
+        for name in names:
+            expected = getattr(getattr(pickled, part), name, None)
+            if expected is None:
+                continue
+            actual = getattr(getattr(numeric, part), name)
+            assert np.array_equal(np.atleast_1d(actual), np.atleast_1d(expected)), f"{part}.{name}"
+
+    assert np.array_equal(numeric.scaler.feature_names_in_, pickled.scaler.feature_names_in_)
+
+
+@pytest.mark.parametrize("key", list(FEATURES))
+def test_predictions_are_identical(loaders, inputs, key):
+    pickled, numeric = (loader.artifact(key) for loader in loaders[key])
+    X = inputs[key]
+
+    scaled = pickled.scaler.transform(X)
+    assert np.array_equal(numeric.scaler.transform(X), scaled)
+    assert np.array_equal(numeric.model.predict(scaled), pickled.model.predict(scaled))
+    # Colonnes dans un autre ordre : réordonnées par les deux scalers
+    assert np.array_equal(numeric.scaler.transform(X[X.columns[::-1]]), scaled)
+
+
+def test_loader_predictions_are_identical(loaders, inputs):
+    pickled, numeric = loaders["driver_win"]
+    X = inputs["driver_win"].to_numpy()
+    assert np.array_equal(numeric.predict_thetas(X), pickled.predict_thetas(X))
+
+    pickled, numeric = loaders["driver_time"]
+    X = inputs["driver_time"]
+    assert np.array_equal(numeric.predict_race_time(X), pickled.predict_race_time(X))
+
+
+def test_tier_thresholds_are_identical(loaders, inputs):
+    pickled_loader, numeric_loader = loaders["team_perf"]
+    pickled, numeric = pickled_loader.artifact("team_perf"), numeric_loader.artifact("team_perf")
+
+    assert np.array_equal(numeric.tiers, pickled.tiers)
+    assert np.array_equal(numeric.scaler.inverse_transform(numeric.model.cluster_centers_),
+                          pickled.scaler.inverse_transform(pickled.model.cluster_centers_))
+
+    X = inputs["team_perf"]
+    expected, actual = pickled_loader.predict_team_tiers(X), numeric_loader.predict_team_tiers(X)
+    for name in ("cluster", "tier_label", "tier_name", "distances", "scores"):
+        assert np.array_equal(actual[name], expected[name]), name
+    # La grille couvre les trois tiers
+    assert set(expected["tier_label"].tolist()) == {0, 1, 2}
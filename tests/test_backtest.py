@@ -0,0 +1,116 @@
+"""
+Tests du backtest walk-forward (métriques par course et agrégées)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest import RESULT_COLUMNS, run_backtest, score_races, summarize
+from src.models import MODELS_DIR, ModelLoader
+
+
+class GridLoader:
+    """theta = -grille : le mieux placé est le favori."""
+
+    def predict_thetas(self, X):
+        return -np.asarray(X, dtype=float)[:, 0]
+
+
+def synthetic_races():
+    """
+    Quatre courses sur deux saisons (lignes volontairement mélangées) :
+    le favori gagne (1, 3), un autre pilote gagne (2), aucun classé (4).
+    """
+    races = [
+        # (year, round, raceId, grilles, positionOrder)
+        (2023, 1, 10, [1, 2, 3], [1, 2, 3]),
+        (2023, 2, 11, [1, 2, 3, 4], [3, 1, 2, 4]),
+        (2024, 1, 20, [2, 1], [2, 1]),
+        (2024, 2, 21, [1, 2, 3], [2, 3, 4]),
+    ]
+    rows = []
+    for year, round_, race_id, grids, positions in races:
+        for driver, (grid, position) in enumerate(zip(grids, positions)):
+            rows.append({
+                'year': year, 'round': round_, 'raceId': race_id, 'circuitId': race_id % 10,
+                'driverId': 100 + driver, 'grid': grid, 'positionOrder': position,
+                'laps': 50, 'q1': '1:21.000', 'q2': '1:20.500', 'q3': '1:20.000',
+                'fastestLapTime': 82.0, 'avg_lap_ms': 84_000.0,
+                'pit_stop_count': 2, 'avg_pit_duration_s': 23.0,
+            })
+    df = pd.DataFrame(rows)
+    return df.sample(frac=1.0, random_state=0).reset_index(drop=True)
+
+
+def expected_metrics(grids, positions):
+    p = np.exp(-np.array(grids, dtype=float))
+    p /= p.sum()
+    won = np.array(positions) == 1
+    return -np.log(p[won][0]), ((p - won) ** 2).sum(), float(np.argmax(p) == np.argmax(won))
+
+
+def test_score_races_metrics():
+    results = score_races(synthetic_races(), GridLoader())
+
+    assert list(results.columns) == RESULT_COLUMNS
+    assert results['raceId'].tolist() == [10, 11, 20, 21]
+    assert results['n_drivers'].tolist() == [3, 4, 2, 3]
+    assert results['winner_driverId'].tolist() == [100, 101, 101, -1]
+    assert results['predicted_driverId'].tolist() == [100, 100, 101, 100]
+
+    for i, (grids, positions) in enumerate([([1, 2, 3], [1, 2, 3]), ([1, 2, 3, 4], [3, 1, 2, 4]),
+                                             ([2, 1], [2, 1])]):
+        log_loss, brier, hit = expected_metrics(grids, positions)
+        assert results['log_loss'].iloc[i] == pytest.approx(log_loss)
+        assert results['brier'].iloc[i] == pytest.approx(brier)
+        assert results['hit'].iloc[i] == hit
+
+    # Course sans vainqueur : métriques absentes
+    assert results.iloc[3][['p_winner', 'log_loss', 'brier', 'hit']].isna().all()
+
+
+def test_summarize_totals_and_by_year():
+    results = score_races(synthetic_races(), GridLoader())
+    scored = results.iloc[:3]
+
+    summary = summarize(results)
+    assert summary['races'] == 3
+    assert summary['log_loss'] == pytest.approx(scored['log_loss'].mean())
+    assert summary['brier'] == pytest.approx(scored['brier'].mean())
+    assert summary['hit_rate'] == pytest.approx(2 / 3)
+
+    by_year = summarize(results, by='year')
+    assert by_year.loc[2023, 'races'] == 2
+    assert by_year.loc[2023, 'hit_rate'] == pytest.approx(0.5)
+    assert by_year.loc[2024, 'races'] == 1
+    assert by_year.loc[2024, 'hit_rate'] == pytest.approx(1.0)
+
+
+def test_score_races_empty_frame():
+    results = score_races(synthetic_races().iloc[:0], GridLoader())
+    assert results.empty
+    assert list(results.columns) == RESULT_COLUMNS
+
+
+def test_run_backtest_matches_score_races():
+    loader = ModelLoader(models_dir=MODELS_DIR)
+    if not loader.load("driver_win"):
+        pytest.skip("model_driver_win.pkl absent")
+    df = synthetic_races()
+
+    results = run_backtest(df, models_dir=MODELS_DIR, workers=1)
+    expected = score_races(df, loader)
+    pd.testing.assert_frame_equal(results[RESULT_COLUMNS], expected)
+
+    # Moyennes cumulées : la dernière égale le résumé (course sans vainqueur ignorée)
+    summary = summarize(results)
+    assert results['cum_log_loss'].iloc[-1] == pytest.approx(summary['log_loss'])
+    assert results['cum_brier'].iloc[-1] == pytest.approx(summary['brier'])
+    assert results['cum_hit_rate'].iloc[-1] == pytest.approx(summary['hit_rate'])
+
+    assert run_backtest(df, models_dir=MODELS_DIR, workers=1, years=[2024])['raceId'].tolist() == [20, 21]
+
+
+def test_run_backtest_without_model_raises(tmp_path):
+    with pytest.raises(ValueError, match="driver_win"):
+        run_backtest(synthetic_races(), models_dir=tmp_path, workers=1)
@@ -0,0 +1,122 @@
+"""
+Tests du micro-batching des requêtes de scoring theta
+"""
+import threading
+
+import numpy as np
+import pytest
+
+from src.batching import MicroBatcher
+from src.features import DRIVER_WIN_FEATURES
+
+N_FEATURES = len(DRIVER_WIN_FEATURES)
+
+
+class FakeLoader:
+    """predict_thetas déterministe (somme pondérée des features), compte les appels."""
+
+    def __init__(self):
+        self.calls = []
+        self.weights = np.arange(1, N_FEATURES + 1, dtype=float)
+
+    def predict_thetas(self, X):
+        self.calls.append(len(X))
+        return X @ self.weights
+
+
+@pytest.fixture
+def loader():
+    return FakeLoader()
+
+
+def test_concurrent_submits_scatter_in_order(loader):
+    # Fenêtre large : les requêtes concurrentes tombent dans quelques lots
+    batcher = MicroBatcher(loader, max_wait=0.05, max_rows=10_000)
+    rng = np.random.default_rng(0)
+    inputs = [rng.normal(size=(int(rng.integers(1, 6)), N_FEATURES)) for _ in range(16)]
+    inputs.append(rng.normal(size=(2, 3, N_FEATURES)))  # forme 3D (courses, pilotes, features)
+    outputs = [None] * len(inputs)
+    barrier = threading.Barrier(len(inputs))
+
+    def worker(i):
+        barrier.wait()
+        outputs[i] = batcher.predict_thetas(inputs[i], timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(inputs))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+
+    for X, thetas in zip(inputs, outputs):
+        assert thetas.shape == X.shape[:-1]
+        np.testing.assert_allclose(thetas, X @ loader.weights)
+    # Moins d'appels au modèle que de requêtes : les lots ont bien été regroupés
+    assert len(loader.calls) < len(inputs)
+
+
+def test_metrics_count_requests_rows_and_batches(loader):
+    batcher = MicroBatcher(loader, max_wait=0.0)
+    for n in (1, 3, 4):
+        batcher.predict_thetas(np.ones((n, N_FEATURES)), timeout=5)
+    m = batcher.metrics()
+    batcher.close()
+
+    assert m["requests"] == 3
+    assert m["rows"] == 8
+    assert m["batches"] == len(loader.calls) == 3
+    assert m["max_batch_rows"] == 4
+    assert m["batch_rows_histogram"] == {1: 1, 4: 2}
+    assert m["mean_batch_rows"] == pytest.approx(8 / 3)
+    assert m["queue_depth"] == 0
+
+    batcher.reset_metrics()
+    assert batcher.metrics()["requests"] == 0
+
+
+def test_submit_after_close_raises(loader):
+    batcher = MicroBatcher(loader)
+    batcher.close()
+    batcher.close()  # idempotent
+    with pytest.raises(RuntimeError):
+        batcher.submit(np.ones((2, N_FEATURES)))
+
+
+def test_submit_racing_close_never_hangs(loader):
+    # Chaque future renvoyée doit aboutir (résultat ou erreur), jamais rester en attente
+    for _ in range(20):
+        batcher = MicroBatcher(loader, max_wait=0.0)
+        futures = []
+
+        def submitter():
+            for _ in range(50):
+                try:
+                    futures.append(batcher.submit(np.ones((1, N_FEATURES))))
+                except RuntimeError:
+                    return
+
+        thread = threading.Thread(target=submitter)
+        thread.start()
+        batcher.close()
+        thread.join()
+        for future in futures:
+            future.exception(timeout=2)  # lève TimeoutError si la requête est orpheline
+
+
+def test_model_errors_propagate_to_callers():
+    class FailingLoader:
+        def predict_thetas(self, X):
+            raise ValueError("modèle indisponible")
+
+    batcher = MicroBatcher(FailingLoader())
+    with pytest.raises(ValueError, match="indisponible"):
+        batcher.predict_thetas(np.ones((2, N_FEATURES)), timeout=5)
+    batcher.close()
+
+
+def test_invalid_shape_is_rejected(loader):
+    batcher = MicroBatcher(loader)
+    with pytest.raises(ValueError):
+        batcher.submit(np.ones((2, N_FEATURES + 1)))
+    batcher.close()
@@ -0,0 +1,63 @@
+"""
+Tests du cache de theta (clé de version cohérente avec le modèle utilisé)
+"""
+import copy
+
+import numpy as np
+
+from src.backtest import race_feature_matrix
+from src.cache import PredictionCache
+from src.models import ModelArtifact, ModelLoader
+
+
+class SwappingLoader(ModelLoader):
+    """ModelLoader qui installe un autre artefact juste avant chaque scoring."""
+
+    swap_to = None
+
+    def predict_thetas(self, X, artifact=None):
+        if self.swap_to is not None:
+            self.install("driver_win", self.swap_to)
+            self.swap_to = None
+        return super().predict_thetas(X, artifact=artifact)
+
+
+def _other_version(artifact):
+    model = copy.deepcopy(artifact.model)
+    model.coef_ = model.coef_ * 2
+    return ModelArtifact("driver_win", model, artifact.scaler, None, "autre-version", None)
+
+
+def test_hot_swap_during_scoring_keeps_keys_consistent(results):
+    loader = SwappingLoader()
+    original = loader.snapshot("driver_win")
+    other = _other_version(original)
+    X = race_feature_matrix(results.head(20))
+
+    expected_original = ModelLoader.predict_thetas(loader, X, artifact=original)
+    expected_other = ModelLoader.predict_thetas(loader, X, artifact=other)
+    assert not np.allclose(expected_original, expected_other)
+
+    cache = PredictionCache(loader)
+    # Remplacement à chaud entre la lecture de la version et le scoring
+    loader.swap_to = other
+    np.testing.assert_allclose(cache.predict_thetas(X), expected_original)
+
+    # Nouvelle version installée : nouvelles clés, theta du nouveau modèle
+    np.testing.assert_allclose(cache.predict_thetas(X), expected_other)
+
+    # Retour à la version d'origine : les entrées en cache sont celles de l'ancien modèle
+    loader.install("driver_win", original)
+    np.testing.assert_allclose(cache.predict_thetas(X), expected_original)
+    assert cache.stats()["hits"] == len(X)
+
+
+def test_cache_matches_loader(results):
+    loader = ModelLoader()
+    cache = PredictionCache(loader)
+    X = race_feature_matrix(results.head(100)).reshape(5, 20, -1)
+
+    # Features quantifiées à 1e-6 : theta égaux à l'arrondi près
+    np.testing.assert_allclose(cache.predict_thetas(X), loader.predict_thetas(X), rtol=1e-9)
+    np.testing.assert_allclose(cache.predict_thetas(X), loader.predict_thetas(X), rtol=1e-9)
+    assert cache.stats()["hits"] == 100
@@ -0,0 +1,44 @@
+"""
+Tests du schéma compact du F1DataLoader
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.data_loader import CSV_PATH, RESULTS_SCHEMA, _fits_dtype, apply_schema
+
+
+@pytest.fixture(scope="module")
+def raw():
+    return pd.read_csv(CSV_PATH)
+
+
+def test_schema_preserves_numeric_values(results, raw):
+    for col, dtype in RESULTS_SCHEMA.items():
+        if dtype in ('category', 'string[pyarrow]') or col not in raw.columns:
+            continue
+        np.testing.assert_array_equal(results[col].to_numpy(dtype=float), raw[col].to_numpy(dtype=float),
+                                      err_msg=col)
+
+
+def test_fits_dtype_requires_exact_float_round_trip():
+    assert _fits_dtype(pd.Series([0.0, 2.5, 25.0, np.nan]), 'float32')
+    assert not _fits_dtype(pd.Series([91234.567]), 'float32')
+    assert not _fits_dtype(pd.Series([1e39]), 'float32')
+
+
+def test_fits_dtype_overflow_probe_is_silent():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert not _fits_dtype(pd.Series([1e39, 1.0]), 'float32')
+        assert not _fits_dtype(pd.Series([70000.0]), 'float16')
+
+
+def test_apply_schema_skips_lossy_float_columns():
+    df = pd.DataFrame({'points': [1.0, 91234.567]})
+    report = apply_schema(df, {'points': 'float32'})
+
+    assert report['skipped'] == ['points']
+    assert df['points'].dtype == np.float64
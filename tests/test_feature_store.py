@@ -0,0 +1,128 @@
+"""
+Tests du feature store (mise à jour incrémentale, absence de fuite, persistance)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.feature_store import CIRCUIT_STATE, DRIVER_STATE, STORE_VERSION, FeatureStore
+
+STATE = list(DRIVER_STATE) + CIRCUIT_STATE
+
+
+def race_order(df):
+    """Courses (year, round) dans l'ordre chronologique."""
+    return sorted(set(zip(df['year'].tolist(), df['round'].tolist())))
+
+
+def split_before(df, race):
+    """(courses strictement avant `race`, courses à partir de `race`)."""
+    key = df['year'].astype(int) * 1000 + df['round'].astype(int)  # colonnes entières réduites (uint16)
+    cutoff = race[0] * 1000 + race[1]
+    return df[key < cutoff], df[key >= cutoff]
+
+
+def assert_entries_equal(actual, expected):
+    assert actual.keys() == expected.keys()
+    np.testing.assert_allclose([actual[k] for k in STATE], [expected[k] for k in STATE],
+                               rtol=1e-9, equal_nan=True)
+
+
+@pytest.fixture(scope="module")
+def full_store(results):
+    return FeatureStore.build(results)
+
+
+def test_update_matches_full_build(results, full_store):
+    races = race_order(results)
+    base, rest = split_before(results, races[-6])
+    middle, last = split_before(rest, races[-2])
+    assert len(middle) and len(last)
+
+    store = FeatureStore.build(base)
+    assert store.update(middle) == len(middle)
+    assert store.update(last) == len(last)
+
+    pd.testing.assert_frame_equal(store.table, full_store.table, check_dtype=False, rtol=1e-9)
+    keys = full_store.table[['driverId', 'circuitId', 'year']].drop_duplicates()
+    for driver_id, circuit_id, year in keys.itertuples(index=False):
+        assert_entries_equal(store.lookup(driver_id, circuit_id, year),
+                             full_store.lookup(driver_id, circuit_id, year))
+
+    # Derniers états connus (courses futures) identiques
+    circuit_id = int(results['circuitId'].iloc[0])
+    for driver_id in results['driverId'].unique()[:10]:
+        assert_entries_equal(store.lookup(driver_id, circuit_id, 2030),
+                             full_store.lookup(driver_id, circuit_id, 2030))
+
+
+def test_update_rejects_known_or_earlier_races(results):
+    races = race_order(results)
+    base, rest = split_before(results, races[-1])
+    store = FeatureStore.build(base)
+
+    with pytest.raises(ValueError):
+        store.update(base.tail(20))
+    store.update(rest)
+    with pytest.raises(ValueError):
+        store.update(rest)
+
+
+def test_lookup_uses_only_earlier_races(results, full_store):
+    races = race_order(results)
+    race = races[len(races) // 2]
+    before, from_race = split_before(results, race)
+    prefix = FeatureStore.build(before)
+
+    # Résultats de la course et des suivantes brouillés : aucune entrée de la course ne change
+    rng = np.random.default_rng(0)
+    scrambled = from_race.copy()
+    for col in ['points', 'positionOrder', 'grid', 'avg_lap_ms', 'pit_stop_count', 'avg_pit_duration_s']:
+        scrambled[col] = rng.permutation(scrambled[col].to_numpy())
+    tampered = FeatureStore.build(pd.concat([before, scrambled]))
+
+    year, round_ = race
+    at_race = results[(results['year'] == year) & (results['round'] == round_)]
+    assert len(at_race)
+    for driver_id, circuit_id in at_race[['driverId', 'circuitId']].itertuples(index=False):
+        expected = full_store.lookup(driver_id, circuit_id, year)
+        assert_entries_equal(tampered.lookup(driver_id, circuit_id, year), expected)
+        # Même état que le dernier connu avant la course (historique tronqué)
+        assert_entries_equal(prefix.lookup(driver_id, circuit_id, year), expected)
+
+        inputs = full_store.default_inputs(driver_id, circuit_id, year)
+        np.testing.assert_allclose(list(inputs.values()),
+                                   list(prefix.default_inputs(driver_id, circuit_id, year).values()),
+                                   rtol=1e-9, equal_nan=True)
+
+
+def test_unknown_driver_and_circuit(full_store):
+    assert full_store.lookup(-1, -1, 2025) is None
+    assert full_store.default_inputs(-1, -1, 2025) is None
+    assert full_store.circuit_reference(-1) is None
+
+
+def test_save_read_round_trip(full_store, tmp_path):
+    path = tmp_path / "features.arrow"
+    full_store.save(path, metadata={"source": "test"})
+
+    meta = FeatureStore.read_metadata(path)
+    assert meta["store_version"] == STORE_VERSION
+    assert meta["source"] == "test"
+
+    store = FeatureStore.read(path)
+    assert store.window == full_store.window
+    pd.testing.assert_frame_equal(store.table, full_store.table)
+
+    driver_id, circuit_id, year = full_store.table[['driverId', 'circuitId', 'year']].iloc[-1]
+    assert_entries_equal(store.lookup(driver_id, circuit_id, year),
+                         full_store.lookup(driver_id, circuit_id, year))
+    assert store.circuit_reference(circuit_id) == full_store.circuit_reference(circuit_id)
+
+
+def test_read_missing_or_stale_store(full_store, tmp_path):
+    assert FeatureStore.read(tmp_path / "absent.arrow") is None
+
+    path = tmp_path / "features.arrow"
+    full_store.save(path, metadata={"store_version": "0"})
+    assert FeatureStore.read(path) is None
@@ -0,0 +1,191 @@
+"""
+Tests des constructions de features : parsing vectorisé des temps de
+qualification et builders vectorisés (équivalence avec les versions
+scalaires), probabilités exactes Plackett-Luce (comparées à l'énumération)
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src.features import (
+    DRIVER_WIN_FEATURES,
+    build_driver_time_matrix,
+    build_driver_win_matrix,
+    build_features_driver_time,
+    build_features_driver_win,
+    build_features_team_perf,
+    build_team_perf_matrix,
+    plackett_luce_position_probabilities,
+    plackett_luce_probability,
+    plackett_luce_top_k_probability,
+    time_to_seconds,
+    times_to_seconds,
+)
+
+SPECIAL_VALUES = ['', '\\N', None, np.nan, pd.NA, 'DNQ', 'DNS', 'nan', ' 1:23.456 ', '83.1',
+                  '1:', ':30', '1:2:3', 'abc', '1e2', 'inf', '1:30.5x', '0:00.000', '99', 95.25]
+
+
+def random_times(n, seed):
+    """Mélange aléatoire (graine fixe) de m:ss.fff, ss.fff et valeurs spéciales."""
+    rng = np.random.default_rng(seed)
+    minutes = rng.integers(0, 3, n)
+    seconds = rng.random(n) * 60
+    values = np.array([f"{m}:{s:06.3f}" for m, s in zip(minutes, seconds)], dtype=object)
+
+    plain = rng.random(n) < 0.2
+    values[plain] = [f"{s:.3f}" for s in rng.random(plain.sum()) * 120]
+    special = rng.random(n) < 0.3
+    values[special] = [SPECIAL_VALUES[i] for i in rng.integers(0, len(SPECIAL_VALUES), special.sum())]
+    return values
+
+
+def scalar_times(values):
+    return np.array([time_to_seconds(v) for v in values], dtype=float)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_times_to_seconds_matches_scalar(seed):
+    values = random_times(2_000, seed)
+    np.testing.assert_array_equal(times_to_seconds(values), scalar_times(values))
+
+
+@pytest.mark.parametrize("value", SPECIAL_VALUES)
+def test_times_to_seconds_special_values(value):
+    np.testing.assert_array_equal(times_to_seconds([value]), [time_to_seconds(value)])
+
+
+def test_times_to_seconds_input_types():
+    values = random_times(500, seed=42)
+    expected = scalar_times(values)
+    text = [None if v is None or v is pd.NA or (isinstance(v, float) and np.isnan(v)) else str(v)
+            for v in values]
+
+    series = pd.Series(values, index=np.arange(500) * 2, name="q1")
+    result = times_to_seconds(series)
+    assert isinstance(result, pd.Series) and result.name == "q1"
+    pd.testing.assert_index_equal(result.index, series.index)
+    np.testing.assert_array_equal(result.to_numpy(), expected)
+
+    np.testing.assert_array_equal(times_to_seconds(list(values)), expected)
+    np.testing.assert_array_equal(times_to_seconds(pa.array(text, type=pa.string())), scalar_times(text))
+    np.testing.assert_array_equal(times_to_seconds(pd.Series(text, dtype="string[pyarrow]")).to_numpy(),
+                                  scalar_times(text))
+
+
+def test_times_to_seconds_dataset_columns(results):
+    for stage in ('q1', 'q2', 'q3'):
+        values = results[stage].to_numpy(dtype=object)
+        np.testing.assert_array_equal(times_to_seconds(values), scalar_times(values), err_msg=stage)
+
+
+# =============================================================================
+# BUILDERS VECTORISÉS
+# =============================================================================
+def random_driver_inputs(n, seed):
+    """Entrées finies (graine fixe), dont les sentinelles 0 / 999 des temps et des grilles non entières."""
+    rng = np.random.default_rng(seed)
+    inputs = {
+        'grid': rng.integers(1, 21, n) + rng.choice([0.0, 0.4, 0.9], n),
+        'laps': rng.integers(40, 78, n).astype(float),
+        'fastest_lap_time': 70 + rng.random(n) * 30,
+        'avg_lap_ms': 75_000 + rng.random(n) * 30_000,
+        'pit_stop_count': rng.integers(0, 4, n).astype(float),
+        'avg_pit_duration_s': 20 + rng.random(n) * 10,
+    }
+    for stage in ('q1_sec', 'q2_sec', 'q3_sec'):
+        times = 70 + rng.random(n) * 30
+        sentinel = rng.random(n)
+        times[sentinel < 0.1] = 0.0
+        times[(sentinel >= 0.1) & (sentinel < 0.2)] = 999.0
+        inputs[stage] = times
+    return inputs
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_driver_win_matrix_matches_scalar_builder(seed):
+    inputs = random_driver_inputs(200, seed)
+    expected = np.vstack([
+        build_features_driver_win(**{name: values[i] for name, values in inputs.items()}).to_numpy(dtype=float)
+        for i in range(200)
+    ])
+    np.testing.assert_array_equal(build_driver_win_matrix(**inputs), expected)
+
+
+def test_driver_time_and_team_perf_matrices_match_scalar_builders():
+    rng = np.random.default_rng(0)
+    driver_time = {name: rng.integers(1, 1000, 50) + 0.5 for name in
+                   ('grid', 'circuit_id', 'constructor_id', 'driver_number', 'year')}
+    team_perf = {'points': rng.random(50) * 600, 'quali_pace_ratio': 1 + rng.random(50) * 0.05}
+
+    for bulk, scalar, inputs in ((build_driver_time_matrix, build_features_driver_time, driver_time),
+                                 (build_team_perf_matrix, build_features_team_perf, team_perf)):
+        expected = np.vstack([scalar(**{k: v[i] for k, v in inputs.items()}).to_numpy(dtype=float)
+                              for i in range(50)])
+        np.testing.assert_array_equal(bulk(**inputs), expected)
+
+
+def test_driver_win_matrix_missing_values():
+    inputs = {name: values[:1] for name, values in random_driver_inputs(1, 0).items()}
+
+    # Temps manquant (None / NaN) : sentinelle 999.0 (le builder scalaire laisse NaN)
+    for missing in (None, np.nan):
+        row = build_driver_win_matrix(**dict(inputs, q3_sec=[missing]))[0]
+        assert row[DRIVER_WIN_FEATURES.index('q3_sec')] == 999.0
+    assert np.isnan(build_features_driver_win(**{k: v[0] for k, v in dict(inputs, q3_sec=[np.nan]).items()})
+                    ['q3_sec'][0])
+
+    # Colonne entière NaN : propagé (int() lève une ValueError dans le builder scalaire)
+    row = build_driver_win_matrix(**dict(inputs, grid=[np.nan]))[0]
+    assert np.isnan(row[DRIVER_WIN_FEATURES.index('grid')])
+
+
+# =============================================================================
+# PLACKETT-LUCE EXACT
+# =============================================================================
+def brute_force_positions(thetas):
+    """P(pilote i à la position p) par énumération de toutes les permutations."""
+    thetas = np.asarray(thetas, dtype=float)
+    weights = np.exp(thetas - thetas.max())
+    n = len(weights)
+    positions = np.zeros((n, n))
+    for order in itertools.permutations(range(n)):
+        probability = 1.0
+        for place, driver in enumerate(order):
+            probability *= weights[driver] / weights[list(order[place:])].sum()
+        positions[list(order), np.arange(n)] += probability
+    return positions
+
+
+@pytest.mark.parametrize("n", range(1, 7))
+def test_position_probabilities_match_brute_force(n):
+    thetas = np.random.default_rng(n).normal(0, 1.5, n)
+    expected = brute_force_positions(thetas)
+
+    exact = plackett_luce_position_probabilities(thetas, k=n)
+    np.testing.assert_allclose(exact, expected, rtol=1e-12, atol=1e-15)
+    np.testing.assert_allclose(exact.sum(axis=0), 1.0, rtol=1e-12)
+    np.testing.assert_allclose(exact.sum(axis=1), 1.0, rtol=1e-12)
+
+    np.testing.assert_allclose(exact[:, 0], plackett_luce_probability(thetas), rtol=1e-12)
+    for k in range(1, n + 1):
+        np.testing.assert_allclose(plackett_luce_position_probabilities(thetas, k=k), expected[:, :k],
+                                   rtol=1e-12, atol=1e-15)
+        top_k = plackett_luce_top_k_probability(thetas, k=k)
+        np.testing.assert_allclose(top_k, expected[:, :k].sum(axis=1), rtol=1e-12, atol=1e-15)
+        assert top_k.sum() == pytest.approx(k)
+
+
+def test_position_probabilities_with_ties_and_large_gaps():
+    thetas = np.array([0.0, 0.0, 0.0, 25.0, -25.0])
+    np.testing.assert_allclose(plackett_luce_position_probabilities(thetas, k=5),
+                               brute_force_positions(thetas), rtol=1e-9, atol=1e-15)
+
+
+def test_position_probabilities_invalid_arguments():
+    for thetas, k in (([], 3), ([[1.0, 2.0]], 1), ([1.0, 2.0], 0), (np.zeros(63), 1)):
+        with pytest.raises(ValueError):
+            plackett_luce_position_probabilities(thetas, k=k)
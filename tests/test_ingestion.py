@@ -0,0 +1,68 @@
+"""
+Tests de l'ingestion incrémentale (écritures concurrentes du manifeste)
+"""
+import multiprocessing
+import time
+
+import pandas as pd
+import pytest
+
+from data.data_loader import CSV_PATH, F1DataLoader
+
+N_WRITERS = 3
+
+
+@pytest.fixture(scope="module")
+def split_csv(tmp_path_factory):
+    """CSV privé de ses N_WRITERS dernières courses, et les lignes de chacune."""
+    df = pd.read_csv(CSV_PATH)
+    last = df.drop_duplicates('raceId').sort_values(['year', 'round']).tail(N_WRITERS)['raceId'].tolist()
+
+    csv_path = tmp_path_factory.mktemp("csv") / "results.csv"
+    df[~df['raceId'].isin(last)].to_csv(csv_path, index=False)
+    races = [df[df['raceId'] == race_id].drop(columns=['Unnamed: 0']) for race_id in last]
+    return csv_path, races
+
+
+def _slow_read_manifest(self):
+    # Élargit la fenêtre entre lecture et écriture du manifeste
+    manifest = _read_manifest(self)
+    time.sleep(0.3)
+    return manifest
+
+
+_read_manifest = F1DataLoader._read_manifest
+
+
+def _ingest_worker(csv_path, partitions_dir, rows, barrier):
+    F1DataLoader._read_manifest = _slow_read_manifest
+    loader = F1DataLoader(csv_path=csv_path, use_cache=False, partitions_dir=partitions_dir)
+    assert loader.load()
+    barrier.wait()
+    loader.ingest(rows)
+
+
+def test_concurrent_ingests_keep_every_partition(split_csv, tmp_path):
+    csv_path, races = split_csv
+    partitions_dir = tmp_path / "partitions"
+
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(N_WRITERS)
+    workers = [context.Process(target=_ingest_worker, args=(csv_path, partitions_dir, rows, barrier))
+               for rows in races]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    loader = F1DataLoader(csv_path=csv_path, use_cache=False, partitions_dir=partitions_dir)
+    assert loader.load()
+    manifest = loader._read_manifest()
+    assert manifest["version"] == N_WRITERS
+    assert len({entry["path"] for entry in manifest["partitions"]}) == N_WRITERS
+    assert loader.partitions_version == N_WRITERS
+
+    expected = pd.concat(races)['raceId'].sort_values().tolist()
+    ingested = loader.df[loader.df['raceId'].isin(expected)]['raceId'].sort_values().tolist()
+    assert ingested == expected
@@ -0,0 +1,69 @@
+"""
+Tests du moteur fusionné de ModelLoader (équivalence avec le pipeline sklearn)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest import race_feature_matrix
+from src.features import DRIVER_TIME_FEATURES, DRIVER_WIN_FEATURES
+from src.models import MODELS_DIR, ModelLoader
+from src.training import driver_time_dataset
+
+RTOL = 1e-9
+
+
+def _loaders(models_dir):
+    return (ModelLoader(engine="sklearn", models_dir=models_dir, artifact_format="pickle"),
+            ModelLoader(engine="fused", models_dir=models_dir, artifact_format="pickle"))
+
+
+def _random_inputs(reference, n=500, seed=0):
+    """Entrées aléatoires dans (et autour de) la plage des données réelles."""
+    rng = np.random.default_rng(seed)
+    low, high = reference.min(axis=0), reference.max(axis=0)
+    span = np.where(high > low, high - low, 1.0)
+    return rng.uniform(low - 0.5 * span, high + 0.5 * span, size=(n, reference.shape[1]))
+
+
+def test_driver_win_fused_matches_sklearn(results):
+    sklearn_loader, fused_loader = _loaders(MODELS_DIR)
+    assert fused_loader.load("driver_win")
+    assert fused_loader.artifact("driver_win").fused is not None
+
+    real = race_feature_matrix(results)
+    for X in (real, _random_inputs(real)):
+        np.testing.assert_allclose(fused_loader.predict_thetas(X), sklearn_loader.predict_thetas(X), rtol=RTOL)
+
+    stacked = real[:40].reshape(2, 20, len(DRIVER_WIN_FEATURES))
+    np.testing.assert_allclose(fused_loader.predict_thetas(stacked),
+                               sklearn_loader.predict_thetas(stacked), rtol=RTOL)
+
+
+def test_driver_time_fused_matches_sklearn(results, driver_time_dir):
+    sklearn_loader, fused_loader = _loaders(driver_time_dir)
+    assert fused_loader.load("driver_time")
+    assert fused_loader.artifact("driver_time").fused is not None
+
+    real, _ = driver_time_dataset(results)
+    random = pd.DataFrame(_random_inputs(real.to_numpy()), columns=DRIVER_TIME_FEATURES)
+    for X in (real, random):
+        np.testing.assert_allclose(fused_loader.predict_race_time(X),
+                                   sklearn_loader.predict_race_time(X), rtol=RTOL)
+        np.testing.assert_allclose(fused_loader.predict_race_time(X.to_numpy()),
+                                   sklearn_loader.predict_race_time(X), rtol=RTOL)
+
+
+def test_driver_time_fused_reorders_dataframe_columns(results, driver_time_dir):
+    sklearn_loader, fused_loader = _loaders(driver_time_dir)
+    X, _ = driver_time_dataset(results)
+    shuffled = X[DRIVER_TIME_FEATURES[::-1]]
+
+    np.testing.assert_allclose(fused_loader.predict_race_time(shuffled),
+                               sklearn_loader.predict_race_time(X), rtol=RTOL)
+
+
+def test_driver_time_fused_rejects_wrong_shape(driver_time_dir):
+    _, fused_loader = _loaders(driver_time_dir)
+    with pytest.raises(ValueError):
+        fused_loader.predict_race_time(np.zeros((3, len(DRIVER_TIME_FEATURES) + 1)))
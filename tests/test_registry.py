@@ -0,0 +1,134 @@
+"""
+Tests du registre de versions (rechargement à chaud, retour arrière)
+"""
+import shutil
+
+import joblib
+import numpy as np
+import pytest
+
+from src.models import ModelLoader
+from src.registry import ModelRegistry
+
+KEY = "driver_time"
+
+
+@pytest.fixture
+def models_dir(driver_time_dir, tmp_path):
+    """Copie modifiable du dossier de modèles driver_time."""
+    for path in driver_time_dir.iterdir():
+        shutil.copy(path, tmp_path / path.name)
+    return tmp_path
+
+
+def write_new_version(models_dir, offset):
+    """Réécrit model_driver_time.pkl avec un biais décalé (nouvelle version)."""
+    model = joblib.load(models_dir / f"model_{KEY}.pkl")
+    model.intercept_ = model.intercept_ + offset
+    joblib.dump(model, models_dir / f"model_{KEY}.pkl")
+
+
+def intercept(loader):
+    return float(np.ravel(loader.artifact(KEY).model.intercept_)[0])
+
+
+def make_registry(models_dir):
+    loader = ModelLoader(models_dir=models_dir, artifact_format="pickle")
+    assert loader.load(KEY)
+    return loader, ModelRegistry(loader)
+
+
+def test_check_reloads_on_signature_change(models_dir):
+    loader, registry = make_registry(models_dir)
+    first = loader.version(KEY)
+    base = intercept(loader)
+
+    assert registry.check() == []
+
+    write_new_version(models_dir, 1000.0)
+    assert registry.check() == [KEY]
+    assert loader.version(KEY) != first
+    assert intercept(loader) == pytest.approx(base + 1000.0)
+    assert registry.versions()[KEY]["previous"] == first
+    assert registry.history[-1]["action"] == "reload"
+
+    # Signature inchangée : rien à recharger
+    assert registry.check() == []
+
+
+def test_identical_rewrite_keeps_version(models_dir):
+    loader, registry = make_registry(models_dir)
+    version = loader.version(KEY)
+
+    path = models_dir / f"model_{KEY}.pkl"
+    path.write_bytes(path.read_bytes())  # nouveau mtime, contenu identique
+    assert registry.check() == []
+    assert loader.version(KEY) == version
+    assert registry.history == []
+
+
+def test_rollback_restores_previous_artifact(models_dir):
+    loader, registry = make_registry(models_dir)
+    original = loader.artifact(KEY)
+
+    write_new_version(models_dir, 1000.0)
+    registry.check()
+    new = loader.artifact(KEY)
+
+    assert registry.rollback(KEY) == original.version
+    assert loader.artifact(KEY) is original
+    # Un second retour arrière annule le premier
+    assert registry.rollback(KEY) == new.version
+    assert loader.artifact(KEY) is new
+
+
+def test_rollback_without_previous_version_raises(models_dir):
+    _, registry = make_registry(models_dir)
+    with pytest.raises(ValueError):
+        registry.rollback(KEY)
+
+
+def test_pinned_version_survives_check(models_dir):
+    loader, registry = make_registry(models_dir)
+    original = loader.version(KEY)
+
+    write_new_version(models_dir, 1000.0)
+    registry.check()
+    registry.rollback(KEY)
+
+    # La version plus récente sur disque n'est pas réinstallée
+    assert registry.check() == []
+    assert loader.version(KEY) == original
+
+    # Un nouveau changement sur disque lève l'épinglage
+    write_new_version(models_dir, 1.0)
+    assert registry.check() == [KEY]
+    assert loader.version(KEY) != original
+
+
+def test_missing_files_report_error_status(driver_time_dir, tmp_path):
+    loader = ModelLoader(models_dir=tmp_path, artifact_format="pickle")
+    registry = ModelRegistry(loader)
+
+    assert not loader.load(KEY)
+    assert loader.status(KEY) == "error"
+    assert registry.versions()[KEY]["version"] is None
+    assert registry.check() == []
+
+    # Fichiers apparus après coup : le couple est chargé par check()
+    for path in driver_time_dir.iterdir():
+        shutil.copy(path, tmp_path / path.name)
+    assert registry.check() == [KEY]
+    assert loader.status(KEY) == "loaded"
+
+
+def test_missing_files_keep_installed_version(models_dir):
+    loader, registry = make_registry(models_dir)
+    version = loader.version(KEY)
+
+    (models_dir / f"scaler_{KEY}.pkl").unlink()
+    assert registry.check() == []
+    assert not registry.reload(KEY)
+    assert loader.status(KEY) == "loaded"
+    assert loader.version(KEY) == version
+    assert registry.errors and KEY in registry.errors[-1]
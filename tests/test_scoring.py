@@ -0,0 +1,139 @@
+"""
+Tests du scoring incrémental (IncrementalScorer)
+"""
+import numpy as np
+import pytest
+
+from src.features import DRIVER_WIN_FEATURES, plackett_luce_probability
+from src.scoring import IncrementalScorer, driver_win_row_builder, reference_times
+
+N_FEATURES = len(DRIVER_WIN_FEATURES)
+
+
+class FakeLoader:
+    """predict_thetas linéaire et déterministe."""
+
+    def __init__(self, scale=1.0):
+        self.weights = scale * np.linspace(-1.0, 2.0, N_FEATURES)
+
+    def predict_thetas(self, X):
+        return np.asarray(X, dtype=float) @ self.weights
+
+
+class RowBuilder:
+    """Configuration (grille, écart) -> ligne de features ; compte les configurations construites."""
+
+    def __init__(self):
+        self.built = []
+
+    def __call__(self, configs):
+        self.built.extend(configs)
+        return np.array([[grid, delta] + [0.5 * grid] * (N_FEATURES - 2) for grid, delta in configs])
+
+
+def full_rescore(loader, inputs):
+    X = RowBuilder()(list(inputs.values()))
+    thetas = loader.predict_thetas(X)
+    return thetas, plackett_luce_probability(thetas)
+
+
+@pytest.fixture
+def grid():
+    return {f"pilote_{i}": (float(i + 1), 0.1 * i) for i in range(8)}
+
+
+def test_partial_update_matches_full_rescore(grid):
+    loader = FakeLoader()
+    scorer = IncrementalScorer(loader)
+    builder = RowBuilder()
+    scorer.update(grid, builder)
+
+    # Un pilote passe en tête (nouveau maximum), un autre recule (même décalage)
+    updated = dict(grid, pilote_7=(0.0, -3.0), pilote_2=(12.0, 1.0))
+    updated["pilote_0"] = (20.0, 4.0)
+    scorer.update(updated, builder)
+    updated["pilote_5"] = (9.0, 0.0)
+    scorer.update(updated, builder)
+
+    thetas, probabilities = full_rescore(loader, updated)
+    np.testing.assert_allclose(scorer.thetas, thetas)
+    np.testing.assert_allclose(scorer.probabilities(), probabilities, rtol=1e-12)
+    assert scorer.probabilities().sum() == pytest.approx(1.0)
+    assert [r["driver"] for r in scorer.results()] == list(updated)
+
+
+def test_only_changed_configs_are_rebuilt(grid):
+    scorer = IncrementalScorer(FakeLoader())
+    builder = RowBuilder()
+
+    assert scorer.update(grid, builder) == list(grid)
+    assert len(builder.built) == len(grid)
+
+    builder.built.clear()
+    assert scorer.update(dict(grid), builder) == []
+    assert builder.built == []
+    assert scorer.last_rescored == 0
+
+    changed = dict(grid, pilote_3=(4.0, 9.0), pilote_6=(1.0, 1.0))
+    assert scorer.update(changed, builder) == ["pilote_3", "pilote_6"]
+    assert builder.built == [(4.0, 9.0), (1.0, 1.0)]
+    assert scorer.last_rescored == 2
+
+
+def test_version_change_rescores_everything(grid):
+    builder = RowBuilder()
+    scorer = IncrementalScorer(FakeLoader())
+    scorer.update(grid, builder, version="v1")
+
+    # Nouveau modèle derrière le même scorer : mêmes entrées, theta différents
+    scorer.scorer = FakeLoader(scale=2.0)
+    builder.built.clear()
+    assert scorer.update(grid, builder, version="v2") == list(grid)
+    assert len(builder.built) == len(grid)
+
+    thetas, probabilities = full_rescore(scorer.scorer, grid)
+    np.testing.assert_allclose(scorer.thetas, thetas)
+    np.testing.assert_allclose(scorer.probabilities(), probabilities, rtol=1e-12)
+
+
+def test_grid_change_rescores_everything(grid):
+    builder = RowBuilder()
+    scorer = IncrementalScorer(FakeLoader())
+    scorer.update(grid, builder)
+
+    smaller = {name: grid[name] for name in list(grid)[:5]}
+    builder.built.clear()
+    assert scorer.update(smaller, builder) == list(smaller)
+    assert len(scorer.thetas) == 5
+    np.testing.assert_allclose(scorer.probabilities(), full_rescore(scorer.scorer, smaller)[1], rtol=1e-12)
+
+
+def test_circuit_change_rescores_with_new_references():
+    # Deux circuits de même nombre de tours : configurations pilotes identiques
+    loader = FakeLoader()
+    mexico = reference_times({"ref_pole_q1": 77.0, "ref_pole_q2": 76.5, "ref_pole_q3": 76.0,
+                              "ref_fastest_lap": 78.0, "ref_avg_lap_ms": 81_000.0})
+    brazil = reference_times({"ref_pole_q1": 70.5, "ref_pole_q2": 70.0, "ref_pole_q3": 69.5,
+                              "ref_fastest_lap": 71.0, "ref_avg_lap_ms": 74_000.0})
+    inputs = {f"pilote_{i}": (i + 1, 0.1 * i, 71, 2, 23.0) for i in range(12)}
+
+    scorer = IncrementalScorer(loader)
+    scorer.update(inputs, driver_win_row_builder(mexico), version=("v1", mexico))
+    assert scorer.update(inputs, driver_win_row_builder(brazil), version=("v1", brazil)) == list(inputs)
+
+    fresh = IncrementalScorer(loader)
+    fresh.update(inputs, driver_win_row_builder(brazil), version=("v1", brazil))
+    np.testing.assert_allclose(scorer.thetas, fresh.thetas)
+    np.testing.assert_allclose(scorer.probabilities(), fresh.probabilities())
+
+    # Les temps du circuit changent bien les theta (sinon le test ne prouverait rien)
+    stale = IncrementalScorer(loader)
+    stale.update(inputs, driver_win_row_builder(mexico), version=("v1", mexico))
+    assert not np.allclose(stale.thetas, fresh.thetas)
+
+
+def test_reference_times_fallback():
+    assert reference_times(None) == (81.5, 80.7, 80.0, 80.0, 82_500.0)
+    missing = {"ref_pole_q1": np.nan, "ref_pole_q2": np.nan, "ref_pole_q3": np.nan,
+               "ref_fastest_lap": 90.0, "ref_avg_lap_ms": 95_000.0}
+    assert reference_times(missing) == reference_times(None)
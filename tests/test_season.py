@@ -0,0 +1,42 @@
+"""
+Tests de la projection du championnat sur les courses restantes
+"""
+import numpy as np
+import pytest
+
+from data.data_loader import F1_CALENDAR_2025, GRID_2025
+from src.features import DRIVER_WIN_FEATURES
+from src.models import ModelLoader
+from src.season import project_remaining_season, remaining_race_features, remaining_races
+
+
+def test_remaining_race_features_are_complete(data_loader):
+    races = remaining_races(F1_CALENDAR_2025)
+    features = remaining_race_features(data_loader, GRID_2025, races)
+
+    assert features.shape == (len(races), len(GRID_2025), len(DRIVER_WIN_FEATURES))
+    assert not np.isnan(features).any()
+    # Grille : une permutation de 1..n par course
+    grid = features[:, :, DRIVER_WIN_FEATURES.index('grid')]
+    np.testing.assert_array_equal(np.sort(grid, axis=1),
+                                  np.tile(np.arange(1, len(GRID_2025) + 1), (len(races), 1)))
+    # Nombre de tours du calendrier
+    laps = features[:, :, DRIVER_WIN_FEATURES.index('laps')]
+    np.testing.assert_array_equal(laps[:, 0], [race["laps"] for race in races])
+
+
+def test_project_remaining_season(data_loader):
+    drivers_df, constructors_df = project_remaining_season(ModelLoader(), data_loader, n_sims=2_000, seed=0)
+
+    assert len(drivers_df) == len(GRID_2025)
+    assert drivers_df["Titre"].sum() == pytest.approx(1.0)
+    assert constructors_df["Titre"].sum() == pytest.approx(1.0)
+    assert (drivers_df["Points projetés"] >= drivers_df["Points actuels"]).all()
+
+
+def test_completed_season_keeps_current_standings(data_loader):
+    calendar = [dict(race, completed=True) for race in F1_CALENDAR_2025]
+    drivers_df, _ = project_remaining_season(ModelLoader(), data_loader, calendar=calendar, n_sims=10)
+
+    np.testing.assert_allclose(drivers_df["Points projetés"], drivers_df["Points actuels"])
+    assert drivers_df["Titre"].max() == 1.0
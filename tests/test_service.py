@@ -0,0 +1,109 @@
+"""
+Tests du service HTTP/JSON (lecture du corps des requêtes)
+"""
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+from src.models import ModelLoader
+from src.service import MAX_BODY_BYTES, create_server
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = create_server(port=0, model_loader=ModelLoader())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _raw_request(server, head, body=b""):
+    """
+    Envoie une requête brute et lit jusqu'à la fermeture par le serveur.
+
+    Returns:
+        (statut, en-têtes, corps JSON, connexion fermée par le serveur)
+    """
+    with socket.create_connection(server.server_address, timeout=2) as sock:
+        sock.sendall(head.encode("ascii") + b"\r\n" + body)
+        data, closed = b"", False
+        try:
+            while chunk := sock.recv(65536):
+                data += chunk
+            closed = True
+        except socket.timeout:
+            pass
+
+    head_part, _, body_part = data.partition(b"\r\n\r\n")
+    status_line, *header_lines = head_part.decode("latin-1").split("\r\n")
+    headers = dict(line.split(": ", 1) for line in header_lines)
+    length = int(headers["Content-Length"])
+    # Une seule réponse : le reste du corps envoyé n'est pas traité comme une requête
+    assert len(body_part) == length
+    return int(status_line.split()[1]), headers, json.loads(body_part), closed
+
+
+@pytest.mark.parametrize("length", ["-1", "abc", "1_0", "+5"])
+def test_invalid_content_length_is_rejected(server, length):
+    head = f"POST /predict/win HTTP/1.1\r\nHost: test\r\nContent-Length: {length}\r\n"
+    status, headers, payload, closed = _raw_request(server, head)
+
+    assert status == 400
+    assert "Content-Length" in payload["error"]
+    assert headers["Connection"] == "close"
+    assert closed
+
+
+def test_oversized_body_closes_connection(server):
+    head = f"POST /predict/win HTTP/1.1\r\nHost: test\r\nContent-Length: {MAX_BODY_BYTES + 1}\r\n"
+    # Début du corps envoyé : il ne doit pas être lu comme une nouvelle requête
+    status, headers, _, closed = _raw_request(server, head, b"GET /health HTTP/1.1\r\nHost: test\r\n\r\n")
+
+    assert status == 413
+    assert headers["Connection"] == "close"
+    assert closed
+
+
+def test_keep_alive_after_valid_request(server):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+    for _ in range(2):
+        connection.request("POST", "/predict/tier", body=json.dumps({"features": [[100, 1.01]]}),
+                           headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        assert response.status == 200
+        assert json.loads(response.read())["tiers"][0]["tier_name"]
+    connection.close()
+
+
+def test_health_reports_ok_and_model_status(server):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+    connection.request("GET", "/health")
+    response = connection.getresponse()
+    body = json.loads(response.read())
+    connection.close()
+
+    assert response.status == 200
+    assert body["status"] == "ok"
+    assert set(body["model_status"]) == {"driver_win", "driver_time", "team_perf"}
+    assert set(body["model_status"].values()) <= {"loaded", "pending", "error"}
+
+
+def test_body_on_get_is_drained(server):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+    # Corps ressemblant à une requête : non consommé, il serait traité comme la suivante
+    smuggled = b"GET /inconnue HTTP/1.1\r\nHost: test\r\n\r\n"
+    connection.request("GET", "/health", body=smuggled)
+    first = connection.getresponse()
+    assert first.status == 200
+    first.read()
+
+    connection.request("GET", "/health")
+    second = connection.getresponse()
+    assert second.status == 200
+    assert json.loads(second.read())["status"] == "ok"
+    connection.close()
@@ -0,0 +1,67 @@
+"""
+Tests du simulateur Monte Carlo des ordres d'arrivée (Plackett-Luce)
+"""
+import numpy as np
+import pytest
+
+from src.features import plackett_luce_position_probabilities
+from src.simulation import chunk_size_for_budget, sample_finishing_orders, simulate_finishing_positions
+
+THETAS = np.array([1.2, 0.8, 0.5, 0.0, -0.3, -1.0, -2.0])
+
+
+def test_same_seed_is_reproducible():
+    first = simulate_finishing_positions(THETAS, n_sims=5_000, seed=7)
+    second = simulate_finishing_positions(THETAS, n_sims=5_000, seed=7)
+    other = simulate_finishing_positions(THETAS, n_sims=5_000, seed=8)
+
+    np.testing.assert_array_equal(first["position_counts"], second["position_counts"])
+    assert not np.array_equal(first["position_counts"], other["position_counts"])
+
+
+def test_parallel_jobs_match_sequential():
+    sequential = simulate_finishing_positions(THETAS, n_sims=40_000, seed=1, n_jobs=1)
+    parallel = simulate_finishing_positions(THETAS, n_sims=40_000, seed=1, n_jobs=2)
+    repeated = simulate_finishing_positions(THETAS, n_sims=40_000, seed=1, n_jobs=2)
+
+    # Même graine et même n_jobs : identique ; n_jobs différent : flux aléatoires
+    # différents, mêmes distributions (écart-type d'une fréquence <= 0.0025)
+    np.testing.assert_array_equal(parallel["position_counts"], repeated["position_counts"])
+    assert parallel["position_counts"].sum() == sequential["position_counts"].sum()
+    np.testing.assert_allclose(parallel["position_probabilities"], sequential["position_probabilities"],
+                               atol=0.015)
+
+
+def test_small_memory_budget_chunks_without_changing_results():
+    budget = 4 * 8 * THETAS.size * 7  # 7 simulations par bloc
+    assert chunk_size_for_budget(THETAS.size, budget) == 7
+
+    chunked = simulate_finishing_positions(THETAS, n_sims=1_000, seed=3, memory_budget=budget)
+    whole = simulate_finishing_positions(THETAS, n_sims=1_000, seed=3)
+    np.testing.assert_array_equal(chunked["position_counts"], whole["position_counts"])
+
+
+def test_counts_and_probabilities():
+    result = simulate_finishing_positions(THETAS, n_sims=50_000, seed=0)
+    counts = result["position_counts"]
+
+    # Chaque simulation place chaque pilote exactement une fois
+    np.testing.assert_array_equal(counts.sum(axis=0), 50_000)
+    np.testing.assert_array_equal(counts.sum(axis=1), 50_000)
+    assert result["expected_position"].sum() == pytest.approx(THETAS.size * (THETAS.size + 1) / 2)
+
+    exact = plackett_luce_position_probabilities(THETAS, k=3)
+    np.testing.assert_allclose(result["position_probabilities"][:, :3], exact, atol=0.01)
+
+
+def test_sampled_orders_are_permutations():
+    orders = sample_finishing_orders(THETAS, 2_000, np.random.default_rng(0))
+
+    assert orders.shape == (2_000, THETAS.size)
+    np.testing.assert_array_equal(np.sort(orders, axis=1), np.tile(np.arange(THETAS.size), (2_000, 1)))
+
+
+@pytest.mark.parametrize("thetas, n_sims", [([], 10), ([[1.0, 2.0]], 10), ([1.0, 2.0], 0)])
+def test_invalid_arguments(thetas, n_sims):
+    with pytest.raises(ValueError):
+        simulate_finishing_positions(thetas, n_sims=n_sims)
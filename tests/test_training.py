@@ -0,0 +1,97 @@
+"""
+Tests des versions de modèles (save_version, promote)
+"""
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.artifacts import export_numeric, numeric_paths
+from src.features import DRIVER_WIN_FEATURES
+from src.models import ModelLoader, artifact_paths
+from src.registry import ModelRegistry
+from src.training import promote, save_version, train_models
+
+
+@pytest.fixture(scope="module")
+def trained(results):
+    """Deux entraînements distincts : historique sans la dernière saison, puis complet."""
+    older = results[results['year'] < results['year'].max()]
+    first = train_models(older, keys=["driver_win"], workers=1, n_jobs=1)
+    second = train_models(results, keys=["driver_win", "team_perf"], workers=1, n_jobs=1)
+    return first, second
+
+
+def read_metadata(version_dir):
+    with open(version_dir / "metadata.json") as f:
+        return json.load(f)
+
+
+def test_save_version_writes_pickles_and_metadata(trained, tmp_path):
+    _, second = trained
+    version_dir = save_version(second, tmp_path / "versions")
+
+    assert version_dir.parent == tmp_path / "versions"
+    assert not list((tmp_path / "versions").glob(".*.tmp"))
+
+    metadata = read_metadata(version_dir)
+    assert set(metadata["models"]) == {"driver_win", "team_perf"}
+    loader = ModelLoader(models_dir=version_dir, artifact_format="pickle")
+    for key, info in metadata["models"].items():
+        assert all(path.exists() for path in artifact_paths(key, version_dir))
+        # Empreinte du manifeste = version vue par le ModelLoader
+        assert loader.version(key) == info["version"]
+        assert info["rows"] == second[key]["rows"]
+        assert info["params"] == second[key]["params"]
+
+
+def test_successive_versions_get_distinct_dirs(trained, tmp_path):
+    first, second = trained
+    a = save_version(first, tmp_path)
+    b = save_version(second, tmp_path)
+    assert a != b
+    assert read_metadata(a)["models"]["driver_win"]["version"] != read_metadata(b)["models"]["driver_win"]["version"]
+
+
+def test_promote_updates_active_models(trained, tmp_path):
+    first, second = trained
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    old_dir = save_version(first, tmp_path / "versions")
+    new_dir = save_version(second, tmp_path / "versions")
+
+    assert promote(old_dir, models_dir) == ["driver_win"]
+    loader = ModelLoader(models_dir=models_dir, artifact_format="pickle")
+    registry = ModelRegistry(loader)
+    assert loader.version("driver_win") == read_metadata(old_dir)["models"]["driver_win"]["version"]
+
+    # Promotion d'une seule clé de la nouvelle version, rechargée à chaud
+    assert promote(new_dir, models_dir, keys=["driver_win"]) == ["driver_win"]
+    assert not artifact_paths("team_perf", models_dir)[0].exists()
+    assert registry.check() == ["driver_win"]
+    assert loader.version("driver_win") == read_metadata(new_dir)["models"]["driver_win"]["version"]
+    assert not list(models_dir.glob("*.tmp"))
+
+    with pytest.raises(ValueError):
+        promote(old_dir, models_dir, keys=["team_perf"])
+
+
+def test_promote_regenerates_numeric_export(trained, tmp_path):
+    first, second = trained
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    promote(save_version(first, tmp_path / "versions"), models_dir)
+    old = first["driver_win"]
+    export_numeric("driver_win", old["model"], old["scaler"], models_dir)
+
+    promote(save_version(second, tmp_path / "versions"), models_dir, keys=["driver_win"])
+    assert all(path.exists() for path in numeric_paths("driver_win", models_dir))
+
+    X = np.random.default_rng(0).normal(size=(6, len(DRIVER_WIN_FEATURES))) + 5
+    numeric = ModelLoader(models_dir=models_dir, artifact_format="numeric")
+    model = joblib.load(artifact_paths("driver_win", models_dir)[0])
+    scaler = joblib.load(artifact_paths("driver_win", models_dir)[1])
+    expected = model.predict(scaler.transform(pd.DataFrame(X, columns=DRIVER_WIN_FEATURES)))
+    np.testing.assert_allclose(numeric.predict_thetas(X), expected, rtol=1e-9)